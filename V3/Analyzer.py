@@ -0,0 +1,170 @@
+import re
+
+import numpy as np
+
+from Stemmer import Stemmer
+
+
+class Analyzer:
+    """
+    La classe Analyzer regroupe la chaîne de traitement du texte utilisée
+    par Corpus (statistiques, évolution d'un mot) et par SearchEngine
+    (indexation, requêtes) :
+    - normalisation (minuscules)
+    - découpage en mots (lettres de toutes les langues et chiffres,
+      ponctuation retirée)
+    - racinisation optionnelle (anglais ou français), avec cache des racines
+    - lexique : chaque mot reçoit un identifiant entier, de sorte qu'un
+      document analysé une fois est conservé sous forme de tableau d'entiers
+    """
+
+    # Mots : lettres (de tout alphabet) et chiffres, reliés par des
+    # apostrophes ou des tirets internes (aujourd'hui, gpt-4)
+    TOKEN_RE = re.compile(r"[^\W_]+(?:['-][^\W_]+)*")
+
+    def __init__(self, stemming=None, stem_cache_size=50000):
+        """
+        Initialise un analyseur avec un lexique vide.
+
+        :param stemming: Langue de racinisation ("en", "fr") ou None
+        :param stem_cache_size: Nombre de formes dont la racine est mémorisée
+        """
+
+        self.stemming = stemming
+        self.stem_cache_size = stem_cache_size
+        self.stemmer = Stemmer(stemming, stem_cache_size) if stemming else None
+
+        # Lexique : {mot: identifiant} et mots par identifiant
+        self._term_ids = {}
+        self.terms = []
+
+        # Avec racinisation : {identifiant: forme d'origine} pour les racines
+        # qui diffèrent du premier mot rencontré (voir surface)
+        self.surfaces = {}
+
+    def normalize(self, texte):
+        """
+        Passage en minuscules et remplacement des retours à la ligne.
+        """
+        return texte.lower().replace("\n", " ")
+
+    def tokenize(self, texte):
+        """
+        Découpe un texte normalisé en mots. Les apostrophes et tirets
+        ne sont conservés qu'entre deux lettres ou chiffres.
+        """
+        return self.TOKEN_RE.findall(texte)
+
+    def analyze(self, texte):
+        """
+        Applique toute la chaîne de traitement à un texte.
+
+        :return: Liste des mots (termes d'index), dans l'ordre du texte
+        """
+
+        if not isinstance(texte, str):
+            return []
+
+        tokens = self.tokenize(self.normalize(texte))
+        if self.stemmer is not None:
+            tokens = self.stemmer.stem_tokens(tokens)
+        return tokens
+
+    def config(self):
+        """
+        Paramètres de l'analyseur, sauvegardés avec l'index : un index
+        rechargé analyse les requêtes comme à sa construction.
+        """
+
+        return {
+            "stemming": self.stemming,
+            "stem_cache_size": self.stem_cache_size,
+        }
+
+    @property
+    def term_ids(self):
+        """
+        Lexique {mot: identifiant}, construit au premier accès quand les
+        mots ont été fournis par set_lexicon.
+        """
+
+        if self._term_ids is None:
+            self._term_ids = dict(zip(self.terms, range(len(self.terms))))
+        return self._term_ids
+
+    def set_lexicon(self, terms, surfaces=None):
+        """
+        Remplace le lexique par une liste de mots, l'identifiant d'un mot
+        étant sa position (index rechargé). Le dictionnaire des
+        identifiants n'est construit qu'au premier besoin.
+
+        :param surfaces: Formes d'origine des racines {identifiant: mot}
+        """
+
+        self.terms = list(terms)
+        self._term_ids = None
+        self.surfaces = dict(surfaces or {})
+
+    def surface(self, j):
+        """
+        Forme d'origine du mot j, à présenter à l'utilisateur : avec
+        racinisation, le premier mot des textes réduit à cette racine
+        (« economy » plutôt que « economi »), sinon le mot lui-même.
+        """
+        return self.surfaces.get(j, self.terms[j])
+
+    def term_id(self, term):
+        """
+        Retourne l'identifiant d'un mot, en l'ajoutant au lexique si besoin.
+        """
+
+        term_ids = self.term_ids
+        j = term_ids.get(term)
+        if j is None:
+            j = term_ids[term] = len(self.terms)
+            self.terms.append(term)
+        return j
+
+    def to_ids(self, texte):
+        """
+        Analyse un texte et le convertit en tableau d'identifiants de mots
+        (les nouveaux mots sont ajoutés au lexique).
+
+        :return: Tableau NumPy int32, un identifiant par occurrence
+        """
+
+        # Lexique lu une seule fois pour tout le texte
+        term_ids, terms = self.term_ids, self.terms
+        ids = []
+
+        if self.stemmer is None or not isinstance(texte, str):
+            for t in self.analyze(texte):
+                j = term_ids.get(t)
+                if j is None:
+                    j = term_ids[t] = len(terms)
+                    terms.append(t)
+                ids.append(j)
+            return np.array(ids, dtype=np.int32)
+
+        # Avec racinisation, la forme d'origine d'une nouvelle racine est
+        # conservée (voir surface)
+        surfaces = self.surfaces
+        formes = self.tokenize(self.normalize(texte))
+        for t, forme in zip(self.stemmer.stem_tokens(formes), formes):
+            j = term_ids.get(t)
+            if j is None:
+                j = term_ids[t] = len(terms)
+                terms.append(t)
+                if forme != t:
+                    surfaces[j] = forme
+            ids.append(j)
+        return np.array(ids, dtype=np.int32)
+
+    def lookup(self, texte):
+        """
+        Analyse un texte (une requête par exemple) sans modifier le lexique.
+
+        :return: Identifiants des mots connus, dans l'ordre du texte
+        """
+        term_ids = self.term_ids
+        return [term_ids[t] for t in self.analyze(texte) if t in term_ids]
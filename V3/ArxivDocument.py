@@ -4,6 +4,7 @@ from Document import Document
 # Elle représente un document scientifique provenant d'ArXiv,
 # avec la gestion spécifique des co-auteurs.
 class ArxivDocument(Document):
+    __slots__ = ("coauthors",)
 
     def __init__(self, titre, auteur, date, url, texte, coauthors=None):
         """
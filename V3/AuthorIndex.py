@@ -0,0 +1,108 @@
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+from Postings import EMPTY, intersect_all
+
+
+class AuthorIndex:
+    """
+    La classe AuthorIndex retrouve les noms d'auteurs correspondant à un
+    nom partiel, insensible à la casse, sans parcourir tous les noms :
+    - préfixe : les noms en minuscules sont triés par ordre alphabétique ;
+      ceux qui commencent par le préfixe forment un intervalle du tableau
+      trié, trouvé par dichotomie (bisect), comme le nœud d'un trie
+    - sous-chaîne : chaque trigramme de caractères a sa liste de postings
+      (noms contenant le trigramme) ; l'intersection des listes des
+      trigrammes de la requête donne les candidats, seuls vérifiés
+
+    Le coût d'une recherche dépend ainsi du nombre de noms candidats, et
+    non du nombre total de noms.
+    """
+
+    # Taille des n-grammes de caractères
+    N = 3
+
+    # Borne supérieure de tous les noms ayant un préfixe donné
+    _FIN = "\U0010ffff"
+
+    def __init__(self, names):
+        """
+        :param names: Noms d'auteurs, dans l'ordre de leurs identifiants
+        """
+
+        self.names = [str(nom).casefold() if nom else "" for nom in names]
+
+        ordre = sorted(range(len(self.names)), key=self.names.__getitem__)
+        self._sorted = [self.names[i] for i in ordre]
+        self._sorted_ids = np.array(ordre, dtype=np.int64)
+
+        # Postings des n-grammes : {n-gramme: identifiants croissants}
+        grams = {}
+        for i, nom in enumerate(self.names):
+            for g in self._ngrams(nom):
+                grams.setdefault(g, []).append(i)
+        self._grams = {g: np.array(ids, dtype=np.int64) for g, ids in grams.items()}
+
+    def add(self, names):
+        """
+        Ajoute des noms, dont les identifiants suivent ceux des noms
+        existants : insertion dans le tableau trié et prolongement des
+        postings de leurs n-grammes, sans reconstruction.
+        """
+
+        debut = len(self.names)
+        self.names.extend(str(nom).casefold() if nom else "" for nom in names)
+
+        # Nouveaux noms triés, placés après les noms égaux existants
+        # (à nom égal, identifiants croissants)
+        ordre = sorted(range(debut, len(self.names)), key=self.names.__getitem__)
+        positions = [bisect_right(self._sorted, self.names[i]) for i in ordre]
+        fusion, k = [], 0
+        for p, i in zip(positions, ordre):
+            fusion.extend(self._sorted[k:p])
+            fusion.append(self.names[i])
+            k = p
+        fusion.extend(self._sorted[k:])
+        self._sorted = fusion
+        self._sorted_ids = np.insert(self._sorted_ids, positions, np.array(ordre, dtype=np.int64))
+
+        grams = {}
+        for i in range(debut, len(self.names)):
+            for g in self._ngrams(self.names[i]):
+                grams.setdefault(g, []).append(i)
+        for g, ids in grams.items():
+            self._grams[g] = np.concatenate([self._grams.get(g, EMPTY), np.array(ids, dtype=np.int64)])
+
+    @classmethod
+    def _ngrams(cls, texte):
+        return {texte[k:k + cls.N] for k in range(len(texte) - cls.N + 1)}
+
+    def prefix(self, prefixe):
+        """
+        Identifiants des noms commençant par prefixe.
+        """
+
+        p = prefixe.casefold()
+        debut = bisect_left(self._sorted, p)
+        fin = bisect_left(self._sorted, p + self._FIN)
+        return np.sort(self._sorted_ids[debut:fin])
+
+    def search(self, partiel):
+        """
+        Identifiants des noms contenant partiel.
+        """
+
+        p = partiel.casefold()
+
+        # Requête plus courte qu'un n-gramme : examen de tous les noms
+        if len(p) < self.N:
+            return np.array([i for i, nom in enumerate(self.names) if p in nom], dtype=np.int64)
+
+        listes = [self._grams.get(g, EMPTY) for g in self._ngrams(p)]
+        candidats = intersect_all(listes)
+
+        # Les trigrammes peuvent être présents sans être consécutifs
+        return np.array(
+            [i for i in candidats.tolist() if p in self.names[i]], dtype=np.int64
+        )
@@ -0,0 +1,236 @@
+import numpy as np
+
+
+class CompressedPostings:
+    """
+    La classe CompressedPostings conserve les listes de postings de tous les
+    mots (documents contenant le mot et nombre d'occurrences) sous forme
+    compressée :
+    - identifiants de documents codés par différence avec le précédent
+      (le premier est conservé tel quel), puis compactés sur le nombre
+      d'octets (1, 2, 4 ou 8) suffisant pour le plus grand écart de la liste
+    - TF stockés dans le plus petit type entier non signé suffisant
+      (en pratique un octet par posting)
+
+    Un posting occupe ainsi 2 à 3 octets, contre 12 dans une matrice creuse
+    (indice int32 et valeur float64). La largeur étant fixe pour chaque
+    liste, le décodage se réduit à une vue NumPy des octets et une somme
+    cumulée, sans boucle Python par posting.
+    """
+
+    # Tableaux constituant les postings (sauvegardés par SearchEngine.save)
+    ARRAYS = ("doc_bytes", "byte_ptr", "widths", "ptr", "tfs")
+
+    # Largeurs possibles d'un écart, en octets
+    WIDTHS = (1, 2, 4, 8)
+
+    def __init__(self, doc_bytes, byte_ptr, widths, ptr, tfs, n_docs):
+        """
+        :param doc_bytes: Écarts entre documents, tous mots confondus, en
+                          petit-boutiste (uint8)
+        :param byte_ptr: Début des octets du mot j dans doc_bytes
+        :param widths: Largeur en octets des écarts du mot j
+        :param ptr: Début des postings du mot j (indice dans tfs)
+        :param tfs: TF de chaque posting, dans l'ordre des documents
+        :param n_docs: Nombre de documents de l'index
+        """
+
+        self.doc_bytes = doc_bytes
+        self.byte_ptr = byte_ptr
+        self.widths = widths
+        self.ptr = ptr
+        self.tfs = tfs
+        self.n_docs = n_docs
+
+    @classmethod
+    def from_csc(cls, TF):
+        """
+        Compresse une matrice TF (documents x mots), convertie au format CSC.
+        """
+
+        TF = TF.tocsc()
+        TF.sort_indices()
+
+        ptr = np.asarray(TF.indptr, dtype=np.int64)
+        docs = np.asarray(TF.indices, dtype=np.int64)
+        df = np.diff(ptr)
+
+        # Écarts entre documents successifs d'un même mot ; le premier
+        # document de chaque liste est conservé tel quel
+        gaps = np.diff(docs, prepend=0)
+        debuts = ptr[:-1][df > 0]
+        gaps[debuts] = docs[debuts]
+
+        # Largeur de chaque liste : celle de son plus grand écart
+        widths = np.ones(len(df), dtype=np.uint8)
+        if len(gaps):
+            plus_grand = np.maximum.reduceat(gaps, debuts)
+            largeurs = np.ones(len(debuts), dtype=np.uint8)
+            for w in cls.WIDTHS[:-1]:
+                largeurs[plus_grand >= 2 ** (8 * w)] = 2 * w
+            widths[df > 0] = largeurs
+
+        # k-ième octet de chaque écart (petit-boutiste)
+        n_bytes = np.repeat(widths.astype(np.int64), df)
+        debut_octets = np.cumsum(n_bytes) - n_bytes
+        rang = np.arange(int(n_bytes.sum()), dtype=np.int64) - np.repeat(debut_octets, n_bytes)
+        octets = (np.repeat(gaps, n_bytes) >> (8 * rang)) & 0xFF
+
+        byte_ptr = np.concatenate([[0], np.cumsum(widths.astype(np.int64) * df)])
+
+        return cls(octets.astype(np.uint8), byte_ptr, widths, ptr,
+                   cls._compact(TF.data), TF.shape[0])
+
+    @staticmethod
+    def _compact(values):
+        """
+        Entiers positifs dans le plus petit type non signé suffisant.
+        """
+
+        maximum = int(values.max()) if len(values) else 0
+        for dtype in (np.uint8, np.uint16, np.uint32):
+            if maximum <= np.iinfo(dtype).max:
+                return values.astype(dtype)
+        return values.astype(np.uint64)
+
+    def __len__(self):
+        return len(self.ptr) - 1
+
+    @property
+    def nnz(self):
+        """
+        Nombre total de postings.
+        """
+        return int(self.ptr[-1])
+
+    @property
+    def nbytes(self):
+        """
+        Mémoire occupée par les tableaux (en octets).
+        """
+        return sum(getattr(self, name).nbytes for name in self.ARRAYS)
+
+    def df(self):
+        """
+        Nombre de documents contenant chaque mot.
+        """
+        return np.diff(self.ptr)
+
+    def total_freq(self):
+        """
+        Nombre total d'occurrences de chaque mot.
+        """
+
+        total = np.zeros(len(self), dtype=np.int64)
+        non_vides = np.flatnonzero(np.diff(self.ptr) > 0)
+        if len(non_vides):
+            total[non_vides] = np.add.reduceat(self.tfs.astype(np.int64), self.ptr[non_vides])
+        return total
+
+    def docs(self, j):
+        """
+        Documents contenant le mot j, par identifiant croissant.
+        """
+
+        if j is None or j >= len(self):
+            return np.zeros(0, dtype=np.int64)
+
+        octets = self.doc_bytes[self.byte_ptr[j]:self.byte_ptr[j + 1]]
+        return np.cumsum(octets.view(f"<u{self.widths[j]}"), dtype=np.int64)
+
+    def postings(self, j):
+        """
+        Documents contenant le mot j et TF correspondants.
+        """
+
+        if j is None or j >= len(self):
+            return np.zeros(0, dtype=np.int64), self.tfs[:0]
+        return self.docs(j), self.tfs[self.ptr[j]:self.ptr[j + 1]]
+
+
+class SegmentedPostings:
+    """
+    La classe SegmentedPostings prolonge des postings compressés par des
+    segments couvrant les documents ajoutés ensuite (un CompressedPostings
+    par bloc de documents, numérotés à partir de leur décalage) : un ajout
+    ne compresse que les postings des nouveaux documents. Les listes d'un
+    mot sont la concaténation de celles de chaque segment, déjà ordonnées
+    (segments de documents consécutifs). Le moteur fusionne les segments
+    en reconstruisant ses postings au-delà d'un nombre de segments.
+    """
+
+    def __init__(self, base):
+        """
+        :param base: Postings des premiers documents (CompressedPostings)
+        """
+
+        self._segments = [(0, base)]
+        self.n_docs = base.n_docs
+
+    @property
+    def segments(self):
+        """
+        Nombre de segments (postings de base compris).
+        """
+        return len(self._segments)
+
+    def extend(self, TF):
+        """
+        Ajoute un segment : postings d'un bloc de nouveaux documents.
+
+        :param TF: Lignes TF des nouveaux documents (documents x mots)
+        """
+
+        self._segments.append((self.n_docs, CompressedPostings.from_csc(TF)))
+        self.n_docs += TF.shape[0]
+
+    def __len__(self):
+        return max(len(p) for _, p in self._segments)
+
+    @property
+    def nnz(self):
+        """
+        Nombre total de postings.
+        """
+        return sum(p.nnz for _, p in self._segments)
+
+    @property
+    def nbytes(self):
+        """
+        Mémoire occupée par les tableaux (en octets).
+        """
+        return sum(p.nbytes for _, p in self._segments)
+
+    def _total(self, valeurs):
+        total = np.zeros(len(self), dtype=np.int64)
+        for _, p in self._segments:
+            v = valeurs(p)
+            total[:len(v)] += v
+        return total
+
+    def df(self):
+        """
+        Nombre de documents contenant chaque mot.
+        """
+        return self._total(CompressedPostings.df)
+
+    def total_freq(self):
+        """
+        Nombre total d'occurrences de chaque mot.
+        """
+        return self._total(CompressedPostings.total_freq)
+
+    def docs(self, j):
+        """
+        Documents contenant le mot j, par identifiant croissant.
+        """
+        return np.concatenate([p.docs(j) + decalage for decalage, p in self._segments])
+
+    def postings(self, j):
+        """
+        Documents contenant le mot j et TF correspondants.
+        """
+
+        listes = [p.postings(j) for _, p in self._segments]
+        docs = np.concatenate([d + decalage for (decalage, _), (d, _) in zip(self._segments, listes)])
+        return docs, np.concatenate([tfs for _, tfs in listes])
@@ -1,8 +1,35 @@
 # Corpus.py
+import numpy as np
 import pandas as pd
-from datetime import datetime, timezone
+from collections import Counter
+from collections.abc import Mapping
 import re
 
+from Analyzer import Analyzer
+from DocumentTable import DocumentTable
+
+
+class _CorpusDocuments(Mapping):
+    """
+    Dictionnaire en lecture seule {id_doc: document} des documents d'un
+    corpus, stockés en colonnes dans sa DocumentTable : le document i est
+    la ligne i - 1 de la table.
+    """
+
+    def __init__(self, table):
+        self._table = table
+
+    def __getitem__(self, i):
+        if not isinstance(i, (int, np.integer)) or not 1 <= i <= len(self._table):
+            raise KeyError(i)
+        return self._table[int(i) - 1]
+
+    def __iter__(self):
+        return iter(range(1, len(self._table) + 1))
+
+    def __len__(self):
+        return len(self._table)
+
 
 class Corpus:
     """
@@ -13,36 +40,49 @@ class Corpus:
     - sauvegarder / charger le corpus
     - effectuer des recherches textuelles (search, concordance)
     - calculer des statistiques lexicales
+    - suivre l'évolution temporelle d'un mot
     """
 
-    def __init__(self, nom):
+    def __init__(self, nom, analyzer=None):
         """
         Constructeur du corpus.
 
         :param nom: Nom du corpus
+        :param analyzer: Analyseur de texte partagé avec les moteurs de
+                         recherche (par défaut, un nouvel Analyzer)
         """
         self.nom = nom
 
-        # Dictionnaire des documents : {id_doc: Document}
-        self.documents = {}
+        # Analyseur de texte et textes analysés : {id_doc: identifiants des mots}
+        # Chaque document n'est analysé qu'une fois, à son ajout
+        self.analyzer = analyzer if analyzer is not None else Analyzer()
+        self.doc_tokens = {}
+
+        # Documents stockés en colonnes, et dictionnaire {id_doc: document}
+        # de vues sur les lignes de la table
+        self.table = DocumentTable()
+        self.documents = _CorpusDocuments(self.table)
 
         # Identifiant auto-incrémenté pour les documents
         self.id_doc = 1
 
+        # Compteur de modifications : incrémenté à chaque ajout de document,
+        # il permet aux moteurs de recherche de détecter les nouveaux documents
+        self.generation = 0
+
         # Dictionnaire des auteurs : {nom_auteur: Author}
         self.authors = {}
 
-        # Cache pour accélérer les recherches textuelles
-        self._full_text = None      # texte concaténé de tous les documents
-        self._text_mapping = []     # mapping positions → documents
-
     def add_document(self, doc):
         """
         Ajoute un document au corpus et met à jour les auteurs.
         """
 
-        # Ajout du document avec un identifiant unique
-        self.documents[self.id_doc] = doc
+        # Ajout du document avec un identifiant unique (ligne id_doc - 1)
+        doc = self.table[self.table.append(doc)]
+
+        # Analyse du texte, une seule fois par document
+        self.doc_tokens[self.id_doc] = self.analyzer.to_ids(doc.texte)
 
         # Création de l'auteur s'il n'existe pas encore
         if doc.auteur not in self.authors:
@@ -55,36 +95,18 @@ class Corpus:
         # Incrément de l'identifiant
         self.id_doc += 1
 
-        # Invalidation du cache de recherche
-        self._full_text = None
+        # Signale la modification aux moteurs de recherche (SearchEngine.refresh)
+        self.generation += 1
 
     def afficher_par_date(self, n=5):
         """
         Affiche les n documents les plus récents du corpus.
         """
 
-        # Fonction interne pour parser les dates
-        def parse_date(doc):
-            dt = doc.date
-
-            # Conversion depuis une chaîne de caractères si nécessaire
-            if isinstance(dt, str):
-                try:
-                    dt = datetime.fromisoformat(dt.replace("Z", "+00:00"))
-                except ValueError:
-                    dt = datetime.strptime(dt[:10], '%Y-%m-%d')
-
-            # Normalisation en UTC sans timezone
-            if dt.tzinfo is not None:
-                dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
-
-            return dt
-
-        # Tri des documents par date décroissante
-        docs_tries = sorted(self.documents.values(), key=parse_date, reverse=True)
-
+        # Lignes les plus récentes, lues dans l'index des dates de la table
+        # (dates converties une seule fois, à l'ajout des documents)
         print(f"\n--- {n} documents les plus récents ---")
-        for doc in docs_tries[:n]:
+        for doc in map(self.table.__getitem__, self.table.latest(n).tolist()):
             print(f"{doc.titre} ({doc.date}) - Source : {doc.getType()}")
 
     def afficher_par_titre(self, n=5):
@@ -136,10 +158,11 @@ class Corpus:
         from ArxivDocument import ArxivDocument
 
         # Réinitialisation du corpus
-        self.documents = {}
+        self.table = DocumentTable()
+        self.documents = _CorpusDocuments(self.table)
+        self.doc_tokens = {}
         self.authors = {}
         self.id_doc = 1
-        self._full_text = None
 
         # Reconstruction des documents selon leur type
         for _, row in df.iterrows():
@@ -161,38 +184,87 @@ class Corpus:
 
             self.add_document(doc)
 
-    def search(self, mot_clef, contexte=40):
+    def find_authors(self, nom, prefix=False):
         """
-        Recherche un mot-clé exact dans le corpus avec affichage du contexte.
+        Auteurs dont le nom contient nom, ou commence par nom (insensible
+        à la casse), trouvés dans l'index des auteurs de la table.
+
+        :return: Liste d'objets Author
+        """
+        return [self.authors[a] for a in self.table.find_authors(nom, prefix) if a in self.authors]
+
+    def filter(self, source=None, author=None, start=None, end=None, coauthor=None):
+        """
+        Documents correspondant aux filtres, évalués sur les colonnes et
+        les index de la table des documents.
+
+        :param source: Type de document ("Reddit", "Arxiv"...)
+        :param author: Nom (ou partie du nom) de l'auteur
+        :param start: Date de début (incluse)
+        :param end: Date de fin (incluse)
+        :param coauthor: Nom (ou partie du nom) d'un co-auteur
+        :return: Identifiants des documents retenus
+        """
+
+        mask = self.table.mask(source, author, start, end, coauthor)
+        if mask is None:
+            return list(self.documents)
+        return (np.flatnonzero(mask) + 1).tolist()
+
+    def _text_matches(self, pattern):
+        """
+        Occurrences d'une expression régulière dans le texte concaténé des
+        documents. Le texte est mis en cache par la table des documents
+        (une seule concaténation, reconstruite après un ajout).
+
+        L'index des trigrammes de la table restreint si possible la
+        recherche aux documents candidats : l'expression n'est exécutée
+        que sur leurs textes. Sinon, elle parcourt tout le texte et le
+        document de chaque occurrence est retrouvé par dichotomie dans le
+        tableau des débuts de textes.
+
+        :return: (texte concaténé, liste de (occurrence, ligne du document
+                 dans la table)) ; la ligne est -1 pour une occurrence vide
+                 en fin de texte
         """
 
-        # Construction du cache si nécessaire
-        if self._full_text is None:
-            self._text_mapping = []
-            self._full_text = ""
+        texte, debuts = self.table.full_text()
 
-            for doc in self.documents.values():
-                start = len(self._full_text)
-                self._full_text += doc.texte + "\n"
-                end = len(self._full_text)
-                self._text_mapping.append((start, end, doc))
+        candidats = self.table.trigram_index().candidates(pattern)
+        if candidats is not None:
+            return texte, [
+                (m, r)
+                for r in candidats.tolist()
+                for m in pattern.finditer(texte, debuts[r], debuts[r + 1])
+            ]
+
+        matches = list(pattern.finditer(texte))
+
+        # La dernière entrée des débuts marque la fin du texte : une
+        # occurrence vide à cette position n'appartient à aucun document
+        lignes = np.searchsorted(debuts, [m.start() for m in matches], side="right") - 1
+        lignes[lignes >= len(self.table)] = -1
+        return texte, list(zip(matches, lignes.tolist()))
+
+    def search(self, mot_clef, contexte=40):
+        """
+        Recherche un mot-clé exact dans le corpus avec affichage du contexte.
+        """
 
         # Expression régulière pour recherche du mot entier
         pattern = re.compile(rf"\b{re.escape(mot_clef)}\b", re.IGNORECASE)
 
+        texte, matches = self._text_matches(pattern)
+
         results = []
 
-        for match in pattern.finditer(self._full_text):
+        for match, row in matches:
+            if row < 0:
+                continue
+            titre = self.table.titres[row]
             start, end = match.span()
-            extrait = self._full_text[
-                max(0, start - contexte):min(len(self._full_text), end + contexte)
-            ]
-
-            # Identification du document correspondant
-            for s, e, doc in self._text_mapping:
-                if s <= start < e:
-                    results.append((doc.titre, extrait.strip()))
-                    break
+            extrait = texte[max(0, start - contexte):min(len(texte), end + contexte)]
+            results.append((titre, extrait.strip()))
 
         # Affichage des résultats
         if results:
@@ -209,32 +281,18 @@ class Corpus:
         Génère un concordancier (KWIC) à partir d'une expression régulière.
         """
 
-        # Construction du cache si nécessaire
-        if self._full_text is None:
-            self._text_mapping = []
-            self._full_text = ""
-
-            for doc in self.documents.values():
-                start = len(self._full_text)
-                self._full_text += doc.texte + "\n"
-                end = len(self._full_text)
-                self._text_mapping.append((start, end, doc))
-
         pattern = re.compile(motif, re.IGNORECASE)
+        texte, matches = self._text_matches(pattern)
+
         lignes = []
 
-        for match in pattern.finditer(self._full_text):
+        for match, row in matches:
+            doc_titre = self.table.titres[row] if row >= 0 else None
             start, end = match.span()
 
-            gauche = self._full_text[max(0, start - contexte):start]
+            gauche = texte[max(0, start - contexte):start]
             centre = match.group()
-            droite = self._full_text[end:end + contexte]
-
-            doc_titre = None
-            for s, e, doc in self._text_mapping:
-                if s <= start < e:
-                    doc_titre = doc.titre
-                    break
+            droite = texte[end:end + contexte]
 
             lignes.append({
                 "document": doc_titre,
@@ -255,55 +313,73 @@ class Corpus:
 
     def nettoyer_texte(self, texte):
         """
-        Nettoie un texte :
+        Nettoie un texte avec l'analyseur du corpus :
         - passage en minuscules
-        - suppression ponctuation et chiffres
+        - suppression de la ponctuation
         - normalisation des espaces
         """
-
-        texte = texte.lower()
-        texte = texte.replace("\n", " ")
-        texte = re.sub(r"[^a-zA-Zàâçéèêëîïôùûüÿœæ\s'-]", " ", texte)
-        texte = re.sub(r"\s+", " ", texte)
-
-        return texte.strip()
+        return " ".join(self.analyzer.analyze(texte))
 
     def stats(self, n=10):
         """
-        Calcule les statistiques lexicales :
+        Calcule les statistiques lexicales à partir des textes déjà analysés :
         - vocabulaire
         - fréquence des termes (TF)
         - fréquence documentaire (DF)
         """
 
-        vocab = set()
-        occurences = {}
-        doc_frequency = {}
-
-        for doc in self.documents.values():
-            texte = self.nettoyer_texte(doc.texte)
-            mots = texte.split()
-
-            mots_doc = set(mots)
-            vocab.update(mots_doc)
+        V = len(self.analyzer.terms)
+        tokens = list(self.doc_tokens.values())
 
-            # Document Frequency
-            for mot in mots_doc:
-                doc_frequency[mot] = doc_frequency.get(mot, 0) + 1
+        if tokens:
+            tous = np.concatenate(tokens)
+            uniques = np.concatenate([np.unique(t) for t in tokens])
+        else:
+            tous = uniques = np.zeros(0, dtype=np.int32)
 
-            # Term Frequency
-            for mot in mots:
-                occurences[mot] = occurences.get(mot, 0) + 1
+        # Term Frequency et Document Frequency par identifiant de mot
+        tf = np.bincount(tous, minlength=V)
+        df = np.bincount(uniques, minlength=V)
 
-        print(f"\n📊 Nombre total de mots différents : {len(vocab)}")
+        presents = np.flatnonzero(tf)
+        print(f"\n📊 Nombre total de mots différents : {len(presents)}")
 
         freq = pd.DataFrame({
-            "mot": list(occurences.keys()),
-            "tf": list(occurences.values()),
-            "df": [doc_frequency[m] for m in occurences.keys()]
+            "mot": [self.analyzer.terms[j] for j in presents],
+            "tf": tf[presents],
+            "df": df[presents]
         }).sort_values(by="tf", ascending=False)
 
         print(f"\n🔝 {n} mots les plus fréquents :")
         print(freq.head(n))
 
         return freq
+
+    def evolution(self, mot, doc_ids=None):
+        """
+        Évolution temporelle d'un mot (ou d'une expression) : nombre de
+        documents qui contiennent tous ses termes, par année de publication.
+
+        :param mot: Mot-clé ou liste de mots-clés
+        :param doc_ids: Identifiants des documents à considérer (par défaut tous)
+        :return: Dictionnaire {année: nombre de documents}, trié par année
+        """
+
+        termes = set(self.analyzer.lookup(mot))
+        if len(termes) < len(set(self.analyzer.analyze(mot))) or not termes:
+            return {}
+
+        termes = np.array(sorted(termes), dtype=np.int32)
+        if doc_ids is None:
+            doc_ids = self.documents.keys()
+
+        # Année de chaque document, d'après la colonne des dates de la table
+        epochs = self.table.epochs()
+        annee_doc = epochs.astype("datetime64[s]").astype("datetime64[Y]").astype(np.int64) + 1970
+
+        annees = Counter()
+        for i in doc_ids:
+            if not np.isnan(epochs[i - 1]) and np.isin(termes, self.doc_tokens[i]).all():
+                annees[int(annee_doc[i - 1])] += 1
+
+        return dict(sorted(annees.items()))
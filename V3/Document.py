@@ -5,6 +5,9 @@ class Document:
     (RedditDocument, ArxivDocument, etc.).
     """
 
+    # Attributs fixes : pas de __dict__ par document
+    __slots__ = ("titre", "auteur", "date", "url", "texte")
+
     def __init__(self, titre, auteur, date, url, texte):
         """
         Constructeur de la classe Document.
@@ -0,0 +1,848 @@
+from array import array
+from collections.abc import Sequence
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from ArxivDocument import ArxivDocument
+from AuthorIndex import AuthorIndex
+from Document import Document
+from Postings import union
+from RedditDocument import RedditDocument
+from TrigramIndex import TrigramIndex
+
+
+def _coerce_date(valeur):
+    """
+    Dernier recours : conversion par pandas.to_datetime (formats tels que
+    "April 12, 2015").
+
+    :return: datetime, ou None si la date n'est pas reconnue
+    """
+
+    try:
+        ts = pd.to_datetime(valeur, errors="coerce")
+    except (TypeError, ValueError, OverflowError):
+        return None
+    if not isinstance(ts, pd.Timestamp) or pd.isna(ts):
+        return None
+    return ts.to_pydatetime()
+
+
+@lru_cache(maxsize=4096)
+def _parse_date_string(texte):
+    """
+    Convertit une chaîne de date (ISO, 'AAAA-MM-JJ...', sinon tout format
+    reconnu par pandas). Les documents d'un même texte partageant souvent
+    leur date, les conversions sont mémorisées.
+
+    :return: datetime, ou None si la date n'est pas reconnue
+    """
+
+    try:
+        return datetime.fromisoformat(texte.replace("Z", "+00:00"))
+    except ValueError:
+        pass
+    try:
+        return datetime.strptime(texte[:10], '%Y-%m-%d')
+    except ValueError:
+        return _coerce_date(texte)
+
+
+def parse_date(dt):
+    """
+    Convertit une date de document en datetime naïf exprimé en UTC.
+    Accepte les chaînes (ISO, 'AAAA-MM-JJ...' ou tout format reconnu par
+    pandas, ex. "April 12, 2015"), les dates et les datetimes naïfs ou avec
+    fuseau horaire.
+
+    :return: datetime naïf UTC, ou None si la date est absente ou n'est
+             pas reconnue
+    """
+
+    if dt is None or (isinstance(dt, float) and dt != dt):
+        return None
+
+    # Conversion depuis une chaîne de caractères (ou un autre type) si nécessaire
+    if isinstance(dt, str):
+        dt = _parse_date_string(dt)
+    elif isinstance(dt, (int, float)):
+        return None
+    elif not isinstance(dt, date):
+        dt = _coerce_date(dt)
+    if dt is None:
+        return None
+
+    # Date sans heure : minuit
+    if not isinstance(dt, datetime):
+        dt = datetime.combine(dt, datetime.min.time())
+
+    # Normalisation en UTC sans timezone
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+
+    return dt
+
+
+def _epoch(valeur):
+    """
+    Date d'un document en secondes UTC (NaN si elle est absente).
+    """
+    dt = parse_date(valeur)
+    return dt.replace(tzinfo=timezone.utc).timestamp() if dt else np.nan
+
+
+def _date_string(valeur):
+    """
+    Date d'origine d'un document sous forme de chaîne (ISO 8601 pour les
+    dates et datetimes), None si elle est absente.
+    """
+
+    if valeur is None or (isinstance(valeur, float) and valeur != valeur):
+        return None
+    if hasattr(valeur, "isoformat"):
+        return valeur.isoformat()
+    return str(valeur)
+
+
+def _column(champ):
+    """
+    Propriété d'une vue : lecture et modification d'un champ de sa ligne.
+    """
+    return property(
+        lambda self: self._table.get(self._row, champ),
+        lambda self, valeur: self._table.set(self._row, champ, valeur),
+    )
+
+
+class _StringColumn(Sequence):
+    """
+    Colonne de chaînes en lecture seule, stockée en tableaux NumPy
+    (projetables en mémoire) : octets UTF-8 concaténés, début de chaque
+    chaîne et lignes sans valeur (None). Les chaînes ne sont décodées
+    qu'à la lecture.
+    """
+
+    def __init__(self, data, ptr, none):
+        self._data = data
+        self._ptr = ptr
+        self._none = none
+
+    @staticmethod
+    def encode(values):
+        """
+        Tableaux (octets, débuts, lignes sans valeur) d'une liste de
+        valeurs ; les valeurs qui ne sont pas des chaînes deviennent None.
+        """
+
+        encodees = [v.encode("utf-8") if isinstance(v, str) else b"" for v in values]
+        ptr = np.zeros(len(values) + 1, dtype=np.int64)
+        np.cumsum([len(e) for e in encodees], out=ptr[1:])
+        data = np.frombuffer(b"".join(encodees), dtype=np.uint8)
+        none = np.array([not isinstance(v, str) for v in values], dtype=bool)
+        return data, ptr, none
+
+    def __len__(self):
+        return len(self._none)
+
+    def __getitem__(self, row):
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError(row)
+        if self._none[row]:
+            return None
+        return self._data[self._ptr[row]:self._ptr[row + 1]].tobytes().decode("utf-8")
+
+
+class _RowView:
+    """
+    Attributs communs des vues sur une ligne de DocumentTable. Une vue ne
+    contient que la table et le numéro de ligne ; elle se sérialise
+    (pickle) comme le document autonome correspondant.
+    """
+
+    __slots__ = ()
+
+    titre = _column("titre")
+    auteur = _column("auteur")
+    date = _column("date")
+    url = _column("url")
+    texte = _column("texte")
+
+    def getType(self):
+        return self._table.source(self._row)
+
+    def __reduce__(self):
+        return self._table.constructor(self._row)
+
+
+class _DocumentView(_RowView, Document):
+    __slots__ = ("_table", "_row")
+
+
+class _RedditView(_RowView, RedditDocument):
+    __slots__ = ("_table", "_row")
+
+    nb_comments = _column("nb_comments")
+
+
+class _ArxivView(_RowView, ArxivDocument):
+    __slots__ = ("_table", "_row")
+
+    coauthors = _column("coauthors")
+
+    def add_coauthor(self, coauthor):
+        ArxivDocument.add_coauthor(self, coauthor)
+        # Liste modifiée en place : l'index des auteurs est à reconstruire
+        self._table._invalidate()
+
+
+class _NameRows:
+    """
+    Lignes de chaque nom (auteurs principaux ou co-auteurs) : index des
+    noms (AuthorIndex) et lignes de chaque nom au format CSR (lignes
+    croissantes de tous les noms, début des lignes de chaque nom),
+    prolongés des seules lignes ajoutées à la table (voir add).
+    """
+
+    def __init__(self):
+        self.index = AuthorIndex([])
+        self.lignes = np.zeros(0, dtype=np.int64)
+        self.debut = np.zeros(1, dtype=np.int64)
+
+        # Identifiants des noms (co-auteurs) et nombre de lignes de la
+        # table déjà prises en compte
+        self.ids = {}
+        self.n_rows = 0
+
+    def add(self, noms, codes, lignes, n_rows):
+        """
+        Ajoute des noms et des occurrences de noms.
+
+        :param noms: Nouveaux noms, dont les identifiants suivent ceux des
+                     noms existants
+        :param codes: Identifiant du nom de chaque occurrence
+        :param lignes: Ligne de chaque occurrence, croissantes et
+                       postérieures aux lignes déjà prises en compte
+        :param n_rows: Nombre de lignes de la table prises en compte
+        """
+
+        if noms:
+            self.index.add(noms)
+        N = len(self.index.names)
+
+        # Chaque occurrence est insérée à la fin des lignes de son nom
+        debut = np.concatenate([self.debut, np.full(N + 1 - len(self.debut), self.debut[-1])])
+        ordre = np.argsort(codes, kind="stable")
+        codes, lignes = codes[ordre], lignes[ordre]
+        self.lignes = np.insert(self.lignes, debut[codes + 1], lignes)
+        self.debut = debut + np.searchsorted(codes, np.arange(N + 1))
+        self.n_rows = n_rows
+
+    def rows(self, noms):
+        """
+        Lignes des noms d'identifiants noms, réunies.
+        """
+        return union([self.lignes[self.debut[i]:self.debut[i + 1]] for i in noms.tolist()])
+
+
+class DocumentTable:
+    """
+    La classe DocumentTable stocke des documents en colonnes plutôt qu'en
+    objets individuels :
+    - titres, URL, dates d'origine et textes : listes Python
+    - auteur : identifiant entier (chaque nom n'est stocké qu'une fois)
+    - source : code entier du type de document (voir SOURCES)
+    - date : secondes UTC (NaN si absente)
+    - nombre de commentaires (Reddit) : entier, 0 pour les autres lignes
+    - co-auteurs (ArXiv) : liste, None pour les lignes qui n'en ont pas
+
+    Les documents sont lus à travers des vues légères (__slots__) qui
+    conservent l'interface de Document, RedditDocument et ArxivDocument.
+    Les filtres par source sont des opérations vectorisées sur les
+    colonnes NumPy, construites à la demande ; les filtres par auteur ou
+    co-auteur passent par un index des noms (AuthorIndex) ; les filtres de
+    période et les documents les plus récents sont obtenus par dichotomie
+    dans un index des lignes triées par date.
+
+    Ces structures dérivées sont prolongées des seules lignes ajoutées
+    depuis leur construction, à leur prochaine lecture ; seule la
+    modification d'une ligne (set) les reconstruit.
+    """
+
+    # Types de documents (getType) et classes des vues correspondantes
+    SOURCES = ("Document", "Reddit", "Arxiv")
+    _VIEWS = {"Reddit": _RedditView, "Arxiv": _ArxivView}
+
+    # Colonnes produites par to_columns et reprises par from_columns
+    COLUMNS = ("authors", "sources", "epochs", "strings", "string_ptr", "string_none")
+
+    # Champs stockés dans une liste Python
+    _LISTS = {"titre": "titres", "date": "dates", "url": "urls", "texte": "textes"}
+
+    def __init__(self):
+        self.titres = []
+        self.urls = []
+        self.dates = []
+        self.textes = []
+
+        # Noms d'auteurs internés et auteur de chaque ligne
+        self.author_names = []
+        self._author_ids = {}
+        self._authors = array("i")
+
+        # Types de documents et code de chaque ligne
+        self.sources = list(self.SOURCES)
+        self._sources = array("b")
+
+        self._epochs = array("d")
+        self._nb_comments = array("q")
+        self._coauthors = []
+
+        # Colonnes reprises telles quelles par from_columns (recopiées
+        # au premier ajout ou à la première modification)
+        self._frozen = False
+
+        self._trigrams = None
+        self._invalidate()
+
+    @classmethod
+    def from_columns(cls, columns, author_names, sources):
+        """
+        Table construite directement à partir des colonnes produites par
+        to_columns (tableaux NumPy, éventuellement projetés en mémoire),
+        sans ajout ligne à ligne. Les textes ne sont pas conservés.
+
+        :param columns: {nom: tableau} (voir to_columns)
+        :param author_names: Noms d'auteurs (indices des codes d'auteur)
+        :param sources: Types de documents (indices des codes de source)
+        """
+
+        table = cls()
+        n = len(columns["epochs"])
+
+        for i, liste in enumerate(("titres", "urls", "dates")):
+            setattr(table, liste, _StringColumn(
+                columns["strings"], columns["string_ptr"][i * n:(i + 1) * n + 1],
+                columns["string_none"][i * n:(i + 1) * n]
+            ))
+        table.textes = [None] * n
+
+        table.author_names = list(author_names)
+        table._author_ids = {cls._author_key(a): i for i, a in enumerate(table.author_names)}
+        table._authors = columns["authors"]
+
+        table.sources = list(sources)
+        table._sources = columns["sources"]
+
+        table._epochs = columns["epochs"]
+        table._nb_comments = array("q", bytes(8 * n))
+        table._coauthors = [None] * n
+
+        table._frozen = True
+        return table
+
+    def to_columns(self):
+        """
+        Colonnes de la table en tableaux NumPy, à sauvegarder avec
+        np.save et à recharger par from_columns : codes d'auteur et de
+        source, dates en secondes, titres, URL et dates d'origine (chaînes
+        encodées, dates converties en ISO 8601). Les textes, commentaires
+        et co-auteurs n'en font pas partie.
+
+        :return: {nom: tableau}
+        """
+
+        authors, sources, epochs = self._columns()
+
+        data, ptr, none = _StringColumn.encode(
+            list(self.titres) + list(self.urls) + [_date_string(d) for d in self.dates]
+        )
+        return {
+            "authors": authors,
+            "sources": sources,
+            "epochs": epochs,
+            "strings": data,
+            # Débuts des chaînes de chaque colonne, fin de la dernière comprise
+            "string_ptr": ptr,
+            "string_none": none,
+        }
+
+    def _thaw(self):
+        """
+        Recopie les colonnes reprises par from_columns en colonnes
+        modifiables (listes et tableaux array).
+        """
+
+        if not self._frozen:
+            return
+
+        self.titres = list(self.titres)
+        self.urls = list(self.urls)
+        self.dates = list(self.dates)
+        self._authors = array("i", np.asarray(self._authors, dtype=np.int32).tobytes())
+        self._sources = array("b", np.asarray(self._sources, dtype=np.int8).tobytes())
+        self._epochs = array("d", np.asarray(self._epochs, dtype=np.float64).tobytes())
+        self._frozen = False
+
+    def _invalidate(self):
+        """
+        Réinitialise les structures dérivées des colonnes (tableaux NumPy,
+        index des dates et des auteurs, texte concaténé, masques de
+        filtres), après la modification d'une ligne. L'index des
+        trigrammes est conservé : il n'est remis à zéro que si un texte
+        change (voir set).
+        """
+        self._arrays = None
+        self._date_index = None
+        self._author_index = None
+        self._full_text = None
+        self._masks = {}
+
+    @staticmethod
+    def _author_key(auteur):
+        return auteur if isinstance(auteur, str) else str(auteur)
+
+    def _intern_author(self, auteur):
+        cle = self._author_key(auteur)
+        if cle not in self._author_ids:
+            self._author_ids[cle] = len(self.author_names)
+            self.author_names.append(auteur)
+        return self._author_ids[cle]
+
+    def _source_code(self, source):
+        if source not in self.sources:
+            self.sources.append(source)
+        return self.sources.index(source)
+
+    def append(self, doc):
+        """
+        Ajoute un document (objet Document ou vue d'une autre table,
+        dont la date déjà convertie est reprise).
+
+        :return: Numéro de la ligne ajoutée
+        """
+        return self.append_row(
+            doc.titre, doc.auteur, doc.date, doc.url, doc.texte, doc.getType(),
+            nb_comments=doc.nb_comments if isinstance(doc, RedditDocument) else None,
+            coauthors=doc.coauthors if isinstance(doc, ArxivDocument) else None,
+            epoch=doc._table._epochs[doc._row] if isinstance(doc, _RowView) else None,
+        )
+
+    def append_row(self, titre, auteur, date_, url, texte, source,
+                   nb_comments=None, coauthors=None, epoch=None):
+        """
+        Ajoute une ligne à partir de ses champs.
+
+        :param source: Type du document (getType)
+        :param epoch: Date en secondes UTC, calculée si absente
+        :return: Numéro de la ligne ajoutée
+        """
+
+        self._thaw()
+        row = len(self.titres)
+
+        self.titres.append(titre)
+        self.urls.append(url)
+        self.dates.append(date_)
+        self.textes.append(texte)
+        self._authors.append(self._intern_author(auteur))
+        self._sources.append(self._source_code(source))
+        self._epochs.append(_epoch(date_) if epoch is None else epoch)
+        self._nb_comments.append(nb_comments or 0)
+        self._coauthors.append(coauthors or None)
+
+        # Les structures dérivées sont prolongées à leur prochaine lecture
+        return row
+
+    def extend(self, docs):
+        for doc in docs:
+            self.append(doc)
+
+    def __len__(self):
+        return len(self.titres)
+
+    def __getitem__(self, row):
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError(row)
+
+        cls = self._VIEWS.get(self.source(row), _DocumentView)
+        view = cls.__new__(cls)
+        view._table = self
+        view._row = row
+        return view
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield self[row]
+
+    def source(self, row):
+        """
+        Type du document de la ligne row (getType).
+        """
+        return self.sources[self._sources[row]]
+
+    def get(self, row, champ):
+        """
+        Valeur d'un champ d'une ligne.
+        """
+
+        if champ == "auteur":
+            return self.author_names[self._authors[row]]
+        if champ == "nb_comments":
+            return self._nb_comments[row]
+        if champ == "coauthors":
+            # Liste modifiable en place (ArxivDocument.add_coauthor)
+            if self._coauthors[row] is None:
+                self._coauthors[row] = []
+            return self._coauthors[row]
+        return getattr(self, self._LISTS[champ])[row]
+
+    def set(self, row, champ, valeur):
+        """
+        Modifie un champ d'une ligne.
+        """
+
+        self._thaw()
+        if champ == "auteur":
+            self._authors[row] = self._intern_author(valeur)
+        elif champ == "nb_comments":
+            self._nb_comments[row] = valeur
+        elif champ == "coauthors":
+            self._coauthors[row] = valeur
+        else:
+            getattr(self, self._LISTS[champ])[row] = valeur
+            if champ == "date":
+                self._epochs[row] = _epoch(valeur)
+            elif champ == "texte":
+                self._trigrams = None
+
+        self._invalidate()
+
+    def constructor(self, row):
+        """
+        Classe et arguments du document autonome (Document, RedditDocument
+        ou ArxivDocument) équivalent à la ligne row.
+
+        :return: (classe, arguments du constructeur)
+        """
+
+        args = tuple(self.get(row, champ) for champ in ("titre", "auteur", "date", "url", "texte"))
+        source = self.source(row)
+        if source == "Reddit":
+            return RedditDocument, args + (self.get(row, "nb_comments"),)
+        if source == "Arxiv":
+            return ArxivDocument, args + (list(self._coauthors[row] or []),)
+        return Document, args
+
+    def materialize(self, row):
+        """
+        Document autonome équivalent à la ligne row.
+        """
+        cls, args = self.constructor(row)
+        return cls(*args)
+
+    def _columns(self):
+        """
+        Colonnes NumPy (auteurs, sources, dates), construites à la demande
+        puis prolongées des lignes ajoutées depuis.
+        """
+
+        if self._arrays is None:
+            # Colonnes reprises par from_columns : utilisées sans copie
+            convert = np.asarray if self._frozen else np.array
+            self._arrays = (
+                convert(self._authors, dtype=np.int32),
+                convert(self._sources, dtype=np.int8),
+                convert(self._epochs, dtype=np.float64),
+            )
+        elif len(self._arrays[0]) < len(self):
+            k = len(self._arrays[0])
+            self._arrays = tuple(
+                np.concatenate([tableau, np.array(colonne[k:], dtype=tableau.dtype)])
+                for tableau, colonne in zip(self._arrays, (self._authors, self._sources, self._epochs))
+            )
+        return self._arrays
+
+    def author_codes(self):
+        """
+        Identifiant de l'auteur de chaque ligne (indice dans author_names).
+        """
+        return self._columns()[0]
+
+    def source_codes(self):
+        """
+        Code du type de chaque ligne (indice dans sources).
+        """
+        return self._columns()[1]
+
+    def epochs(self):
+        """
+        Date de chaque ligne en secondes UTC (NaN si absente).
+        """
+        return self._columns()[2]
+
+    def _sorted_dates(self):
+        """
+        Index des dates : lignes datées triées par date croissante (à date
+        égale, par ligne croissante) et dates correspondantes.
+        Construit à la demande, en un seul tri ; les lignes ajoutées
+        depuis y sont ensuite insérées à leur place (dichotomie).
+
+        :return: (numéros de lignes, dates triées en secondes UTC)
+        """
+
+        epochs = self.epochs()
+        if self._date_index is None:
+            k = 0
+            rows, dates = np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64)
+        else:
+            rows, dates, k = self._date_index
+
+        if self._date_index is None or k < len(self):
+            nouvelles = k + np.flatnonzero(~np.isnan(epochs[k:]))
+            nouvelles = nouvelles[np.argsort(epochs[nouvelles], kind="stable")]
+
+            # Après les lignes de même date : les lignes ajoutées les suivent
+            positions = np.searchsorted(dates, epochs[nouvelles], side="right")
+            rows = np.insert(rows, positions, nouvelles)
+            dates = np.insert(dates, positions, epochs[nouvelles])
+            self._date_index = (rows, dates, len(self))
+        return rows, dates
+
+    def date_range(self, start=None, end=None):
+        """
+        Lignes dont la date est comprise entre start et end (incluses),
+        trouvées par dichotomie dans l'index des dates. Les lignes sans
+        date ne sont jamais retenues.
+
+        :param start: Date de début (None : pas de borne)
+        :param end: Date de fin (None : pas de borne)
+        :return: Numéros de lignes, par date croissante
+        """
+
+        rows, dates = self._sorted_dates()
+        debut, fin = 0, len(dates)
+
+        if start:
+            ts, _ = self._date_bound(start)
+            debut = np.searchsorted(dates, ts, side="left")
+
+        if end:
+            ts, inclusive = self._date_bound(end, fin=True)
+            fin = np.searchsorted(dates, ts, side="right" if inclusive else "left")
+
+        return rows[debut:max(debut, fin)]
+
+    def latest(self, n):
+        """
+        Les n lignes les plus récentes, lues à la fin de l'index des dates
+        (les lignes sans date viennent en dernier).
+
+        :return: Numéros de lignes, par date décroissante (à date égale,
+                 par ligne croissante)
+        """
+
+        rows, dates = self._sorted_dates()
+
+        # Fin de l'index, étendue à toutes les lignes de la date la plus
+        # ancienne retenue, puis triée par date décroissante et ligne croissante
+        debut = 0
+        if 0 < n < len(dates):
+            debut = np.searchsorted(dates, dates[-n], side="left")
+        fin_rows, fin_dates = rows[debut:], dates[debut:]
+        recentes = fin_rows[np.lexsort((fin_rows, -fin_dates))][:max(n, 0)]
+        if len(recentes) < n:
+            sans_date = np.flatnonzero(np.isnan(self.epochs()))
+            recentes = np.concatenate([recentes, sans_date[:n - len(recentes)]])
+        return recentes
+
+    def full_text(self):
+        """
+        Textes de toutes les lignes concaténés, chacun suivi d'un saut de
+        ligne, et début de chaque texte dans la chaîne. Construits à la
+        demande, en une seule concaténation, puis prolongés des textes des
+        lignes ajoutées depuis.
+
+        :return: (texte concaténé, tableau des débuts, de taille n + 1)
+        """
+
+        if self._full_text is None:
+            self._full_text = ("", np.zeros(1, dtype=np.int64))
+
+        texte, debuts = self._full_text
+        k = len(debuts) - 1
+        if k < len(self):
+            textes = [t if isinstance(t, str) else "" for t in self.textes[k:]]
+            longueurs = np.fromiter(map(len, textes), dtype=np.int64, count=len(textes))
+            debuts = np.concatenate([debuts, debuts[-1] + np.cumsum(longueurs + 1)])
+            texte += "\n".join(textes) + "\n"
+            self._full_text = (texte, debuts)
+        return self._full_text
+
+    def trigram_index(self):
+        """
+        Index des trigrammes du texte concaténé (voir TrigramIndex),
+        construit à la demande, puis étendu aux seules lignes ajoutées
+        depuis : un ajout ne coûte pas une reconstruction complète.
+        """
+
+        if self._trigrams is None:
+            self._trigrams = TrigramIndex(*self.full_text())
+        elif self._trigrams.n_docs < len(self):
+            self._trigrams.extend(*self.full_text())
+        return self._trigrams
+
+    def _author_lookup(self):
+        """
+        Index des auteurs, construit à la demande puis prolongé des lignes
+        ajoutées depuis : lignes de chaque nom (voir _NameRows) comme
+        auteur principal (mêmes identifiants que author_names) et comme
+        co-auteur (identifiants propres).
+
+        :return: (auteurs principaux, co-auteurs)
+        """
+
+        if self._author_index is None:
+            self._author_index = (_NameRows(), _NameRows())
+
+        auteurs, co = self._author_index
+        k, n = auteurs.n_rows, len(self)
+        if k < n:
+            auteurs.add(self.author_names[len(auteurs.index.names):],
+                        self.author_codes()[k:].astype(np.int64), np.arange(k, n, dtype=np.int64), n)
+
+            noms, co_ids, co_lignes = [], [], []
+            for row in range(k, n):
+                for nom in self._coauthors[row] or ():
+                    cle = self._author_key(nom)
+                    if cle not in co.ids:
+                        co.ids[cle] = len(co.ids)
+                        noms.append(nom)
+                    co_ids.append(co.ids[cle])
+                    co_lignes.append(row)
+            co.add(noms, np.array(co_ids, dtype=np.int64), np.array(co_lignes, dtype=np.int64), n)
+
+        return self._author_index
+
+    def find_authors(self, author, prefix=False):
+        """
+        Noms des auteurs principaux contenant author, ou commençant par
+        author (insensible à la casse).
+        """
+
+        index = self._author_lookup()[0].index
+        noms = index.prefix(author) if prefix else index.search(author)
+        return [self.author_names[i] for i in noms.tolist()]
+
+    def author_rows(self, author, coauthors=False, prefix=False):
+        """
+        Lignes dont l'auteur principal (ou un co-auteur) contient author,
+        ou commence par author (insensible à la casse) : les noms
+        correspondants sont trouvés dans l'index des auteurs, puis leurs
+        lignes réunies.
+
+        :param coauthors: Recherche parmi les co-auteurs plutôt que
+                          parmi les auteurs principaux
+        :param prefix: Recherche par préfixe plutôt que par sous-chaîne
+        :return: Numéros de lignes croissants
+        """
+
+        auteurs, co = self._author_lookup()
+        lignes = co if coauthors else auteurs
+
+        noms = lignes.index.prefix(author) if prefix else lignes.index.search(author)
+        return lignes.rows(noms)
+
+    def _source_mask(self, source):
+        """
+        Masque des lignes d'une source donnée (insensible à la casse),
+        prolongé des lignes ajoutées depuis sa construction.
+        """
+
+        key = ("source", source.lower())
+        mask = self._masks.get(key, np.zeros(0, dtype=bool))
+        if key not in self._masks or len(mask) < len(self):
+            codes = [c for c, s in enumerate(self.sources) if s.lower() == key[1]]
+            mask = np.concatenate([mask, np.isin(self.source_codes()[len(mask):], codes)])
+            self._masks[key] = mask
+        return mask
+
+    def _author_mask(self, author, coauthors=False):
+        """
+        Masque des lignes dont l'auteur (ou un co-auteur) contient la
+        chaîne donnée (insensible à la casse), recalculé à partir de l'index
+        des auteurs après un ajout.
+        """
+
+        key = ("coauthor" if coauthors else "author", author.casefold())
+        if key not in self._masks or len(self._masks[key]) < len(self):
+            mask = np.zeros(len(self), dtype=bool)
+            mask[self.author_rows(author, coauthors)] = True
+            self._masks[key] = mask
+        return self._masks[key]
+
+    @staticmethod
+    def _date_bound(value, fin=False):
+        """
+        Convertit une borne de date en secondes UTC.
+        Une date sans heure (datetime.date, ou chaîne sans heure telle que
+        "2015-06-13" ou "June 13, 2015") couvre toute la journée : la borne
+        de fin est alors exclusive au lendemain minuit.
+
+        :return: (secondes UTC, borne inclusive ?)
+        """
+
+        if isinstance(value, str) and ":" not in value:
+            dt = parse_date(value)
+            if dt is not None and dt.time() == datetime.min.time():
+                value = dt.date()
+
+        jour = isinstance(value, date) and not isinstance(value, datetime)
+        if jour:
+            value = datetime.combine(value, datetime.min.time())
+            if fin:
+                value += timedelta(days=1)
+
+        dt = parse_date(value)
+        if dt is None:
+            raise ValueError(f"Date invalide : {value}")
+        return dt.replace(tzinfo=timezone.utc).timestamp(), not (jour and fin)
+
+    def mask(self, source=None, author=None, start=None, end=None, coauthor=None):
+        """
+        Combine les filtres demandés en un masque booléen sur les lignes.
+
+        :param source: Type de document ("Reddit", "Arxiv"...)
+        :param author: Nom (ou partie du nom) de l'auteur
+        :param start: Date de début (incluse)
+        :param end: Date de fin (incluse)
+        :param coauthor: Nom (ou partie du nom) d'un co-auteur
+        :return: Masque booléen, ou None si aucun filtre n'est demandé
+        """
+
+        mask = None
+
+        def combine(m):
+            return m.copy() if mask is None else mask & m
+
+        if source:
+            mask = combine(self._source_mask(source))
+
+        if author:
+            mask = combine(self._author_mask(author))
+
+        if coauthor:
+            mask = combine(self._author_mask(coauthor, coauthors=True))
+
+        if start or end:
+            periode = np.zeros(len(self), dtype=bool)
+            periode[self.date_range(start, end)] = True
+            mask = combine(periode)
+
+        return mask
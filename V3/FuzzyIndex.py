@@ -0,0 +1,330 @@
+import re
+
+import numpy as np
+
+from Analyzer import Analyzer
+
+
+class FuzzyIndex:
+    """
+    La classe FuzzyIndex retrouve les mots du vocabulaire proches d'un mot
+    inconnu (faute de frappe), à une distance d'édition de 1 ou 2, selon
+    l'algorithme "symmetric delete" :
+    - à la construction, chaque mot est indexé sous toutes les formes
+      obtenues en lui retirant jusqu'à 2 lettres
+    - à la recherche, les formes obtenues de la même manière à partir du
+      mot inconnu désignent les candidats, dont la distance est vérifiée
+
+    Les formes sont conservées sous forme de hachages dans un tableau trié
+    (recherche par np.searchsorted) plutôt que dans un dictionnaire de
+    listes, beaucoup plus coûteux en mémoire. Les hachages (polynomiaux,
+    modulo 2^64) sont calculés sur des tableaux NumPy, sans construire les
+    formes, et ne dépendent pas du processus : l'index peut être
+    sauvegardé avec le moteur (voir ARRAYS).
+    """
+
+    # Tableaux constituant l'index (sauvegardés par SearchEngine.save)
+    ARRAYS = ("hashes", "ids", "levels")
+
+    # Base du hachage polynomial (impaire, donc inversible modulo 2^64 :
+    # retirer une lettre revient à diviser la suite du mot par la base)
+    _BASE = 0x100000001B3
+    _BASE_INV = pow(_BASE, -1, 2 ** 64)
+
+    # Mots d'une requête, toutes casses confondues
+    _WORD_RE = re.compile(Analyzer.TOKEN_RE.pattern, re.IGNORECASE)
+
+    # Longueur minimale d'un mot corrigé à distance 2 : les mots plus
+    # courts ne sont corrigés qu'à distance 1 (à distance 2, un mot court
+    # rare ou récent, absent du vocabulaire, serait remplacé par un mot
+    # fréquent sans rapport, ex. « covid » par « could »)
+    MIN_LENGTH_DISTANCE_2 = 7
+
+    def __init__(self, terms, df, max_distance=2):
+        """
+        :param terms: Mots du vocabulaire, dans l'ordre de leurs identifiants
+                      (liste éventuellement complétée ensuite, voir add)
+        :param df: DF de chaque mot (les mots de DF nul ne sont jamais
+                   proposés) ; l'attribut df peut être remplacé lorsque les
+                   DF changent, sans reconstruire l'index
+        :param max_distance: Distance d'édition maximale (au plus 2)
+        """
+
+        if not 0 <= max_distance <= 2:
+            raise ValueError(f"Distance d'édition non supportée : {max_distance} (au plus 2)")
+
+        self.terms = terms
+        self.df = np.asarray(df)
+        self.max_distance = max_distance
+
+        self._hashes, self._ids, self._levels = self._forms(range(len(terms)))
+
+    @classmethod
+    def from_arrays(cls, terms, df, hashes, ids, levels, max_distance=2):
+        """
+        Index reconstitué à partir de ses tableaux (voir ARRAYS), par
+        exemple projetés en mémoire par SearchEngine.load.
+        """
+
+        index = cls.__new__(cls)
+        index.terms = terms
+        index.df = np.asarray(df)
+        index.max_distance = max_distance
+        index._hashes, index._ids, index._levels = hashes, ids, levels
+        return index
+
+    @property
+    def hashes(self):
+        return self._hashes
+
+    @property
+    def ids(self):
+        return self._ids
+
+    @property
+    def levels(self):
+        return self._levels
+
+    def _forms(self, ids):
+        """
+        Formes des mots ids, triées par hachage.
+
+        :return: (hachages, identifiants, nombre de lettres retirées)
+        """
+
+        ids = np.fromiter(ids, dtype=np.int64)
+        hashes, rangs, levels = self._hash_forms([self.terms[j] for j in ids.tolist()], self.max_distance)
+        return hashes, ids[rangs], levels
+
+    @classmethod
+    def _hash_forms(cls, mots, distance):
+        """
+        Hachages des formes obtenues en retirant jusqu'à distance (au plus
+        2) lettres à chaque mot (aucune forme de moins de 2 lettres n'est
+        réduite davantage). À partir des hachages des préfixes de chaque
+        mot, S(i) = somme des c(t) × base^t pour t < i, la forme privée de
+        la lettre i vaut S(i) + (S(L) - S(i + 1)) / base, et de même pour
+        deux lettres. Les mots sont traités par longueur, toutes leurs
+        formes d'un même niveau en une opération.
+
+        :param mots: Liste de mots
+        :return: (hachages triés, rang du mot dans mots, nombre de lettres
+                 retirées), une seule entrée par forme distincte d'un mot
+        """
+
+        base = np.uint64(cls._BASE)
+        inverse = np.uint64(cls._BASE_INV)
+        inverse2 = np.uint64(cls._BASE_INV ** 2 % 2 ** 64)
+
+        longueurs = np.array([len(m) for m in mots], dtype=np.int64)
+        codes = np.frombuffer("".join(mots).encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+        debuts = np.concatenate([[0], np.cumsum(longueurs)])
+
+        # Hachages des préfixes : sommes cumulées de c(t) × base^t, où t est
+        # la position de la lettre dans son mot (arithmétique modulo 2^64)
+        L_max = int(longueurs.max()) if len(mots) else 0
+        puissances = np.cumprod(np.full(L_max + 1, base, dtype=np.uint64)) * inverse
+        positions = np.arange(len(codes)) - np.repeat(debuts[:-1], longueurs)
+        cumul = np.concatenate([[np.uint64(0)], np.cumsum(codes * puissances[positions], dtype=np.uint64)])
+
+        hashes, rangs, levels = [], [], []
+        for L in np.unique(longueurs).tolist():
+            groupe = np.flatnonzero(longueurs == L)
+            premiers = debuts[groupe]
+            S = cumul[premiers[:, None] + np.arange(L + 1)] - cumul[premiers][:, None]
+            fin = S[:, [L]]
+
+            formes = [fin]
+            if distance >= 1 and L >= 2:
+                i = np.arange(L)
+                formes.append(S[:, i] + (fin - S[:, i + 1]) * inverse)
+            if distance >= 2 and L >= 3:
+                i, j = np.triu_indices(L, 1)
+                formes.append(S[:, i] + (S[:, j] - S[:, i + 1]) * inverse + (fin - S[:, j + 1]) * inverse2)
+
+            for niveau, h in enumerate(formes):
+                hashes.append(cls._mix(h.ravel(), L - niveau))
+                rangs.append(np.repeat(groupe, h.shape[1]))
+                levels.append(np.full(h.size, niveau, dtype=np.int8))
+
+        if not hashes:
+            return np.zeros(0, dtype=np.uint64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int8)
+
+        hashes = np.concatenate(hashes)
+        rangs = np.concatenate(rangs)
+        levels = np.concatenate(levels)
+
+        # Tri par hachage, puis une seule entrée par forme distincte d'un
+        # mot (celle du plus petit niveau)
+        ordre = np.lexsort((levels, rangs, hashes))
+        hashes, rangs, levels = hashes[ordre], rangs[ordre], levels[ordre]
+        distinct = np.ones(len(hashes), dtype=bool)
+        distinct[1:] = (hashes[1:] != hashes[:-1]) | (rangs[1:] != rangs[:-1])
+        return hashes[distinct], rangs[distinct], levels[distinct]
+
+    @staticmethod
+    def _mix(h, longueur):
+        """
+        Mélange final des hachages (splitmix64), la longueur de la forme
+        comprise.
+        """
+
+        h = h ^ np.uint64(longueur * 0x9E3779B97F4A7C15 % 2 ** 64)
+        h = (h ^ (h >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        h = (h ^ (h >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return h ^ (h >> np.uint64(31))
+
+    def add(self, ids):
+        """
+        Indexe des mots ajoutés à la liste terms depuis la construction,
+        sans reconstruire l'index : leurs formes sont insérées à leur place
+        dans les tableaux triés.
+
+        :param ids: Identifiants des nouveaux mots
+        """
+
+        hashes, mots, levels = self._forms(ids)
+        if not len(hashes):
+            return
+
+        positions = np.searchsorted(self._hashes, hashes)
+        self._hashes = np.insert(self._hashes, positions, hashes)
+        self._ids = np.insert(self._ids, positions, mots)
+        self._levels = np.insert(self._levels, positions, levels)
+
+    @staticmethod
+    def distance(a, b, limite):
+        """
+        Distance de Damerau-Levenshtein restreinte (insertion, suppression,
+        substitution, transposition de deux lettres voisines), avec arrêt
+        dès que limite est dépassée.
+
+        :return: Distance, ou limite + 1 si elle est supérieure à limite
+        """
+
+        if abs(len(a) - len(b)) > limite:
+            return limite + 1
+
+        avant = None
+        precedente = list(range(len(b) + 1))
+
+        for i in range(1, len(a) + 1):
+            courante = [i] + [0] * len(b)
+            for j in range(1, len(b) + 1):
+                cout = 0 if a[i - 1] == b[j - 1] else 1
+                courante[j] = min(
+                    precedente[j] + 1,
+                    courante[j - 1] + 1,
+                    precedente[j - 1] + cout,
+                )
+                if (i > 1 and j > 1 and a[i - 1] == b[j - 2]
+                        and a[i - 2] == b[j - 1]):
+                    courante[j] = min(courante[j], avant[j - 2] + 1)
+
+            if min(courante) > limite:
+                return limite + 1
+            avant, precedente = precedente, courante
+
+        return precedente[-1] if precedente[-1] <= limite else limite + 1
+
+    def lookup(self, mot):
+        """
+        Mot du vocabulaire le plus proche d'un mot inconnu : plus petite
+        distance, puis plus grand DF. Les mots de moins de
+        MIN_LENGTH_DISTANCE_2 lettres ne sont corrigés qu'à distance 1.
+
+        :return: (identifiant du mot, distance), ou None si aucun mot
+                 n'est assez proche
+        """
+
+        if len(mot) >= self.MIN_LENGTH_DISTANCE_2:
+            limite = self.max_distance
+        else:
+            limite = min(1, self.max_distance)
+
+        # Candidats : mots ayant une forme commune avec le mot inconnu,
+        # chacune obtenue en retirant au plus limite lettres. Si dq lettres
+        # sont retirées au mot inconnu et dt au candidat, leur distance
+        # est au plus dq + dt (borne conservée pour chaque candidat).
+        bornes = {}
+        cles, _, niveaux = self._hash_forms([mot], limite)
+        debut = np.searchsorted(self._hashes, cles, side="left")
+        fin = np.searchsorted(self._hashes, cles, side="right")
+        for dq, d, f in zip(niveaux.tolist(), debut.tolist(), fin.tolist()):
+            for j, dt in zip(self._ids[d:f].tolist(), self._levels[d:f].tolist()):
+                if dt <= limite and bornes.get(j, limite + 3) > dq + dt:
+                    bornes[j] = dq + dt
+
+        # Seuls les mots présents dans des documents sont proposés
+        bornes = {j: d for j, d in bornes.items() if j < len(self.df) and self.df[j] > 0}
+
+        # Examen par DF décroissant : un candidat n'est vérifié que s'il peut
+        # encore battre le meilleur (distance plus petite, ou égale avec un
+        # DF plus grand) ; une borne de 0 ou 1 est la distance exacte
+        meilleur = None
+        for j in sorted(bornes, key=lambda j: (-self.df[j], j)):
+            borne = bornes[j]
+            minimum = min(borne, 1)
+            if meilleur is not None and (minimum, -self.df[j], j) >= meilleur:
+                continue
+
+            dist = borne if borne <= 1 else self.distance(mot, self.terms[j], limite)
+            if dist <= limite and (meilleur is None or (dist, -self.df[j], j) < meilleur):
+                meilleur = (dist, -self.df[j], j)
+
+        if meilleur is None:
+            return None
+        return meilleur[2], meilleur[0]
+
+    @classmethod
+    def unknown_words(cls, query, analyzer):
+        """
+        Mots d'une requête absents du vocabulaire, hors opérateurs et
+        motifs à jokers. Ne nécessite pas l'index : une requête sans mot
+        inconnu n'a pas à le construire.
+
+        :param query: Requête utilisateur
+        :param analyzer: Analyseur du texte (vocabulaire des mots connus)
+        :return: Liste de (occurrence dans la requête, mot analysé)
+        """
+
+        inconnus = []
+
+        for m in cls._WORD_RE.finditer(query):
+            # Les motifs à jokers ne sont pas corrigés
+            if query[m.end():m.end() + 1] in ("*", "?") or query[m.start() - 1:m.start()] in ("*", "?"):
+                continue
+
+            termes = analyzer.analyze(m.group(0))
+            if len(termes) == 1 and termes[0] not in analyzer.term_ids:
+                inconnus.append((m, termes[0]))
+
+        return inconnus
+
+    def correct(self, query, analyzer):
+        """
+        Requête dans laquelle chaque mot absent du vocabulaire est remplacé
+        par le mot le plus proche (suggestion « Vouliez-vous dire »), sous
+        sa forme d'origine plutôt que sa racine (voir Analyzer.surface). Les
+        opérateurs, guillemets et motifs à jokers sont conservés tels quels.
+
+        :param query: Requête utilisateur
+        :param analyzer: Analyseur du texte (vocabulaire des mots connus)
+        :return: Requête corrigée, ou None si aucun mot n'a été corrigé
+        """
+
+        morceaux = []
+        fin = 0
+
+        for m, terme in self.unknown_words(query, analyzer):
+            trouve = self.lookup(terme)
+            if trouve is None:
+                continue
+
+            morceaux.append(query[fin:m.start()])
+            morceaux.append(analyzer.surface(trouve[0]))
+            fin = m.end()
+
+        if not morceaux:
+            return None
+        return "".join(morceaux) + query[fin:]
@@ -0,0 +1,110 @@
+import numpy as np
+
+
+class PositionalIndex:
+    """
+    La classe PositionalIndex implémente un index positionnel : pour chaque
+    mot, la liste des couples (document, position) où il apparaît, triés
+    par document puis par position.
+
+    Les phrases exactes et les contraintes de proximité sont résolues par
+    intersection de ces listes, sans parcourir le texte des documents.
+    """
+
+    def __init__(self, tokens, ptr, V):
+        """
+        Construit l'index à partir des textes analysés de tous les documents.
+
+        :param tokens: Identifiants de mots de tous les documents, concaténés
+        :param ptr: Début du document i dans tokens (ptr[i] .. ptr[i + 1] - 1)
+        :param V: Taille du vocabulaire
+        """
+
+        tokens = np.asarray(tokens, dtype=np.int64)
+        lengths = np.diff(ptr)
+        N = len(lengths)
+
+        # Document et position de chaque occurrence
+        docs = np.repeat(np.arange(N, dtype=np.int64), lengths)
+        positions = np.arange(len(tokens), dtype=np.int64) - np.repeat(ptr[:-1], lengths)
+
+        # Tri stable par mot : l'ordre (document, position) est conservé
+        ordre = np.argsort(tokens, kind="stable")
+        self.docs = docs[ordre]
+        self.positions = positions[ordre]
+
+        # Postings du mot j : indices ptr[j] .. ptr[j + 1] - 1
+        self.ptr = np.concatenate([[0], np.cumsum(np.bincount(tokens, minlength=V))])
+
+        self.n_docs = N
+        self.max_len = int(lengths.max()) if N > 0 else 0
+
+    def _postings(self, j):
+        """
+        Documents et positions du mot j.
+        """
+
+        if j is None or j >= len(self.ptr) - 1:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+        debut, fin = self.ptr[j], self.ptr[j + 1]
+        return self.docs[debut:fin], self.positions[debut:fin]
+
+    def phrase(self, ids):
+        """
+        Documents contenant les mots ids consécutivement et dans l'ordre.
+
+        Chaque occurrence est codée par une clé document × largeur + position
+        du début de phrase ; les clés des mots successifs sont intersectées.
+
+        :param ids: Identifiants des mots de la phrase (None pour un mot inconnu)
+        :return: Indices croissants des documents
+        """
+
+        largeur = self.max_len + 1
+        cles = None
+
+        for decalage, j in enumerate(ids):
+            docs, positions = self._postings(j)
+
+            # Le i-ème mot d'une phrase ne peut pas être avant la position i
+            valides = positions >= decalage
+            k = docs[valides] * largeur + positions[valides] - decalage
+
+            cles = k if cles is None else np.intersect1d(cles, k, assume_unique=True)
+            if len(cles) == 0:
+                break
+
+        if cles is None:
+            return np.zeros(0, dtype=np.int64)
+        return np.unique(cles // largeur)
+
+    def near(self, a, b, n):
+        """
+        Documents où les mots a et b apparaissent à au plus n positions
+        d'écart, dans un ordre quelconque.
+
+        :return: Indices croissants des documents
+        """
+
+        docs_a, pos_a = self._postings(a)
+        docs_b, pos_b = self._postings(b)
+        if len(docs_a) == 0 or len(docs_b) == 0:
+            return np.zeros(0, dtype=np.int64)
+
+        # Clés triées ; la largeur sépare deux documents de plus de n positions
+        largeur = self.max_len + n + 1
+        cles_a = docs_a * largeur + pos_a
+        cles_b = docs_b * largeur + pos_b
+
+        # Occurrence de a la plus proche de chaque occurrence de b
+        idx = np.searchsorted(cles_a, cles_b)
+        proche = np.zeros(len(cles_b), dtype=bool)
+
+        apres = idx < len(cles_a)
+        proche[apres] = cles_a[idx[apres]] - cles_b[apres] <= n
+
+        avant = idx > 0
+        proche[avant] |= cles_b[avant] - cles_a[idx[avant] - 1] <= n
+
+        return np.unique(docs_b[proche])
@@ -0,0 +1,68 @@
+import numpy as np
+
+
+# Opérations ensemblistes sur des listes de postings : tableaux NumPy
+# d'identifiants de documents, triés et sans doublons.
+
+EMPTY = np.zeros(0, dtype=np.int64)
+
+
+def intersect(a, b):
+    """
+    Intersection de deux listes de postings.
+
+    Chaque document de la liste la plus courte est recherché par dichotomie
+    dans la plus longue (np.searchsorted) : le coût est en
+    O(m log n) pour des listes de tailles m <= n, au lieu de O(m + n) pour
+    une fusion, ce qui favorise les requêtes sélectives.
+    """
+
+    if len(a) > len(b):
+        a, b = b, a
+    if len(a) == 0:
+        return EMPTY
+
+    idx = np.searchsorted(b, a)
+    idx[idx == len(b)] = 0
+    return a[b[idx] == a]
+
+
+def intersect_all(lists):
+    """
+    Intersection de plusieurs listes, de la plus courte à la plus longue :
+    les résultats intermédiaires ne peuvent que diminuer.
+    """
+
+    lists = sorted(lists, key=len)
+    result = lists[0]
+    for p in lists[1:]:
+        if len(result) == 0:
+            break
+        result = intersect(result, p)
+    return result
+
+
+def union(lists):
+    """
+    Union de plusieurs listes de postings (fusion triée, sans doublons).
+    """
+
+    lists = [p for p in lists if len(p)]
+    if not lists:
+        return EMPTY
+    if len(lists) == 1:
+        return lists[0]
+    return np.unique(np.concatenate(lists))
+
+
+def difference(a, b):
+    """
+    Documents de a absents de b (recherche dichotomique dans b).
+    """
+
+    if len(a) == 0 or len(b) == 0:
+        return a
+
+    idx = np.searchsorted(b, a)
+    idx[idx == len(b)] = 0
+    return a[b[idx] != a]
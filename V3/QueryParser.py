@@ -0,0 +1,216 @@
+import re
+
+
+# Éléments d'une requête : phrase entre guillemets, opérateur de
+# proximité NEAR/n, ou mot
+_ELEMENT_RE = re.compile(r'"([^"]*)"?|NEAR/(\d+)|(\S+)')
+
+
+def parse_query(query):
+    """
+    Découpe une requête utilisateur en :
+    - texte libre : tous les mots de la requête (phrases comprises),
+      utilisés pour le classement TF-IDF / BM25
+    - phrases exactes : texte entre guillemets, ex. "neural network"
+    - contraintes de proximité : mot NEAR/n mot (au plus n positions
+      d'écart, dans un ordre quelconque) ; "a NEAR/2 b NEAR/5 c"
+      donne deux contraintes (a, b) et (b, c)
+
+    :param query: Requête utilisateur
+    :return: (texte libre, liste des phrases, liste des (mot, mot, n))
+    """
+
+    elements = []
+    for phrase, near, mot in _ELEMENT_RE.findall(query):
+        if near:
+            elements.append(("near", int(near)))
+        elif mot:
+            elements.append(("mot", mot))
+        elif phrase.strip():
+            elements.append(("phrase", phrase))
+
+    mots, phrases, proximites = [], [], []
+
+    for i, (kind, value) in enumerate(elements):
+        if kind == "near":
+            # Un opérateur NEAR doit relier deux mots
+            if 0 < i < len(elements) - 1 and elements[i - 1][0] == elements[i + 1][0] == "mot":
+                proximites.append((elements[i - 1][1], elements[i + 1][1], value))
+            continue
+
+        mots.append(value)
+        if kind == "phrase":
+            phrases.append(value)
+
+    return " ".join(mots), phrases, proximites
+
+
+# Opérateurs booléens (en majuscules, pour ne pas les confondre avec
+# les mots "and", "or", "not" du texte)
+OPERATORS = ("AND", "OR", "NOT")
+
+# Éléments d'une requête booléenne : parenthèses en plus
+_BOOLEAN_RE = re.compile(r'"([^"]*)"?|NEAR/(\d+)|([()])|([^\s()"]+)')
+
+
+def parse_boolean(query):
+    """
+    Analyse une requête booléenne, ex. transformer AND NOT vision,
+    (tax OR taxes) AND "middle class".
+
+    Priorité des opérateurs : NEAR, puis NOT, puis AND, puis OR ; deux
+    éléments juxtaposés sont reliés par AND.
+
+    :param query: Requête utilisateur
+    :return: Arbre de la requête, None si elle ne contient aucun opérateur
+             booléen. Nœuds : ("mot", mot), ("phrase", texte),
+             ("near", mot, mot, n), ("and", (nœuds,)), ("or", (nœuds,)),
+             ("not", nœud)
+    :raises ValueError: Requête mal formée
+    """
+
+    elements = []
+    for phrase, near, paren, mot in _BOOLEAN_RE.findall(query):
+        if near:
+            elements.append(("near", int(near)))
+        elif paren:
+            elements.append((paren, paren))
+        elif mot in OPERATORS:
+            elements.append((mot, mot))
+        elif mot:
+            elements.append(("mot", mot))
+        elif phrase.strip():
+            elements.append(("phrase", phrase))
+
+    if not any(kind in OPERATORS for kind, _ in elements):
+        return None
+
+    parser = _BooleanParser(elements)
+    tree = parser.parse_or()
+    if parser.pos < len(elements):
+        raise ValueError(f"Requête booléenne mal formée près de : {elements[parser.pos][1]}")
+    return tree
+
+
+class _BooleanParser:
+    """
+    Analyseur descendant récursif des requêtes booléennes.
+    """
+
+    def __init__(self, elements):
+        self.elements = elements
+        self.pos = 0
+
+    def _peek(self):
+        return self.elements[self.pos][0] if self.pos < len(self.elements) else None
+
+    def _next(self):
+        element = self.elements[self.pos]
+        self.pos += 1
+        return element
+
+    def parse_or(self):
+        noeuds = [self.parse_and()]
+        while self._peek() == "OR":
+            self._next()
+            noeuds.append(self.parse_and())
+        return noeuds[0] if len(noeuds) == 1 else ("or", tuple(noeuds))
+
+    def parse_and(self):
+        noeuds = [self.parse_not()]
+        while self._peek() not in (None, "OR", ")"):
+            if self._peek() == "AND":
+                self._next()
+            noeuds.append(self.parse_not())
+        return noeuds[0] if len(noeuds) == 1 else ("and", tuple(noeuds))
+
+    def parse_not(self):
+        if self._peek() == "NOT":
+            self._next()
+            return ("not", self.parse_not())
+        return self.parse_atom()
+
+    def parse_atom(self):
+        kind = self._peek()
+
+        if kind == "(":
+            self._next()
+            noeud = self.parse_or()
+            if self._peek() != ")":
+                raise ValueError("Parenthèse fermante manquante")
+            self._next()
+            return noeud
+
+        if kind == "phrase":
+            return self._next()
+
+        if kind != "mot":
+            valeur = self.elements[self.pos][1] if kind else "fin de requête"
+            if kind == "near":
+                valeur = f"NEAR/{valeur}"
+            raise ValueError(f"Mot attendu dans la requête booléenne : {valeur}")
+
+        _, mot = self._next()
+
+        # Chaîne de proximité : a NEAR/n b NEAR/m c
+        proximites = []
+        while self._peek() == "near":
+            _, n = self._next()
+            if self._peek() != "mot":
+                raise ValueError("NEAR doit relier deux mots")
+            _, suivant = self._next()
+            proximites.append(("near", mot, suivant, n))
+            mot = suivant
+
+        if not proximites:
+            return ("mot", mot)
+        return proximites[0] if len(proximites) == 1 else ("and", tuple(proximites))
+
+
+def positive_terms(tree):
+    """
+    Texte des mots et phrases d'un arbre booléen qui ne sont pas sous un
+    NOT : ce sont eux qui servent au classement.
+    """
+
+    kind = tree[0]
+    if kind == "not":
+        return []
+    if kind in ("mot", "phrase"):
+        return [tree[1]]
+    if kind == "near":
+        return [tree[1], tree[2]]
+    return [m for noeud in tree[1] for m in positive_terms(noeud)]
+
+
+def is_pattern(mot):
+    """
+    Vrai si le mot de requête contient un joker (* ou ?).
+    """
+    return "*" in mot or "?" in mot
+
+
+def split_patterns(texte):
+    """
+    Sépare les mots ordinaires d'un texte de requête et ses motifs à
+    jokers (optim*, learn?ng).
+
+    :return: (texte sans les motifs, liste des motifs)
+    """
+
+    mots, motifs = [], []
+    for mot in texte.split():
+        (motifs if is_pattern(mot) else mots).append(mot)
+    return " ".join(mots), motifs
+
+
+def query_text(query):
+    """
+    Texte libre d'une requête, utilisé pour le classement TF-IDF / BM25 :
+    mots positifs d'une requête booléenne, sinon tous les mots.
+    """
+
+    tree = parse_boolean(query)
+    if tree is not None:
+        return " ".join(positive_terms(tree))
+    return parse_query(query)[0]
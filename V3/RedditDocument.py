@@ -1,6 +1,8 @@
 from Document import Document
 
 class RedditDocument(Document):
+    __slots__ = ("nb_comments",)
+
     def __init__(self, titre, auteur, date, url, texte, nb_comments=0):
         super().__init__(titre, auteur, date, url, texte)
         self.nb_comments = nb_comments
@@ -1,7 +1,81 @@
 import numpy as np
+import json
 import math
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
 from scipy import sparse
 
+from Analyzer import Analyzer
+from CompressedPostings import CompressedPostings, SegmentedPostings
+from DocumentTable import DocumentTable
+from FuzzyIndex import FuzzyIndex
+from PositionalIndex import PositionalIndex
+from Postings import EMPTY, difference, intersect_all, union
+from QueryParser import is_pattern, parse_boolean, parse_query, query_text, split_patterns
+from StopWords import stopword_list
+from TermDictionary import TermDictionary
+from TopK import top_k
+
+
+class _TokenStore:
+    """
+    Textes analysés des documents indexés (identifiants de mots), conservés
+    pour l'index positionnel : un flux unique (tableau concaténé et début de
+    chaque document), complété par les documents ajoutés ensuite.
+    """
+
+    def __init__(self, tokens=None, ptr=None):
+        self._tokens = np.zeros(0, dtype=np.int32) if tokens is None else tokens
+        self._ptr = np.zeros(1, dtype=np.int64) if ptr is None else ptr
+        self._added = []
+
+    def __len__(self):
+        return len(self._ptr) - 1 + len(self._added)
+
+    def extend(self, tokens):
+        self._added.extend(tokens)
+
+    def stream(self):
+        """
+        :return: (identifiants concaténés, début de chaque document)
+        """
+
+        if self._added:
+            lengths = [len(t) for t in self._added]
+            self._tokens = np.concatenate(
+                [self._tokens] + [np.asarray(t, dtype=np.int32) for t in self._added]
+            )
+            self._ptr = np.concatenate([self._ptr, self._ptr[-1] + np.cumsum(lengths)])
+            self._added = []
+
+        return self._tokens, self._ptr
+
+
+class _VocabularyView(Mapping):
+    """
+    Vue en lecture seule du vocabulaire d'un moteur, sous la forme
+    {mot: {"id", "total_freq", "df"}}. Les statistiques sont lues dans les
+    tableaux du moteur : chaque accès crée le petit dict correspondant.
+    """
+
+    def __init__(self, engine):
+        self._engine = engine
+
+    def __getitem__(self, mot):
+        engine = self._engine
+        j = engine.analyzer.term_ids.get(mot)
+        if j is None or j >= len(engine._terms):
+            raise KeyError(mot)
+        return {"id": j, "total_freq": int(engine._total_freq[j]), "df": int(engine._df[j])}
+
+    def __iter__(self):
+        return iter(self._engine._terms)
+
+    def __len__(self):
+        return len(self._engine._terms)
+
 
 class SearchEngine:
     """
@@ -10,154 +84,1444 @@ class SearchEngine:
     - IDF (Inverse Document Frequency)
     - TF-IDF
     - Similarité cosinus entre requête et documents
+    - BM25 (Okapi), sélectionnable par moteur ou par requête
+    - phrases exactes ("neural network") et proximité (mot NEAR/3 mot),
+      résolues par un index positionnel
+    - requêtes booléennes (AND, OR, NOT), évaluées sur les postings
+    - motifs à jokers (optim*, learn?ng), développés en mots du vocabulaire
+    - tolérance aux fautes de frappe : un mot inconnu est remplacé par le
+      mot du vocabulaire le plus proche (distance d'édition 1 ou 2)
     """
 
-    def __init__(self, corpus):
+    # Modèles de pondération disponibles
+    MODELS = ("tfidf", "bm25")
+
+    # Statistiques utilisées pour l'IDF d'une recherche filtrée
+    IDF_SCOPES = ("global", "filtered")
+
+    def __init__(self, corpus, model="tfidf", k1=1.2, b=0.75, idf_scope="global",
+                 cache_size=128, stopwords=None, max_df=None, max_expansions=50,
+                 fuzzy=True):
         """
         Initialise le moteur de recherche à partir d'un corpus.
 
         :param corpus: Objet Corpus contenant les documents
+        :param model: Modèle de pondération par défaut ("tfidf" ou "bm25")
+        :param k1: Paramètre de saturation de la fréquence des termes (BM25)
+        :param b: Paramètre de normalisation par la longueur (BM25)
+        :param idf_scope: Statistiques IDF des recherches filtrées :
+                          "global" (tout le corpus) ou "filtered"
+                          (documents retenus par les filtres)
+        :param cache_size: Nombre maximal de résultats de recherche gardés
+                           en cache (0 pour désactiver le cache)
+        :param stopwords: Langue(s) des mots vides retirés de l'index et
+                          des requêtes ("en", "fr", ("en", "fr")) ou None
+        :param max_df: Liste automatique de mots vides : mots présents dans
+                       plus de max_df × N documents du corpus initial
+                       (fraction entre 0 et 1, None pour désactiver)
+        :param max_expansions: Nombre maximal de mots (les plus fréquents)
+                               retenus pour un motif à jokers
+        :param fuzzy: Correction des mots de requête absents du vocabulaire
         """
+        if model not in self.MODELS:
+            raise ValueError(f"Modèle inconnu : {model} (attendu : {self.MODELS})")
+        if idf_scope not in self.IDF_SCOPES:
+            raise ValueError(f"Portée IDF inconnue : {idf_scope} (attendu : {self.IDF_SCOPES})")
+        if max_df is not None and not 0 < max_df <= 1:
+            raise ValueError(f"max_df doit être compris entre 0 et 1 : {max_df}")
+
         self.corpus = corpus
+        self.model = model
+        self.k1 = k1
+        self.b = b
+        self.idf_scope = idf_scope
+        self.max_expansions = max_expansions
+        self.fuzzy = fuzzy
+
+        # Cache LRU des résultats de recherche
+        self._init_cache(cache_size)
+
+        # Documents stockés en colonnes (métadonnées des résultats et des
+        # filtres) : table du corpus, partagée sans copie (le document i est
+        # la ligne i - 1, comme la ligne i - 1 de la matrice TF)
+        self.documents = corpus.table
+
+        # Analyseur partagé avec le corpus : mêmes mots, mêmes identifiants
+        self.analyzer = corpus.analyzer
 
-        # Liste des documents du corpus
-        self.documents = list(corpus.documents.values())
+        # Position du moteur dans l'historique du corpus : les documents
+        # ajoutés ensuite (identifiants >= _next_doc_id) seront indexés
+        # de manière incrémentale par refresh()
+        self._generation = corpus.generation
+        self._next_doc_id = corpus.id_doc
 
-        # Construction du vocabulaire
-        self.vocab = self._build_vocab()
+        # Blocs de lignes TF ajoutés depuis la dernière reconstruction
+        # des pondérations (voir add_documents / refresh)
+        self._pending_TF = []
 
-        # Matrice TF (documents x mots)
-        self.mat_TF = self._build_TF_matrix()
+        # Statistiques de collection imposées (voir set_collection_stats)
+        self._collection_stats = None
+
+        # Vocabulaire : mots par identifiant (l'identifiant d'un mot est
+        # donné par le lexique de l'analyseur), DF et fréquence totale
+        self._terms = []
+        self._df = np.zeros(0, dtype=np.int64)
+        self._total_freq = np.zeros(0, dtype=np.int64)
+
+        # Mots vides (analysés comme les textes, donc racinisés si besoin),
+        # masque des identifiants correspondants et nombre de postings retirés
+        self.stopwords, mots_vides = stopword_list(stopwords)
+        self.max_df = max_df
+        self._stop_terms = set(self.analyzer.analyze(" ".join(sorted(mots_vides))))
+        self._stop_mask = np.zeros(0, dtype=bool)
+        self._pruned_postings = 0
+
+        # Verrou des structures construites à la demande (index
+        # positionnel, dictionnaire trié des mots) et de l'index des fautes
+        # de frappe
+        self._lazy_lock = threading.Lock()
+        self._term_dict = None
+        self._fuzzy_index = None
+
+        # Construction en une seule passe à partir des textes déjà analysés
+        # par le corpus : la matrice TF (documents x mots) est remplie
+        # directement, sans re-tokenisation
+        tokens = [corpus.doc_tokens[i] for i in corpus.documents]
+        self.mat_TF = self._index_batch(tokens)
+
+        # Textes analysés conservés pour l'index positionnel, construit
+        # à la première requête contenant une phrase ou un NEAR
+        self._doc_tokens = _TokenStore()
+        self._doc_tokens.extend(tokens)
+        self._positions = None
 
         # Mise à jour des statistiques du vocabulaire (TF total et DF)
         self._update_vocab_stats()
 
-        # Matrice TF-IDF
-        self.mat_TFIDF = self._build_TFIDF_matrix(self.mat_TF)
+        # Liste automatique : mots présents dans trop de documents
+        if max_df is not None:
+            self._prune_terms(self._frequent_terms(max_df))
+
+        # Pondérations dérivées de TF (TF-IDF, normes, BM25)
+        self._build_weights()
+
+        # Index des fautes de frappe, construit avec le vocabulaire (les
+        # nouveaux mots y sont ajoutés par _sync_vocab) et sauvegardé avec
+        # l'index : aucune requête n'attend sa construction
+        self._fuzzy()
+
+    def _build_weights(self):
+        """
+        Construit toutes les structures dérivées de la matrice TF et des
+        statistiques du vocabulaire : IDF, normes des documents, postings
+        compressés et statistiques BM25.
+        """
+
+        # IDF (la matrice TF-IDF n'est pas conservée : ses valeurs sont
+        # recalculées à la volée, TF × IDF)
+        self.idf = self._build_idf()
+
+        # Normes des vecteurs documents, calculées une seule fois
+        self.doc_norms = self._build_doc_norms(self.mat_TF, self.idf)
+
+        # Postings compressés (index par mot) : documents contenant les
+        # mots de la requête, lus lors du calcul des scores
+        TF = self.mat_TF.tocsc()
+        TF.sort_indices()
+        self._postings = CompressedPostings.from_csc(TF)
+
+        # Statistiques BM25 : longueurs des documents et IDF BM25
+        self._build_bm25_stats()
+
+        # Normalisations BM25 par la longueur des documents, indexées par (k1, b)
+        self._bm25_norms = {}
+
+        # Contribution maximale de chaque mot à un score (bornes de
+        # l'élagage MaxScore) : TF-IDF normalisé par la norme du document,
+        # et TF / (TF + normalisation) de BM25 avec les paramètres du moteur
+        self._max_tf_norm, self.max_bm25 = self._term_maxima(TF)
+        self.max_tfidf = self.idf * self._max_tf_norm
+
+        self._update_lookup_df()
+
+    # Nombre de segments de postings au-delà duquel refresh() reconstruit
+    # toutes les pondérations (fusion des segments, bornes MaxScore exactes)
+    MAX_SEGMENTS = 8
+
+    def _extend_weights(self, debut):
+        """
+        Met à jour les pondérations après l'ajout des lignes debut.. de la
+        matrice TF, sans reparcourir les postings des documents déjà
+        indexés :
+        - IDF, IDF BM25 et normes des documents recalculés (un tableau par
+          mot, un produit de la matrice TF par le vecteur des IDF²)
+        - longueurs des documents prolongées
+        - postings compressés : un segment de plus, pour les seules
+          nouvelles lignes
+        - poids maximaux des mots (MaxScore) : ceux des anciens postings
+          restent des bornes, relâchées du plus fort recul d'une norme de
+          document (cosinus) ou de la normalisation BM25, puis combinées
+          aux maxima exacts du bloc
+
+        :param debut: Première ligne ajoutée depuis la dernière construction
+        :return: False si une reconstruction complète est nécessaire
+                 (segments trop nombreux, bloc plus grand que l'index,
+                 bornes impossibles à relâcher)
+        """
+
+        postings = self._postings
+        if isinstance(postings, SegmentedPostings) and postings.segments >= self.MAX_SEGMENTS:
+            return False
+        block = self.mat_TF[debut:]
+        if block.nnz > postings.nnz or self.avgdl == 0:
+            return False
+
+        idf = self._build_idf()
+        doc_norms = self._build_doc_norms(self.mat_TF, idf)
+
+        # Recul maximal des normes : une norme nulle qui ne l'est plus
+        # n'est bornée par aucun facteur
+        avant, apres = self.doc_norms, doc_norms[:debut]
+        if np.any((avant == 0) & (apres > 0)):
+            return False
+        positives = avant > 0
+        recul = min(1.0, float((apres[positives] / avant[positives]).min())) if positives.any() else 1.0
+        if recul == 0:
+            return False
+
+        avgdl_avant = self.avgdl
 
-    def _build_vocab(self):
+        self.idf = idf
+        self.doc_norms = doc_norms
+
+        N, df, avgdl = self._collection_df()
+        self.doc_len = np.concatenate([self.doc_len, np.asarray(block.sum(axis=1)).ravel().astype(np.float64)])
+        self.avgdl = float(self.doc_len.mean()) if avgdl is None else avgdl
+        self.idf_bm25 = np.log((N - df + 0.5) / (df + 0.5) + 1)
+        self._bm25_norms = {}
+
+        # Normalisation BM25 k1 × (1 - b + b × longueur / moyenne) : elle
+        # recule au plus du rapport des longueurs moyennes
+        recul_bm25 = min(1.0, avgdl_avant / self.avgdl) if self.avgdl > 0 else 1.0
+
+        B = block.tocsc()
+        B.sort_indices()
+        if not isinstance(postings, SegmentedPostings):
+            postings = SegmentedPostings(postings)
+        postings.extend(B)
+        self._postings = postings
+
+        V = B.shape[1]
+        max_tf_norm, max_bm25 = self._term_maxima(B, debut)
+        self._max_tf_norm = np.maximum(self._padded(self._max_tf_norm, V) / recul, max_tf_norm)
+        self.max_bm25 = np.maximum(self._padded(self.max_bm25, V) / recul_bm25, max_bm25)
+        self.max_tfidf = self.idf * self._max_tf_norm
+
+        self._update_lookup_df()
+        return True
+
+    @staticmethod
+    def _padded(valeurs, V):
+        """
+        Tableau par mot prolongé de zéros jusqu'à V mots.
         """
-        Construit le vocabulaire du corpus.
-        Chaque mot est associé à :
-        - un identifiant unique
-        - sa fréquence totale
-        - sa fréquence documentaire (DF)
+        return np.concatenate([valeurs, np.zeros(V - len(valeurs))])
+
+    def _update_lookup_df(self):
+        """
+        Dictionnaire trié des mots (motifs à jokers) et index des fautes
+        de frappe : conservés d'une reconstruction à l'autre (les nouveaux
+        mots y sont ajoutés par _sync_vocab), seuls leurs DF sont remplacés.
         """
 
-        vocab = {}
-        next_id = 0
+        with self._lazy_lock:
+            if self._term_dict is not None or self._fuzzy_index is not None:
+                df = self._lookup_df()
+                for index in (self._term_dict, self._fuzzy_index):
+                    if index is not None:
+                        index.df = df
 
-        for doc in self.documents:
-            for m in doc.texte.lower().split():
-                if m not in vocab:
-                    vocab[m] = {
-                        "id": next_id,
-                        "total_freq": 0,
-                        "df": 0
-                    }
-                    next_id += 1
+    def _init_cache(self, cache_size):
+        """
+        Initialise le cache LRU des résultats et ses compteurs.
+        """
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
 
-        return vocab
+        # Verrou du cache : plusieurs threads peuvent interroger le même
+        # moteur ; seul l'accès au cache est sérialisé, pas le calcul des scores
+        self._cache_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def cache_info(self):
+        """
+        Retourne les statistiques du cache de résultats :
+        succès, échecs, taille courante et taille maximale.
+        """
+        return {
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "size": len(self._cache),
+            "maxsize": self.cache_size,
+        }
 
-    def _build_TF_matrix(self):
+    def cache_clear(self):
         """
-        Construit la matrice TF sous forme sparse (CSR).
+        Vide le cache de résultats (les compteurs sont conservés).
+        """
+        with self._cache_lock:
+            self._cache.clear()
+
+    @property
+    def vocab(self):
+        """
+        Vocabulaire en lecture seule, {mot: {"id", "total_freq", "df"}}
+        (vue des tableaux de statistiques du moteur).
+        """
+        return _VocabularyView(self)
+
+    def index_info(self):
+        """
+        Retourne la taille de l'index : nombre de documents, taille du
+        vocabulaire, nombre de postings (entrées non nulles de la matrice TF)
+        et mémoire occupée (en octets) par la matrice TF, les postings
+        compressés et les tableaux par document.
+
+        La taille des postings compressés est comparée à celle des mêmes
+        postings dans une matrice creuse CSC (indices int32, valeurs float64),
+        format de chacune des copies par mot qu'ils remplacent (TF, TF-IDF,
+        BM25). La matrice TF par document (CSR, 8 octets par posting) est
+        conservée à côté d'eux : mises à jour, filtres et scores des
+        documents candidats ; sa taille est indiquée à part (tf_bytes).
+
+        Les mots vides sont comptés, ainsi que les postings retirés de
+        l'index et la mémoire économisée.
+        """
+
+        TF = self.mat_TF
+        postings = self._postings
+
+        octets = TF.data.nbytes + TF.indices.nbytes + TF.indptr.nbytes + postings.nbytes
+        octets += sum(
+            getattr(self, name).nbytes
+            for name in ("idf", "idf_bm25", "doc_norms", "doc_len", "doc_dates",
+                         "_max_tf_norm", "max_tfidf", "max_bm25")
+        )
+
+        # Octets par posting : ligne de la matrice TF et posting compressé
+        nnz = max(postings.nnz, 1)
+        par_posting = TF.data.itemsize + TF.indices.itemsize + postings.nbytes / nnz
+
+        return {
+            "documents": TF.shape[0],
+            "vocabulary": TF.shape[1],
+            "postings": int(TF.nnz),
+            "bytes": int(octets),
+            "postings_bytes": int(postings.nbytes),
+            "tf_bytes": int(TF.data.nbytes + TF.indices.nbytes + TF.indptr.nbytes),
+            "csc_bytes": int(postings.nnz * 12 + (len(postings) + 1) * 4),
+            "stopwords": int(self._stop_mask.sum()),
+            "pruned_postings": self._pruned_postings,
+            "pruned_bytes": int(self._pruned_postings * par_posting),
+            "analyzer": self.analyzer.config(),
+        }
+
+    @property
+    def doc_dates(self):
+        """
+        Date de chaque document en secondes UTC (NaN si absente).
+        """
+        # La table partagée peut contenir des documents du corpus non
+        # encore indexés
+        return self.documents.epochs()[:self.mat_TF.shape[0]]
+
+    def _filter_mask(self, source=None, author=None, start=None, end=None):
+        """
+        Combine les filtres demandés en un masque booléen sur les documents,
+        calculé sur les colonnes de la table des documents.
+
+        :return: Masque booléen, ou None si aucun filtre n'est demandé
+        """
+
+        mask = self.documents.mask(source, author, start, end)
+        if mask is not None:
+            mask = mask[:self.mat_TF.shape[0]]
+        return mask
+
+    def _sync_vocab(self):
+        """
+        Ajoute au vocabulaire les mots apparus dans le lexique de l'analyseur
+        depuis la dernière indexation (identifiants suivants).
+        """
+
+        debut = len(self._terms)
+        nouveaux = len(self.analyzer.terms) - debut
+
+        self._terms.extend(self.analyzer.terms[debut:])
+        self._df = np.concatenate([self._df, np.zeros(nouveaux, dtype=np.int64)])
+        self._total_freq = np.concatenate([self._total_freq, np.zeros(nouveaux, dtype=np.int64)])
+
+        self._stop_mask = np.concatenate([
+            self._stop_mask,
+            np.array([m in self._stop_terms for m in self._terms[debut:]], dtype=bool)
+        ])
+
+        # Les index déjà construits ne reçoivent que les nouveaux mots
+        if nouveaux:
+            with self._lazy_lock:
+                if self._term_dict is not None:
+                    self._term_dict.add(self._terms[debut:], range(debut, len(self._terms)))
+                if self._fuzzy_index is not None:
+                    self._fuzzy_index.add(range(debut, len(self._terms)))
+
+    def _index_batch(self, tokens):
+        """
+        Construit les lignes TF (format CSR) d'un lot de documents à partir
+        de leurs textes analysés (identifiants de mots de l'analyseur).
         Chaque case (i, j) représente le nombre d'occurrences
         du mot j dans le document i.
+
+        Les comptages sont vectorisés (np.unique sur les couples
+        document x mot) ; le coût est proportionnel à la taille du lot.
+        Les postings des mots vides sont écartés (et comptés).
+
+        :param tokens: Liste de tableaux d'identifiants, un par document
+        """
+
+        self._sync_vocab()
+
+        n = len(tokens)
+        V = len(self._terms)
+
+        lengths = np.array([len(t) for t in tokens], dtype=np.int64)
+        if lengths.sum() == 0:
+            return sparse.csr_matrix((n, V), dtype=np.int32)
+
+        rows = np.repeat(np.arange(n, dtype=np.int64), lengths)
+        cols = np.concatenate(tokens).astype(np.int64)
+
+        # Couples (document, mot) distincts et nombre d'occurrences
+        keys, counts = np.unique(rows * V + cols, return_counts=True)
+        rows, cols = np.divmod(keys, V)
+
+        # Suppression des mots vides
+        vides = self._stop_mask[cols]
+        if vides.any():
+            self._pruned_postings += int(vides.sum())
+            rows, cols, counts = rows[~vides], cols[~vides], counts[~vides]
+
+        indptr = np.searchsorted(rows, np.arange(n + 1))
+
+        return sparse.csr_matrix(
+            (counts.astype(np.int32), cols.astype(np.int32), indptr.astype(np.int64)),
+            shape=(n, V)
+        )
+
+    def add_documents(self, docs, tokens=None):
+        """
+        Ajoute des documents au moteur sans reconstruction complète.
+        Les nouvelles lignes et les nouveaux mots sont enregistrés
+        immédiatement ; IDF, TF-IDF et normes ne sont recalculés qu'au
+        prochain refresh() (appelé automatiquement par search()).
+
+        :param docs: Liste de documents à indexer
+        :param tokens: Textes déjà analysés par l'analyseur du moteur
+                       (optionnel, sinon les documents sont analysés ici)
+        """
+
+        docs = list(docs)
+        if not docs:
+            return
+
+        # Les documents extérieurs au corpus ne doivent pas entrer dans sa
+        # table : le moteur passe sur une copie qui lui est propre, limitée
+        # aux documents déjà indexés
+        if self.corpus is not None and self.documents is self.corpus.table:
+            n = self.mat_TF.shape[0] + sum(block.shape[0] for block in self._pending_TF)
+            self.documents = DocumentTable()
+            self.documents.extend(self.corpus.table[r] for r in range(n))
+
+        self._index_documents(docs, tokens)
+        self.documents.extend(docs)
+
+    def _index_documents(self, docs, tokens=None):
         """
+        Indexe des documents (lignes TF en attente, vocabulaire, textes
+        analysés) sans toucher à la table des documents.
+        """
+
+        if tokens is None:
+            tokens = [self.analyzer.to_ids(doc.texte) for doc in docs]
 
-        rows, cols, data = [], [], []
+        block = self._index_batch(tokens)
+        self._update_vocab_stats(block)
 
-        for i, doc in enumerate(self.documents):
-            for m in doc.texte.lower().split():
-                if m in self.vocab:
-                    j = self.vocab[m]["id"]
-                    rows.append(i)
-                    cols.append(j)
-                    data.append(1)
+        # Les résultats en cache ne tiennent pas compte des nouveaux documents
+        self.cache_clear()
 
-        N = len(self.documents)
-        V = len(self.vocab)
+        self._pending_TF.append(block)
 
-        return sparse.csr_matrix((data, (rows, cols)), shape=(N, V))
+        # L'index positionnel sera reconstruit avec les nouveaux textes
+        if self._doc_tokens is not None:
+            self._doc_tokens.extend(tokens)
+        self._positions = None
 
-    def _update_vocab_stats(self):
+    def refresh(self):
+        """
+        Synchronise le moteur avec son corpus :
+        - indexe les documents ajoutés par Corpus.add_document
+          depuis la dernière synchronisation
+        - fusionne les lignes en attente dans la matrice TF
+        - recalcule IDF, TF-IDF, normes et statistiques BM25
+          (opérations vectorisées, sans re-tokenisation)
+        """
+
+        if self.corpus is not None and self._generation != self.corpus.generation:
+            nouveaux = [
+                i for i in range(self._next_doc_id, self.corpus.id_doc)
+                if i in self.corpus.documents
+            ]
+            self._next_doc_id = self.corpus.id_doc
+            self._generation = self.corpus.generation
+            docs = [self.corpus.documents[i] for i in nouveaux]
+            if docs:
+                self._index_documents(docs, [self.corpus.doc_tokens[i] for i in nouveaux])
+
+                # Table partagée : les lignes sont déjà dans celle du corpus
+                if self.documents is not self.corpus.table:
+                    self.documents.extend(docs)
+
+        if not self._pending_TF:
+            return
+
+        debut = self.mat_TF.shape[0]
+        self.mat_TF = self._stack_rows(self.mat_TF, self._pending_TF, len(self._terms))
+        self._pending_TF = []
+
+        # Des statistiques imposées ne couvrent pas les nouveaux documents :
+        # elles doivent être fournies à nouveau par set_collection_stats()
+        imposees = self._collection_stats is not None
+        self._collection_stats = None
+
+        # Mise à jour limitée aux nouvelles lignes, sinon reconstruction
+        # complète (fusion des segments de postings)
+        if imposees or not self._extend_weights(debut):
+            self._build_weights()
+
+    @staticmethod
+    def _stack_rows(TF, blocks, V):
+        """
+        Concatène des blocs de lignes CSR sous une matrice CSR existante,
+        en élargissant toutes les lignes au nouveau vocabulaire (V colonnes).
+        """
+
+        mats = [TF] + blocks
+        offsets = np.cumsum([0] + [m.nnz for m in mats[:-1]])
+
+        indptr = np.concatenate(
+            [TF.indptr[:1]] + [m.indptr[1:] + off for m, off in zip(mats, offsets)]
+        )
+        indices = np.concatenate([m.indices for m in mats])
+        data = np.concatenate([m.data for m in mats])
+
+        N = sum(m.shape[0] for m in mats)
+        return sparse.csr_matrix((data, indices, indptr), shape=(N, V))
+
+    def _update_vocab_stats(self, TF=None):
         """
         Met à jour :
         - DF (document frequency)
         - fréquence totale de chaque mot
+
+        Les deux statistiques sont obtenues par réductions vectorisées sur
+        les colonnes de TF. Sans argument, elles sont recalculées à partir de
+        mat_TF ; avec un bloc de lignes, les statistiques du bloc sont
+        ajoutées à celles des seuls mots qu'il contient.
+
+        :param TF: Bloc de nouvelles lignes TF (optionnel)
+        """
+
+        full = TF is None
+        if full:
+            TF = self.mat_TF
+
+        V = TF.shape[1]
+        df = np.bincount(TF.indices, minlength=V)
+        total = np.bincount(TF.indices, weights=TF.data, minlength=V).astype(np.int64)
+
+        if full:
+            self._df, self._total_freq = df, total
+        else:
+            self._df += df
+            self._total_freq += total
+
+    def _frequent_terms(self, max_df):
+        """
+        Mots présents dans plus de max_df × N documents.
+        """
+
+        seuil = max_df * self.mat_TF.shape[0]
+        return [self._terms[j] for j in np.flatnonzero(self._df > seuil)]
+
+    def _prune_terms(self, terms):
+        """
+        Ajoute des mots à la liste des mots vides et retire leurs postings
+        de la matrice TF. Les documents ajoutés ensuite sont indexés sans
+        ces mots ; les pondérations doivent être recalculées par l'appelant.
+
+        :param terms: Mots à retirer de l'index
+        """
+
+        self._stop_terms.update(terms)
+        self._stop_mask = np.array([m in self._stop_terms for m in self._terms], dtype=bool)
+
+        TF = self.mat_TF
+        vides = self._stop_mask[TF.indices]
+        if not vides.any():
+            return
+
+        TF = TF.copy()
+        TF.data[vides] = 0
+        TF.eliminate_zeros()
+
+        self.mat_TF = TF
+        self._pruned_postings += int(vides.sum())
+        self._update_vocab_stats()
+
+    def _build_idf(self):
+        """
+        IDF de chaque mot : log(N / df), 0 pour les mots absents.
+        """
+
+        N, df, _ = self._collection_df()
+        ratio = np.divide(N, df, out=np.ones(len(df)), where=df > 0)
+        return np.log(ratio)
+
+    @property
+    def mat_TFIDF(self):
         """
+        Matrice TF-IDF (TF × IDF), construite à la demande : le moteur ne
+        la conserve pas, les scores étant calculés sur les postings.
+        """
+        return self.mat_TF.multiply(self.idf).tocsr()
+
+    def _collection_df(self):
+        """
+        Statistiques de collection utilisées pour l'IDF et BM25.
+
+        :return: (nombre de documents, DF de chaque mot, longueur moyenne
+                 des documents ou None si elle doit être calculée)
+        """
+
+        if self._collection_stats is not None:
+            return self._collection_stats
+
+        return self.mat_TF.shape[0], self._df.astype(np.float64), None
+
+    def set_collection_stats(self, n_docs, df, avgdl):
+        """
+        Impose les statistiques de collection (nombre de documents, DF et
+        longueur moyenne) utilisées pour l'IDF et BM25, puis recalcule les
+        pondérations. Sert aux index partitionnés, dont chaque partition doit
+        être pondérée avec les statistiques globales.
+
+        :param n_docs: Nombre total de documents de la collection
+        :param df: DF global de chaque mot, dans l'ordre des identifiants
+                   du vocabulaire de ce moteur
+        :param avgdl: Longueur moyenne des documents de la collection
+        """
+
+        self.refresh()
+        self._collection_stats = (n_docs, np.asarray(df, dtype=np.float64), avgdl)
+        self._build_weights()
+        self.cache_clear()
+
+    def _build_doc_norms(self, TF, idf):
+        """
+        Calcule la norme euclidienne de chaque vecteur document TF-IDF,
+        sans construire la matrice : somme des TF² × IDF² de chaque ligne.
+        """
+        return np.sqrt(np.asarray(TF.power(2) @ (idf * idf)).ravel())
+
+    def _build_bm25_stats(self):
+        """
+        Précalcule les statistiques nécessaires à BM25 :
+        - longueur de chaque document (nombre de mots)
+        - longueur moyenne des documents
+        - IDF BM25 : log((N - df + 0.5) / (df + 0.5) + 1)
+        """
+
+        N, df, avgdl = self._collection_df()
+
+        self.doc_len = np.asarray(self.mat_TF.sum(axis=1)).ravel().astype(np.float64)
+        if avgdl is None:
+            avgdl = float(self.doc_len.mean()) if len(self.doc_len) > 0 else 0.0
+        self.avgdl = avgdl
+
+        self.idf_bm25 = np.log((N - df + 0.5) / (df + 0.5) + 1)
+
+    def _bm25_length_norm(self, k1, b, avgdl=None):
+        """
+        Normalisation par la longueur de chaque document :
+        k1 × (1 - b + b × longueur / longueur moyenne)
+
+        Celle des paramètres du moteur est conservée entre les requêtes.
+
+        :param avgdl: Longueur moyenne (par défaut celle de tout le corpus)
+        """
+
+        if avgdl is None and (k1, b) in self._bm25_norms:
+            return self._bm25_norms[(k1, b)]
 
+        moyenne = self.avgdl if avgdl is None else avgdl
+        if moyenne == 0:
+            norm = np.full(len(self.doc_len), k1)
+        else:
+            norm = k1 * (1 - b + b * self.doc_len / moyenne)
+
+        if avgdl is None and (k1, b) == (self.k1, self.b):
+            self._bm25_norms[(k1, b)] = norm
+        return norm
+
+    def _term_maxima(self, TF, debut=0):
+        """
+        Calcule, pour chaque mot, le plus grand poids de ses postings
+        (0 pour un mot sans posting) :
+        - TF / norme du document (cosinus, à multiplier par l'IDF)
+        - TF / (TF + normalisation du document) (BM25, k1 et b du moteur)
+
+        :param TF: Lignes TF au format CSC, indices triés
+        :param debut: Numéro du document de la première ligne
+        :return: (maxima cosinus, maxima BM25)
+        """
+
+        docs = TF.indices.astype(np.int64) + debut
+        data = TF.data.astype(np.float64)
+
+        norms = self.doc_norms[docs]
+        tfidf = np.divide(data, norms, out=np.zeros(len(data)), where=norms > 0)
+        bm25 = data / (data + self._bm25_length_norm(self.k1, self.b)[docs])
+
+        non_vides = np.flatnonzero(np.diff(TF.indptr) > 0)
+
+        def maxima(valeurs):
+            m = np.zeros(TF.shape[1])
+            if len(non_vides):
+                m[non_vides] = np.maximum.reduceat(valeurs, TF.indptr[non_vides])
+            return m
+
+        return maxima(tfidf), maxima(bm25)
+
+    # Tolérance relative des comparaisons de MaxScore (erreurs d'arrondi)
+    MAXSCORE_EPS = 1e-9
+
+    def _accumulate(self, ids, weights, term_scores, k=None, candidates=None,
+                    bounds=None, den=None):
+        """
+        Somme des contributions des mots de la requête, à partir de leurs
+        postings décodés, mot par mot par poids de requête décroissant.
+
+        Avec k et les bornes des mots, le top k est élagué dynamiquement
+        (algorithme MaxScore) : dès que la somme des bornes des mots
+        restants est inférieure au k-ième meilleur score partiel, un
+        document absent des listes déjà parcourues ne peut plus entrer dans
+        le top k. Les mots restants ne sont alors évalués que sur les
+        documents dont le score partiel, augmenté de cette somme, atteint
+        encore ce seuil : leurs TF sont lus dans les lignes de ces seuls
+        documents (matrice TF), sans décoder les listes restantes. Les mots
+        étant additionnés dans le même ordre qu'en l'absence d'élagage, les
+        scores retenus sont identiques.
+
+        :param weights: Poids de chaque mot dans la requête (ordre de parcours)
+        :param term_scores: Fonction (rang du mot dans ids, documents, TF)
+                            -> contributions du mot à ces documents
+        :param k: Nombre de documents recherchés (None : pas d'élagage)
+        :param candidates: Indices croissants des seuls documents classés
+        :param bounds: Contribution maximale de chaque mot à un score
+        :param den: Dénominateur des scores de chaque document (cosinus),
+                    auquel les bornes sont rapportées
+        :return: Scores de tous les documents ; ceux des documents écartés
+                 par l'élagage (hors du top k) sont laissés à 0
+        """
+
+        postings = self._postings
+        scores = np.zeros(postings.n_docs)
+
+        ordre = np.argsort(-np.asarray(weights), kind="stable")
+        if k is None or k <= 0 or bounds is None or len(ids) < 2:
+            for i in ordre:
+                docs, tfs = postings.postings(ids[i])
+                scores[docs] += term_scores(i, docs, tfs)
+            return scores
+
+        # reste[r] : somme des bornes des mots à partir du rang r ; l'élagage
+        # n'est tenté que si les mots restants ont au moins N / 2 postings
+        reste = np.append(np.cumsum(bounds[ordre][::-1])[::-1], 0.0)
+        longueurs = self._df[ids[ordre]]
+        restants = np.append(np.cumsum(longueurs[::-1])[::-1], 0)
+        tolerance = 1 - self.MAXSCORE_EPS
+
+        autorises = None
+        essentiels = []
+        seuil = 0.0
+        r = 0
+        while r < len(ids) and (reste[r] >= seuil * tolerance or 2 * restants[r] < len(scores)):
+            i = ordre[r]
+            docs, tfs = postings.postings(ids[i])
+            scores[docs] += term_scores(i, docs, tfs)
+            essentiels.append(docs)
+            r += 1
+            if r == len(ids) or 2 * restants[r] < len(scores):
+                continue
+
+            # Seuil : k-ième meilleur score partiel des documents de la liste
+            # (documents distincts, dont le score ne peut plus que croître)
+            if candidates is not None:
+                if autorises is None:
+                    autorises = np.zeros(len(scores), dtype=bool)
+                    autorises[candidates] = True
+                docs = docs[autorises[docs]]
+            if len(docs) >= k:
+                partiels = self._normalized(scores[docs], None if den is None else den[docs])
+                seuil = max(seuil, np.partition(partiels, len(docs) - k)[len(docs) - k])
+
+        if r == len(ids):
+            return scores
+
+        # Documents retenus : présents dans les listes parcourues, dont le
+        # score partiel augmenté des bornes restantes atteint le seuil
+        retenus = np.zeros(len(scores), dtype=bool)
+        gardes = []
+        for docs in essentiels:
+            partiels = self._normalized(scores[docs], None if den is None else den[docs])
+            garde = partiels + reste[r] >= seuil * tolerance
+            if candidates is not None:
+                garde &= autorises[docs]
+            retenus[docs[garde]] = True
+            gardes.append(garde)
+
+        # Mots non essentiels : lus dans les lignes de la matrice TF des
+        # seuls documents retenus, si elles sont plus courtes que les listes
+        # restantes ; sinon ces listes sont parcourues en entier
         TF = self.mat_TF
+        if np.count_nonzero(retenus) * TF.nnz >= restants[r] * TF.shape[0]:
+            for i in ordre[r:]:
+                docs, tfs = postings.postings(ids[i])
+                scores[docs] += term_scores(i, docs, tfs)
+            return scores
 
-        for mot, info in self.vocab.items():
-            j = info["id"]
-            col = TF[:, j]
+        for docs, garde in zip(essentiels, gardes):
+            scores[docs[~garde]] = 0
 
-            info["df"] = int(col.count_nonzero())
-            info["total_freq"] = int(col.sum())
+        lignes = np.flatnonzero(retenus)
+        for i, (docs, tfs) in zip(ordre[r:], self._row_postings(lignes, ids[ordre[r:]])):
+            scores[docs] += term_scores(i, docs, tfs)
+        return scores
 
-    def _build_TFIDF_matrix(self, TF):
+    def _row_postings(self, rows, ids):
         """
-        Construit la matrice TF-IDF à partir de TF.
-        TF-IDF = TF × IDF
+        Postings des mots ids restreints aux documents rows, lus dans les
+        lignes de la matrice TF : le coût est proportionnel à la longueur
+        de ces documents, et non à celle des listes des mots.
+
+        :param rows: Documents, par indice croissant
+        :return: Liste de (documents croissants, TF), une par mot de ids
         """
 
-        N, V = TF.shape
-        idf = np.zeros(V)
+        TF = self.mat_TF
+        debuts = TF.indptr[rows]
+        longueurs = TF.indptr[rows + 1] - debuts
 
-        for mot, info in self.vocab.items():
-            j = info["id"]
-            df = info["df"]
-            idf[j] = math.log(N / df) if df > 0 else 0
+        # Positions de toutes les entrées des lignes, ligne par ligne
+        decalages = np.repeat(debuts - (np.cumsum(longueurs) - longueurs), longueurs)
+        positions = decalages + np.arange(int(longueurs.sum()))
+        mots = TF.indices[positions]
 
-        return TF.multiply(idf).tocsr()
+        # Rang dans ids du mot de chaque entrée (-1 s'il n'en fait pas partie)
+        tries = np.argsort(ids)
+        k = np.minimum(np.searchsorted(ids[tries], mots), len(ids) - 1)
+        rang = np.where(ids[tries][k] == mots, tries[k], -1)
+
+        garde = rang >= 0
+        rang = rang[garde]
+        docs = np.repeat(rows, longueurs)[garde]
+        tfs = TF.data[positions[garde]]
+
+        # Regroupement par mot (tri stable : documents croissants)
+        ordre = np.argsort(rang, kind="stable")
+        bornes = np.searchsorted(rang[ordre], np.arange(len(ids) + 1))
+        docs, tfs = docs[ordre], tfs[ordre]
+        return [(docs[a:b], tfs[a:b]) for a, b in zip(bornes[:-1], bornes[1:])]
+
+    @staticmethod
+    def _normalized(scores, den):
+        """
+        Scores divisés par leur dénominateur (0 si celui-ci est nul).
+        """
+
+        if den is None:
+            return scores
+        return np.divide(scores, den, out=np.zeros(len(scores)), where=den != 0)
+
+    def _query_term_counts(self, query):
+        """
+        Compte les mots de la requête présents dans le vocabulaire
+        (motifs à jokers développés, fautes de frappe corrigées).
+
+        :return: (identifiants des mots, nombre d'occurrences dans la requête)
+        """
+
+        counts = {}
+        V = len(self._terms)
+
+        texte, motifs = split_patterns(query_text(query))
+
+        for m in self.analyzer.analyze(texte):
+            j = self._resolve_term(m)
+            if j is not None and j < V and not self._stop_mask[j]:
+                counts[j] = counts.get(j, 0) + 1
+
+        # Chaque mot développé d'un motif compte comme un mot de la requête
+        for motif in motifs:
+            for j in self._expand(motif):
+                counts[int(j)] = counts.get(int(j), 0) + 1
+
+        ids = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+        tf = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+
+        return ids, tf
+
+    def _positional_index(self):
+        """
+        Retourne l'index positionnel, construit au premier appel.
+        """
+
+        with self._lazy_lock:
+            if self._positions is None:
+                if self._doc_tokens is None:
+                    raise ValueError("Index sans positions : phrases et NEAR indisponibles")
+                tokens, ptr = self._doc_tokens.stream()
+                self._positions = PositionalIndex(tokens, ptr, len(self._terms))
+            return self._positions
+
+    def _lookup_df(self):
+        """
+        DF des mots proposés par les motifs à jokers et la correction des
+        fautes de frappe : ceux de la collection (globaux pour une
+        partition), nuls pour les mots vides.
+        """
+
+        _, df, _ = self._collection_df()
+        return np.where(self._stop_mask, 0, df)
+
+    def _term_dictionary(self):
+        """
+        Retourne le dictionnaire trié des mots, construit au premier appel
+        (DF : voir _lookup_df).
+        """
+
+        with self._lazy_lock:
+            if self._term_dict is None:
+                self._term_dict = TermDictionary(self._terms, self._lookup_df())
+            return self._term_dict
+
+    def _fuzzy(self):
+        """
+        Retourne l'index des fautes de frappe, construit s'il n'existe pas
+        encore (None si la correction est désactivée). Comme pour les
+        jokers, les DF sont ceux de la collection et les mots vides en sont
+        exclus.
+        """
+
+        if not self.fuzzy:
+            return None
+
+        with self._lazy_lock:
+            if self._fuzzy_index is None:
+                self._fuzzy_index = FuzzyIndex(self._terms, self._lookup_df())
+            return self._fuzzy_index
+
+    def _resolve_term(self, mot):
+        """
+        Identifiant d'un mot de requête analysé : le mot lui-même s'il est
+        dans le vocabulaire, sinon le mot le plus proche (None si aucun).
+        """
+
+        j = self.analyzer.term_ids.get(mot)
+        if j is not None and j < len(self._terms):
+            return j
+
+        fuzzy = self._fuzzy()
+        trouve = fuzzy.lookup(mot) if fuzzy is not None else None
+        return None if trouve is None else trouve[0]
+
+    def suggest(self, query):
+        """
+        Suggestion « Vouliez-vous dire » : la requête dans laquelle chaque
+        mot absent du vocabulaire est remplacé par le mot le plus proche,
+        c'est-à-dire celui effectivement utilisé par search().
+
+        :param query: Requête utilisateur
+        :return: Requête corrigée, ou None si aucun mot n'a été corrigé
+        """
+
+        self.refresh()
+
+        # L'index n'est consulté que si la requête contient un mot inconnu
+        if not self.fuzzy or not FuzzyIndex.unknown_words(query, self.analyzer):
+            return None
+        return self._fuzzy().correct(query, self.analyzer)
+
+    def _expand(self, motif):
+        """
+        Identifiants des mots correspondant à un motif à jokers, limités
+        aux max_expansions mots de plus grand DF.
+        """
+
+        motif = self.analyzer.normalize(motif)
+        return self._term_dictionary().expand(motif, self.max_expansions)
+
+    def _query_constraints(self, query):
+        """
+        Phrases exactes et contraintes de proximité d'une requête,
+        exprimées en identifiants de mots (None pour un mot inconnu).
+
+        :return: (phrases, proximités) : tuples d'identifiants et
+                 tuples (mot, mot, n)
+        """
+
+        _, phrases, proximites = parse_query(query)
+
+        phrases = [p for p in map(self._text_ids, phrases) if p]
+        proximites = [
+            (self._word_id(a), self._word_id(b), n) for a, b, n in proximites
+        ]
+
+        return tuple(phrases), tuple(proximites)
+
+    def _text_ids(self, texte):
+        """
+        Identifiants des mots d'un texte de requête, fautes de frappe
+        corrigées (None pour un mot inconnu).
+        """
+        return tuple(self._resolve_term(m) for m in self.analyzer.analyze(texte))
+
+    def _word_id(self, mot):
+        """
+        Identifiant du (premier) mot d'un opérande NEAR, None s'il est inconnu.
+        """
+        ids = self._text_ids(mot)
+        return ids[0] if ids else None
+
+    def _constraint_mask(self, phrases, proximites):
+        """
+        Masque des documents vérifiant toutes les phrases et contraintes
+        de proximité (None s'il n'y en a aucune).
+        """
+
+        if not phrases and not proximites:
+            return None
+
+        index = self._positional_index()
+        mask = np.ones(index.n_docs, dtype=bool)
+
+        for ids in phrases:
+            m = np.zeros(index.n_docs, dtype=bool)
+            m[index.phrase(ids)] = True
+            mask &= m
+
+        for a, b, n in proximites:
+            m = np.zeros(index.n_docs, dtype=bool)
+            m[index.near(a, b, n)] = True
+            mask &= m
+
+        return mask
+
+    def _term_docs(self, texte):
+        """
+        Postings d'un mot, d'un motif à jokers ou d'une phrase de requête
+        booléenne : documents qui le contiennent. Un texte analysé en plusieurs mots est cherché
+        comme une phrase exacte ;
+        les mots vides, absents de la matrice TF, sont cherchés dans
+        l'index positionnel.
+        """
+
+        if is_pattern(texte):
+            return union([self._postings.docs(j) for j in self._expand(texte)])
+
+        ids = self._text_ids(texte)
+        if not ids:
+            return EMPTY
+        if len(ids) > 1:
+            return self._positional_index().phrase(ids)
+
+        j = ids[0]
+        if j is None or j >= len(self._terms):
+            return EMPTY
+
+        if self._stop_mask[j]:
+            return self._positional_index().phrase([j])
+
+        return self._postings.docs(j)
+
+    def _boolean_docs(self, tree):
+        """
+        Évalue un arbre de requête booléenne (voir parse_boolean) :
+        intersection des listes de la plus courte à la plus longue,
+        union triée et différence des listes exclues par NOT.
+
+        :return: Indices croissants des documents vérifiant l'expression
+        """
+
+        kind = tree[0]
+
+        if kind in ("mot", "phrase"):
+            return self._term_docs(tree[1])
+
+        if kind == "near":
+            _, a, b, n = tree
+            return self._positional_index().near(self._word_id(a), self._word_id(b), n)
+
+        if kind == "or":
+            return union([self._boolean_docs(noeud) for noeud in tree[1]])
+
+        # AND (et NOT seul) : intersection des termes positifs, puis
+        # retrait des termes exclus
+        noeuds = tree[1] if kind == "and" else [tree]
+        positifs = [self._boolean_docs(n) for n in noeuds if n[0] != "not"]
+        exclus = [self._boolean_docs(n[1]) for n in noeuds if n[0] == "not"]
+
+        if positifs:
+            docs = intersect_all(positifs)
+        else:
+            docs = np.arange(self.mat_TF.shape[0], dtype=np.int64)
+
+        return difference(docs, union(exclus))
+
+    def _candidate_scores(self, docs, ids, tf, model, k1, b):
+        """
+        Scores TF-IDF (cosinus) ou BM25 des seuls documents docs : seules
+        leurs lignes des matrices sont lues.
+        """
+
+        scores = np.zeros(len(docs))
+        if len(docs) == 0 or len(ids) == 0:
+            return scores
+
+        if model == "bm25":
+            TF = self.mat_TF[docs][:, ids].tocoo()
+            norm = self._bm25_length_norm(k1, b)[docs]
+            poids = (
+                self.idf_bm25[ids][TF.col] * TF.data * (k1 + 1)
+                / (TF.data + norm[TF.row])
+            )
+            return np.bincount(TF.row, weights=poids * tf[TF.col], minlength=len(docs))
+
+        weights = tf * self.idf[ids]
+        q_norm = math.sqrt(np.dot(weights, weights))
+        if q_norm == 0:
+            return scores
+
+        num = self.mat_TF[docs][:, ids] @ (weights * self.idf[ids])
+        den = q_norm * self.doc_norms[docs]
+
+        np.divide(num, den, out=scores, where=den != 0)
+        return scores
 
     def _build_query_vector(self, query):
         """
-        Transforme une requête utilisateur en vecteur TF-IDF.
+        Transforme une requête utilisateur en vecteur TF-IDF creux.
+
+        :return: (identifiants des mots, poids TF-IDF) pour les seuls
+                 mots de la requête présents dans le vocabulaire
         """
 
-        N = len(self.documents)
-        V = len(self.vocab)
-        vec = np.zeros(V)
+        ids, tf = self._query_term_counts(query)
+        return ids, tf * self.idf[ids]
 
-        for m in query.lower().split():
-            if m in self.vocab:
-                j = self.vocab[m]["id"]
-                df = self.vocab[m]["df"]
-                idf = math.log(N / df) if df > 0 else 0
-                vec[j] += idf
+    def _cosine_scores(self, ids, weights, k=None, candidates=None):
+        """
+        Calcule la similarité cosinus entre la requête et tous les documents
+        à partir des seuls postings des mots de la requête.
+
+        :param k: Nombre de documents recherchés : seuls les documents
+                  pouvant entrer dans le top k sont évalués (MaxScore),
+                  les autres gardent un score nul
+        :param candidates: Indices croissants des seuls documents classés
+        """
 
-        return vec
+        N = self.mat_TF.shape[0]
+        scores = np.zeros(N)
+
+        q_norm = math.sqrt(np.dot(weights, weights))
+        if q_norm == 0:
+            return scores
+
+        poids = weights * self.idf[ids]
+        den = q_norm * self.doc_norms
+
+        num = self._accumulate(
+            ids, poids, lambda i, docs, tfs: tfs * poids[i], k, candidates,
+            weights * self.max_tfidf[ids] / q_norm, den
+        )
+
+        np.divide(num, den, out=scores, where=den != 0)
+        return scores
+
+    def _bm25_scores(self, ids, tf, k1, b, idf=None, avgdl=None, k=None, candidates=None):
+        """
+        Calcule le score BM25 de tous les documents pour une requête, à
+        partir des postings décodés des seuls mots de la requête :
+        IDF × TF × (k1 + 1) / (TF + normalisation du document)
 
-    def search(self, query, k=5):
+        :param idf: IDF BM25 des mots ids (par défaut celui de tout le corpus)
+        :param avgdl: Longueur moyenne (par défaut celle de tout le corpus)
+        :param k: Nombre de documents recherchés : seuls les documents
+                  pouvant entrer dans le top k sont évalués (MaxScore, avec
+                  les k1, b et la longueur moyenne du moteur seulement),
+                  les autres gardent un score nul
+        :param candidates: Indices croissants des seuls documents classés
+        """
+
+        N = self.mat_TF.shape[0]
+        if len(ids) == 0:
+            return np.zeros(N)
+
+        idf = self.idf_bm25[ids] if idf is None else idf
+        norm = self._bm25_length_norm(k1, b, avgdl)
+        w = idf * tf * (k1 + 1)
+
+        def term_scores(i, docs, tfs):
+            # w × TF / (TF + normalisation), sans tableau intermédiaire
+            poids = norm.take(docs)
+            poids += tfs
+            np.divide(tfs, poids, out=poids)
+            poids *= w[i]
+            return poids
+
+        # Bornes précalculées pour les seuls paramètres du moteur
+        bounds = None
+        if avgdl is None and (k1, b) == (self.k1, self.b):
+            bounds = w * self.max_bm25[ids]
+
+        return self._accumulate(ids, w, term_scores, k, candidates, bounds)
+
+    def _filtered_stats(self, mask):
+        """
+        Statistiques restreintes aux documents retenus par un masque.
+
+        :return: (lignes retenues, lignes TF retenues, DF de chaque mot
+                 sur ces seules lignes)
+        """
+
+        rows = np.flatnonzero(mask)
+        sub = self.mat_TF[rows]
+        df = np.bincount(sub.indices, minlength=self.mat_TF.shape[1])
+
+        return rows, sub, df
+
+    def _filtered_cosine_scores(self, ids, tf, mask):
+        """
+        Similarité cosinus avec un IDF calculé sur les seuls documents
+        filtrés, comme si le moteur avait été construit sur ce sous-corpus.
+        """
+
+        N = self.mat_TF.shape[0]
+        scores = np.zeros(N)
+
+        rows, sub, df = self._filtered_stats(mask)
+
+        # log(n / df) pour les mots présents, 0 sinon
+        ratio = np.divide(len(rows), df, out=np.ones(len(df)), where=df > 0)
+        idf = np.log(ratio)
+
+        weights = tf * idf[ids]
+        q_norm = math.sqrt(np.dot(weights, weights))
+        if q_norm == 0:
+            return scores
+
+        norms = np.zeros(N)
+        norms[rows] = np.sqrt(np.asarray(sub.multiply(idf).power(2).sum(axis=1)).ravel())
+
+        poids = weights * idf[ids]
+        num = self._accumulate(ids, poids, lambda i, docs, tfs: tfs * poids[i])
+        den = q_norm * norms
+
+        np.divide(num, den, out=scores, where=den != 0)
+        return scores
+
+    def _filtered_bm25_scores(self, ids, tf, k1, b, mask):
+        """
+        Score BM25 avec IDF et longueur moyenne calculés sur les seuls
+        documents filtrés.
+        """
+
+        if len(ids) == 0:
+            return np.zeros(self.mat_TF.shape[0])
+
+        rows, _, df = self._filtered_stats(mask)
+        n = len(rows)
+
+        idf = np.log((n - df[ids] + 0.5) / (df[ids] + 0.5) + 1)
+        avgdl = float(self.doc_len[rows].mean()) if n > 0 else 0.0
+
+        return self._bm25_scores(ids, tf, k1, b, idf, avgdl)
+
+    def search(self, query, k=5, model=None, k1=None, b=None,
+               source=None, author=None, start=None, end=None, idf_scope=None):
         """
         Recherche les k documents les plus pertinents pour une requête.
-        La pertinence est calculée avec la similarité cosinus.
+        La pertinence est calculée avec la similarité cosinus (TF-IDF)
+        ou avec le score BM25.
+
+        Les résultats sont gardés dans un cache LRU, indexé par les mots
+        de la requête présents dans le vocabulaire (motifs développés), ses
+        phrases, k, le modèle et les filtres. Le cache est
+        vidé dès que le corpus change (compteur Corpus.generation).
+
+        :param query: Requête utilisateur : mots-clés, phrases exactes entre
+                      guillemets ("neural network") et contraintes de
+                      proximité (mot NEAR/n mot) ; seuls les documents
+                      vérifiant phrases et contraintes sont classés.
+                      Avec les opérateurs AND, OR, NOT (en majuscules) et
+                      des parenthèses, seuls les documents vérifiant
+                      l'expression booléenne sont classés, selon leurs
+                      mots hors NOT. Les motifs à jokers (optim*,
+                      learn?ng) sont remplacés par les mots correspondants
+                      de plus grand DF
+        :param k: Nombre de documents à retourner
+        :param model: Modèle de pondération ("tfidf" ou "bm25"),
+                      par défaut celui du moteur
+        :param k1: Paramètre k1 de BM25, par défaut celui du moteur
+        :param b: Paramètre b de BM25, par défaut celui du moteur
+        :param source: Type de document ("Reddit", "Arxiv"...), optionnel
+        :param author: Nom (ou partie du nom) de l'auteur, optionnel
+        :param start: Date de début (incluse), optionnelle
+        :param end: Date de fin (incluse), optionnelle
+        :param idf_scope: "global" ou "filtered", par défaut celle du moteur
+        """
+
+        # Prise en compte des documents ajoutés depuis la construction
+        # (vide le cache si le corpus a changé)
+        self.refresh()
+
+        ids, tf = self._query_term_counts(query)
+        key = (
+            tuple(sorted(zip(ids.tolist(), tf.tolist()))),
+            parse_boolean(query) or self._query_constraints(query), k,
+            model or self.model,
+            self.k1 if k1 is None else k1,
+            self.b if b is None else b,
+            source.lower() if source else None,
+            author.lower() if author else None,
+            start or None, end or None,
+            idf_scope or self.idf_scope,
+        )
+
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self.cache_hits += 1
+                self._cache.move_to_end(key)
+                return [dict(r) for r in cached]
+            self.cache_misses += 1
+
+        results = self._search(query, k, model, k1, b, source, author, start, end, idf_scope)
+
+        if self.cache_size > 0:
+            with self._cache_lock:
+                self._cache[key] = results
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        return [dict(r) for r in results]
+
+    def _search(self, query, k=5, model=None, k1=None, b=None,
+                source=None, author=None, start=None, end=None, idf_scope=None):
         """
+        Recherche sans cache (voir search pour les paramètres).
+        """
+
+        best, scores = self._rank(query, k, model, k1, b, source, author, start, end, idf_scope)
+        return self._format_results(best, scores)
+
+    def _rank(self, query, k=5, model=None, k1=None, b=None,
+              source=None, author=None, start=None, end=None, idf_scope=None):
+        """
+        Classe les documents pour une requête (voir search pour les paramètres).
+        Les filtres sont appliqués sous forme de masques sur l'index global :
+        aucun sous-moteur n'est reconstruit.
+
+        :return: (indices des k meilleurs documents, leurs scores)
+        """
+
+        model = model or self.model
+        if model not in self.MODELS:
+            raise ValueError(f"Modèle inconnu : {model} (attendu : {self.MODELS})")
 
-        q_vec = self._build_query_vector(query)
-        scores = []
+        idf_scope = idf_scope or self.idf_scope
+        if idf_scope not in self.IDF_SCOPES:
+            raise ValueError(f"Portée IDF inconnue : {idf_scope} (attendu : {self.IDF_SCOPES})")
 
-        for i in range(self.mat_TFIDF.shape[0]):
-            doc_vec = self.mat_TFIDF[i].toarray().flatten()
+        k1 = self.k1 if k1 is None else k1
+        b = self.b if b is None else b
 
-            # Similarité cosinus
-            num = np.dot(q_vec, doc_vec)
-            den = math.sqrt(np.dot(q_vec, q_vec)) * math.sqrt(np.dot(doc_vec, doc_vec))
-            score = num / den if den != 0 else 0
+        mask = self._filter_mask(source, author, start, end)
+        filtered = mask is not None and idf_scope == "filtered"
 
-            scores.append(score)
+        ids, tf = self._query_term_counts(query)
 
-        # Sélection des meilleurs documents
-        best = np.argsort(scores)[::-1][:k]
+        # Requête booléenne : documents vérifiant l'expression, obtenus
+        # par opérations sur les postings, puis classés
+        tree = parse_boolean(query)
+        if tree is not None:
+            candidats = self._boolean_docs(tree)
+            if mask is not None:
+                candidats = candidats[mask[candidats]]
+
+            # Scores calculés sur les seuls documents retenus
+            if not filtered:
+                scores = self._candidate_scores(candidats, ids, tf, model, k1, b)
+                best = top_k(scores, k)
+                return candidats[best], scores[best]
+        else:
+            # Phrases et proximité : restreignent les documents classés,
+            # sans modifier les statistiques IDF
+            retenus = mask
+            constraint_mask = self._constraint_mask(*self._query_constraints(query))
+            if constraint_mask is not None:
+                retenus = constraint_mask if mask is None else mask & constraint_mask
+            candidats = None if retenus is None else np.flatnonzero(retenus)
+
+        # Sans IDF filtré, seuls les documents pouvant entrer dans le top k
+        # sont évalués (MaxScore)
+        if model == "bm25" and filtered:
+            scores = self._filtered_bm25_scores(ids, tf, k1, b, mask)
+        elif model == "bm25":
+            scores = self._bm25_scores(ids, tf, k1, b, k=k, candidates=candidats)
+        elif filtered:
+            scores = self._filtered_cosine_scores(ids, tf, mask)
+        else:
+            scores = self._cosine_scores(ids, tf * self.idf[ids], k, candidats)
+
+        # Sélection partielle des meilleurs documents parmi ceux retenus
+        # (ex aequo départagés par indice croissant)
+        best = top_k(scores, k, candidats)
+
+        return best, scores[best]
+
+    def _format_results(self, best, scores):
+        """
+        Met en forme les documents classés : une entrée par document avec
+        son score et ses métadonnées.
+        """
 
         results = []
-        for i in best:
+        for i, score in zip(best, scores):
             d = self.documents[i]
             results.append({
-                "score": scores[i],
+                "score": float(score),
                 "titre": d.titre,
                 "auteur": d.auteur,
                 "date": d.date,
@@ -165,3 +1529,234 @@ class SearchEngine:
             })
 
         return results
+
+    # Version du format de sauvegarde de l'index (voir save / load)
+    INDEX_FORMAT = 6
+
+    # Fichiers des colonnes de la table des documents dont le nom n'est
+    # pas doc_<colonne> (dates en secondes : doc_dates, comme l'attribut)
+    _DOC_ARRAYS = {"epochs": "doc_dates"}
+
+    def save(self, directory):
+        """
+        Sauvegarde l'index sur disque dans un répertoire :
+        - meta.json : paramètres du moteur et de l'analyseur, dimensions
+        - vocab.json : mots, dans l'ordre de leurs identifiants
+        - surfaces.json : formes d'origine des racines (voir Analyzer.surface)
+        - stopwords.json : mots vides retirés de l'index
+        - documents.json : noms des auteurs et types de documents
+        - doc_*.npy : colonnes de la table des documents, sans leur texte
+          (codes d'auteur et de source, titres, URL et dates d'origine ;
+          voir DocumentTable.to_columns), dates en secondes dans doc_dates.npy
+        - fichiers .npy : tableaux CSR (data, indices, indptr) de la matrice
+          TF, postings compressés, IDF, normes, longueurs et poids maximaux
+          des mots (MaxScore)
+        - tokens.npy / token_ptr.npy : textes analysés des documents
+          (identifiants de mots), pour les phrases et NEAR
+        - fuzzy_*.npy : index des fautes de frappe (voir FuzzyIndex.ARRAYS)
+
+        Les fichiers .npy peuvent être projetés en mémoire par load().
+
+        :param directory: Répertoire de destination (créé si nécessaire)
+        """
+
+        # Les documents en attente sont intégrés avant la sauvegarde, et
+        # les segments de postings fusionnés
+        self.refresh()
+        if isinstance(self._postings, SegmentedPostings):
+            self._build_weights()
+
+        os.makedirs(directory, exist_ok=True)
+
+        meta = {
+            "format": self.INDEX_FORMAT,
+            "shape": list(self.mat_TF.shape),
+            "model": self.model,
+            "k1": self.k1,
+            "b": self.b,
+            "idf_scope": self.idf_scope,
+            "avgdl": self.avgdl,
+            "analyzer": self.analyzer.config(),
+            "stopwords": list(self.stopwords),
+            "max_df": self.max_df,
+            "max_expansions": self.max_expansions,
+            "fuzzy": self.fuzzy,
+            "pruned_postings": self._pruned_postings,
+        }
+        with open(os.path.join(directory, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+        with open(os.path.join(directory, "vocab.json"), "w", encoding="utf-8") as f:
+            json.dump(self._terms, f, ensure_ascii=False)
+
+        with open(os.path.join(directory, "surfaces.json"), "w", encoding="utf-8") as f:
+            json.dump(sorted(self.analyzer.surfaces.items()), f, ensure_ascii=False)
+
+        with open(os.path.join(directory, "stopwords.json"), "w", encoding="utf-8") as f:
+            json.dump(sorted(self._stop_terms), f, ensure_ascii=False)
+
+        # Table des documents : petites listes en JSON, colonnes en .npy
+        with open(os.path.join(directory, "documents.json"), "w", encoding="utf-8") as f:
+            json.dump({"authors": self.documents.author_names,
+                       "sources": self.documents.sources}, f, ensure_ascii=False)
+
+        for name, colonne in self.documents.to_columns().items():
+            np.save(os.path.join(directory, self._DOC_ARRAYS.get(name, f"doc_{name}") + ".npy"), colonne)
+
+        self._save_sparse(directory, "tf_csr", self.mat_TF)
+        for name in CompressedPostings.ARRAYS:
+            np.save(os.path.join(directory, f"postings_{name}.npy"), getattr(self._postings, name))
+
+        for name in ("idf", "idf_bm25", "doc_norms", "doc_len", "max_bm25"):
+            np.save(os.path.join(directory, name + ".npy"), getattr(self, name))
+        np.save(os.path.join(directory, "max_tf_norm.npy"), self._max_tf_norm)
+
+        # Textes analysés (index positionnel reconstruit au besoin)
+        if self._doc_tokens is not None:
+            tokens, ptr = self._doc_tokens.stream()
+            np.save(os.path.join(directory, "tokens.npy"), tokens)
+            np.save(os.path.join(directory, "token_ptr.npy"), ptr)
+
+        if self._fuzzy_index is not None:
+            for name in FuzzyIndex.ARRAYS:
+                np.save(os.path.join(directory, f"fuzzy_{name}.npy"), getattr(self._fuzzy_index, name))
+
+    @classmethod
+    def load(cls, directory, mmap=True, cache_size=128):
+        """
+        Recharge un index sauvegardé par save(), sans relire ni re-tokeniser
+        les documents.
+
+        Avec mmap=True, les tableaux NumPy sont projetés en mémoire en
+        lecture seule : seules les pages utilisées par les requêtes sont
+        lues, et plusieurs processus chargeant le même index partagent
+        ces pages via le cache du système.
+
+        Le moteur obtenu n'est rattaché à aucun corpus ; add_documents()
+        reste possible (les matrices sont alors recopiées en mémoire).
+
+        :param directory: Répertoire créé par save()
+        :param mmap: Projection en mémoire des tableaux (sinon lecture complète)
+        :param cache_size: Taille du cache LRU des résultats
+        """
+
+        with open(os.path.join(directory, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta["format"] != cls.INDEX_FORMAT:
+            raise ValueError(f"Format d'index non supporté : {meta['format']}")
+
+        mmap_mode = "r" if mmap else None
+        shape = tuple(meta["shape"])
+
+        engine = cls.__new__(cls)
+        engine.corpus = None
+        engine.model = meta["model"]
+        engine.k1 = meta["k1"]
+        engine.b = meta["b"]
+        engine.idf_scope = meta["idf_scope"]
+        engine.avgdl = meta["avgdl"]
+        engine._init_cache(cache_size)
+
+        engine._generation = None
+        engine._next_doc_id = None
+        engine._pending_TF = []
+        engine._collection_stats = None
+
+        with open(os.path.join(directory, "vocab.json"), encoding="utf-8") as f:
+            engine._terms = json.load(f)
+
+        # Analyseur configuré comme à la sauvegarde (racinisation), dont
+        # le lexique reprend les identifiants de l'index (dictionnaire des
+        # identifiants construit à la première requête)
+        engine.analyzer = Analyzer(**meta.get("analyzer", {}))
+        with open(os.path.join(directory, "surfaces.json"), encoding="utf-8") as f:
+            engine.analyzer.set_lexicon(engine._terms, dict(json.load(f)))
+
+        # Mots vides : écartés des requêtes et des documents ajoutés
+        engine.stopwords = tuple(meta.get("stopwords", ()))
+        engine.max_df = meta.get("max_df")
+        engine.max_expansions = meta.get("max_expansions", 50)
+        engine.fuzzy = meta.get("fuzzy", True)
+        engine._term_dict = None
+        engine._fuzzy_index = None
+        engine._pruned_postings = meta.get("pruned_postings", 0)
+        engine._stop_terms = set()
+        stop_path = os.path.join(directory, "stopwords.json")
+        if os.path.exists(stop_path):
+            with open(stop_path, encoding="utf-8") as f:
+                engine._stop_terms = set(json.load(f))
+        engine._stop_mask = np.array([m in engine._stop_terms for m in engine._terms], dtype=bool)
+
+        def load_array(name):
+            return np.load(os.path.join(directory, name + ".npy"), mmap_mode=mmap_mode)
+
+        engine.mat_TF = cls._load_sparse(directory, "tf_csr", shape, mmap_mode)
+        engine._postings = CompressedPostings(
+            *(load_array(f"postings_{name}") for name in CompressedPostings.ARRAYS), shape[0]
+        )
+        engine._bm25_norms = {}
+
+        for name in ("idf", "idf_bm25", "doc_norms", "doc_len", "max_bm25"):
+            setattr(engine, name, load_array(name))
+        engine._max_tf_norm = load_array("max_tf_norm")
+        engine.max_tfidf = engine.idf * engine._max_tf_norm
+
+        # Textes analysés : l'index positionnel n'est construit qu'à la
+        # première requête contenant une phrase ou un NEAR
+        engine._doc_tokens = None
+        if os.path.exists(os.path.join(directory, "tokens.npy")):
+            engine._doc_tokens = _TokenStore(load_array("tokens"), load_array("token_ptr"))
+        engine._positions = None
+        engine._lazy_lock = threading.Lock()
+
+        # Statistiques du vocabulaire recalculées à partir des postings
+        engine._df = engine._postings.df()
+        engine._total_freq = engine._postings.total_freq()
+
+        # Index des fautes de frappe sauvegardé : projeté en mémoire, sans
+        # reconstruction
+        if engine.fuzzy and os.path.exists(os.path.join(directory, "fuzzy_hashes.npy")):
+            engine._fuzzy_index = FuzzyIndex.from_arrays(
+                engine._terms, engine._lookup_df(),
+                *(load_array(f"fuzzy_{name}") for name in FuzzyIndex.ARRAYS)
+            )
+
+        # Table des documents propre au moteur chargé : métadonnées
+        # seulement, sans texte, colonnes projetées en mémoire
+        with open(os.path.join(directory, "documents.json"), encoding="utf-8") as f:
+            noms = json.load(f)
+
+        engine.documents = DocumentTable.from_columns(
+            {name: load_array(cls._DOC_ARRAYS.get(name, f"doc_{name}"))
+             for name in DocumentTable.COLUMNS},
+            noms["authors"], noms["sources"]
+        )
+
+        return engine
+
+    @staticmethod
+    def _save_sparse(directory, name, matrix):
+        """
+        Sauvegarde les tableaux data / indices / indptr d'une matrice
+        creuse dans trois fichiers .npy, avec un type d'index commun.
+        """
+
+        index_dtype = np.int64 if matrix.nnz >= 2 ** 31 else np.int32
+
+        np.save(os.path.join(directory, f"{name}_data.npy"), matrix.data)
+        np.save(os.path.join(directory, f"{name}_indices.npy"), matrix.indices.astype(index_dtype))
+        np.save(os.path.join(directory, f"{name}_indptr.npy"), matrix.indptr.astype(index_dtype))
+
+    @staticmethod
+    def _load_sparse(directory, name, shape, mmap_mode):
+        """
+        Recharge une matrice CSR sauvegardée par _save_sparse, sans copie
+        des tableaux projetés en mémoire.
+        """
+
+        arrays = [
+            np.load(os.path.join(directory, f"{name}_{part}.npy"), mmap_mode=mmap_mode)
+            for part in ("data", "indices", "indptr")
+        ]
+
+        return sparse.csr_matrix(tuple(arrays), shape=shape, copy=False)
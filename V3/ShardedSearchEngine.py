@@ -0,0 +1,303 @@
+import heapq
+import math
+import multiprocessing as mp
+import threading
+
+import numpy as np
+
+from FuzzyIndex import FuzzyIndex
+
+
+def _shard_worker(conn):
+    """
+    Boucle d'un processus de partition : construit le SearchEngine de sa
+    partition puis répond aux messages du processus principal.
+
+    Messages reçus (tuples) :
+    - ("build", analyseur, documents, options du moteur) -> (mots, DF local,
+      somme des longueurs)
+    - ("prune", mots) -> (mots, DF local, somme des longueurs)
+    - ("stats", N, DF global des mots locaux, longueur moyenne) -> None
+    - ("search", requête, k, paramètres) -> (indices, scores, identifiants
+      et occurrences des mots de la requête, norme de la requête)
+    - None : arrêt du processus
+    """
+
+    from Corpus import Corpus
+    from SearchEngine import SearchEngine
+
+    engine = None
+
+    while True:
+        message = conn.recv()
+        if message is None:
+            break
+
+        action = message[0]
+
+        try:
+            if action == "build":
+                _, analyzer, docs, options = message
+                corpus = Corpus("partition", analyzer=analyzer)
+                for doc in docs:
+                    corpus.add_document(doc)
+
+                engine = SearchEngine(corpus, cache_size=0, **options)
+                conn.send(_local_stats(engine))
+
+            elif action == "prune":
+                engine._prune_terms(message[1])
+                conn.send(_local_stats(engine))
+
+            elif action == "stats":
+                _, n_docs, df, avgdl = message
+                engine.set_collection_stats(n_docs, df, avgdl)
+                conn.send(None)
+
+            elif action == "search":
+                _, query, k, params = message
+                best, scores = engine._rank(query, k, **params)
+
+                # Mots de la requête et norme sur le vocabulaire de la
+                # partition : le processus principal en déduit la norme
+                # globale de la requête, à laquelle il ramène les scores cosinus
+                ids, tf = engine._query_term_counts(query)
+                weights = tf * engine.idf[ids]
+                q_norm = math.sqrt(float((weights * weights).sum()))
+
+                conn.send((best.tolist(), scores.tolist(), ids.tolist(), tf.tolist(), q_norm))
+
+        except Exception as e:
+            conn.send(e)
+
+
+def _local_stats(engine):
+    """
+    Statistiques d'une partition : mots, DF local et somme des longueurs.
+    """
+
+    TF = engine.mat_TF
+    df = np.bincount(TF.indices, minlength=TF.shape[1])
+    return engine._terms, df, float(TF.data.sum())
+
+
+class ShardedSearchEngine:
+    """
+    La classe ShardedSearchEngine répartit un corpus en N partitions,
+    chacune indexée par un SearchEngine dans son propre processus :
+    - construction des index en parallèle
+    - IDF et longueur moyenne calculés sur toute la collection, afin que
+      les scores soient ceux d'un moteur unique
+    - requêtes diffusées à toutes les partitions (scatter-gather) et
+      fusion des top-k avec un tas
+
+    Les connexions aux partitions sont partagées : un verrou sérialise les
+    échanges, de sorte que search peut être appelée depuis plusieurs threads.
+    """
+
+    def __init__(self, corpus, n_shards=None, model="tfidf", k1=1.2, b=0.75,
+                 stopwords=None, max_df=None, max_expansions=50, fuzzy=True):
+        """
+        Découpe le corpus en partitions et construit un index par partition.
+
+        :param corpus: Objet Corpus contenant les documents
+        :param n_shards: Nombre de partitions (par défaut, nombre de cœurs)
+        :param model: Modèle de pondération par défaut ("tfidf" ou "bm25")
+        :param k1: Paramètre k1 de BM25
+        :param b: Paramètre b de BM25
+        :param stopwords: Langue(s) des mots vides (voir SearchEngine)
+        :param max_df: Seuil de la liste automatique de mots vides, appliqué
+                       au DF de toute la collection (voir SearchEngine)
+        :param max_expansions: Nombre maximal de mots retenus pour un motif
+                               à jokers (les plus fréquents de la collection)
+        :param fuzzy: Correction des mots de requête absents du vocabulaire
+        """
+
+        self.corpus = corpus
+        self.model = model
+        self.k1 = k1
+        self.b = b
+        self.max_expansions = max_expansions
+        self.fuzzy = fuzzy
+
+        self.documents = list(corpus.documents.values())
+        N = len(self.documents)
+
+        # Même analyse du texte que le corpus pour les requêtes
+        self.analyzer = corpus.analyzer
+
+        n_shards = n_shards or mp.cpu_count()
+        n_shards = max(1, min(n_shards, N))
+
+        # Partitions contiguës : la partition s couvre les documents
+        # offsets[s] .. offsets[s + 1] - 1
+        self.offsets = [N * s // n_shards for s in range(n_shards + 1)]
+
+        # Verrou des échanges avec les partitions (requête puis réponses)
+        self._lock = threading.Lock()
+
+        self._conns = []
+        self._processes = []
+        for _ in range(n_shards):
+            parent_conn, child_conn = mp.Pipe()
+            p = mp.Process(target=_shard_worker, args=(child_conn,), daemon=True)
+            p.start()
+            self._conns.append(parent_conn)
+            self._processes.append(p)
+
+        # Construction des index en parallèle
+        for s, conn in enumerate(self._conns):
+            conn.send((
+                "build", self.analyzer,
+                self.documents[self.offsets[s]:self.offsets[s + 1]],
+                {"stopwords": stopwords, "max_expansions": max_expansions, "fuzzy": fuzzy}
+            ))
+        shard_stats = self._gather()
+        self._merge_stats(shard_stats)
+
+        # Liste automatique de mots vides, établie sur toute la collection
+        if max_df is not None:
+            frequents = [m for m, d in self.df.items() if d > max_df * N]
+            for conn in self._conns:
+                conn.send(("prune", frequents))
+            shard_stats = self._gather()
+            self._merge_stats(shard_stats)
+
+        # Chaque partition est repondérée avec les statistiques globales
+        for conn, (terms, _, _) in zip(self._conns, shard_stats):
+            conn.send(("stats", N, [self.df.get(m, 0) for m in terms], self.avgdl))
+        self._gather()
+
+        # Index des fautes de frappe, avec le même DF global : construit
+        # avec le vocabulaire, comme dans chaque partition
+        self._fuzzy_index = None
+        if self.fuzzy:
+            self._fuzzy_index = FuzzyIndex(
+                self.analyzer.terms, [self.df.get(m, 0) for m in self.analyzer.terms]
+            )
+
+    def _merge_stats(self, shard_stats):
+        """
+        Statistiques globales : DF de chaque mot et longueur moyenne.
+        """
+
+        self.df = {}
+        total_len = 0.0
+        for terms, df, length in shard_stats:
+            for m, d in zip(terms, df):
+                if d:
+                    self.df[m] = self.df.get(m, 0) + int(d)
+            total_len += length
+
+        self.n_docs = len(self.documents)
+        self.avgdl = total_len / self.n_docs if self.n_docs > 0 else 0.0
+
+    def _gather(self):
+        """
+        Attend la réponse de chaque partition (dans l'ordre des partitions).
+        """
+
+        replies = [conn.recv() for conn in self._conns]
+        for r in replies:
+            if isinstance(r, Exception):
+                raise r
+        return replies
+
+    def _query_norm(self, ids, counts):
+        """
+        Norme du vecteur TF-IDF de la requête avec l'IDF global, à partir
+        des mots de la requête (identifiants et occurrences) renvoyés par
+        une partition.
+        """
+
+        total = 0.0
+        for j, c in zip(ids, counts):
+            d = self.df.get(self.analyzer.terms[j])
+            if d:
+                total += (c * math.log(self.n_docs / d)) ** 2
+        return math.sqrt(total)
+
+    def suggest(self, query):
+        """
+        Suggestion « Vouliez-vous dire » (voir SearchEngine.suggest).
+        """
+
+        if not self.fuzzy or not FuzzyIndex.unknown_words(query, self.analyzer):
+            return None
+        return self._fuzzy_index.correct(query, self.analyzer)
+
+    def search(self, query, k=5, model=None, k1=None, b=None,
+               source=None, author=None, start=None, end=None):
+        """
+        Recherche les k documents les plus pertinents dans toutes les
+        partitions. Les paramètres sont ceux de SearchEngine.search ;
+        l'IDF est toujours celui de toute la collection.
+        """
+
+        model = model or self.model
+        params = {
+            "model": model,
+            "k1": self.k1 if k1 is None else k1,
+            "b": self.b if b is None else b,
+            "source": source, "author": author, "start": start, "end": end,
+        }
+
+        # Diffusion de la requête à toutes les partitions ; les réponses
+        # sont lues avant qu'un autre thread n'utilise les connexions
+        with self._lock:
+            for conn in self._conns:
+                conn.send(("search", query, k, params))
+            replies = self._gather()
+
+        # Score cosinus ramené à la norme globale de la requête ; les mots
+        # de la requête sont les mêmes dans toutes les partitions (même
+        # lexique, mêmes statistiques globales)
+        q_norm = None
+        if model == "tfidf" and replies:
+            _, _, ids, counts, _ = replies[0]
+            q_norm = self._query_norm(ids, counts)
+
+        candidats = []
+        for s, (best, scores, _, _, shard_q_norm) in enumerate(replies):
+            ratio = shard_q_norm / q_norm if q_norm else 1.0
+            for i, score in zip(best, scores):
+                candidats.append((score * ratio, -(self.offsets[s] + i)))
+
+        # Fusion des top-k : meilleurs scores, puis plus petits indices
+        meilleurs = heapq.nlargest(k, candidats)
+
+        results = []
+        for score, neg_i in meilleurs:
+            d = self.documents[-neg_i]
+            results.append({
+                "score": float(score),
+                "titre": d.titre,
+                "auteur": d.auteur,
+                "date": d.date,
+                "url": d.url,
+            })
+
+        return results
+
+    def close(self):
+        """
+        Arrête les processus des partitions.
+        """
+
+        with self._lock:
+            for conn in self._conns:
+                try:
+                    conn.send(None)
+                except (BrokenPipeError, OSError):
+                    pass
+            for p in self._processes:
+                p.join(timeout=5)
+
+            self._conns = []
+            self._processes = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
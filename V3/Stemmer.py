@@ -0,0 +1,285 @@
+import threading
+from collections import OrderedDict
+
+
+class Stemmer:
+    """
+    La classe Stemmer ramène les mots à leur racine, afin que les formes
+    d'un même mot ("model", "models", "modeling") partagent une seule
+    entrée du vocabulaire :
+    - anglais ("en") : algorithme de Porter
+    - français ("fr") : racinisation légère de Savoy (pluriel, féminin,
+      terminaisons verbales simples)
+
+    Les racines sont mémorisées dans un cache LRU borné : chaque forme
+    distincte n'est racinisée qu'une fois, quel que soit son nombre
+    d'occurrences.
+    """
+
+    # Langues disponibles
+    LANGUAGES = ("en", "fr")
+
+    def __init__(self, language, cache_size=50000):
+        """
+        :param language: Langue des textes ("en" ou "fr")
+        :param cache_size: Nombre maximal de formes mémorisées
+        """
+
+        if language not in self.LANGUAGES:
+            raise ValueError(f"Langue inconnue : {language} (attendu : {', '.join(self.LANGUAGES)})")
+
+        self.language = language
+        self._stem = _porter_stem if language == "en" else _french_stem
+
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # Le verrou n'est pas transmissible (copie vers un autre processus)
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def stem(self, mot):
+        """
+        Retourne la racine d'un mot.
+        """
+        return self.stem_tokens([mot])[0]
+
+    def stem_tokens(self, tokens):
+        """
+        Racinise une liste de mots en consultant d'abord le cache.
+
+        :return: Liste des racines, dans l'ordre des mots
+        """
+
+        cache = self._cache
+        racines = []
+
+        with self._lock:
+            for mot in tokens:
+                racine = cache.get(mot)
+                if racine is not None:
+                    cache.move_to_end(mot)
+                    self._hits += 1
+                else:
+                    racine = self._stem(mot)
+                    self._misses += 1
+                    if self.cache_size > 0:
+                        cache[mot] = racine
+                        if len(cache) > self.cache_size:
+                            cache.popitem(last=False)
+                racines.append(racine)
+
+        return racines
+
+    def cache_info(self):
+        """
+        Statistiques du cache des racines.
+        """
+
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "size": len(self._cache),
+                "maxsize": self.cache_size,
+            }
+
+
+# ================================
+# ANGLAIS : ALGORITHME DE PORTER
+# ================================
+
+_VOYELLES = "aeiou"
+
+
+def _consonne(mot, i):
+    """
+    Vrai si la lettre i est une consonne ("y" est une consonne
+    en début de mot ou après une voyelle).
+    """
+
+    c = mot[i]
+    if c in _VOYELLES:
+        return False
+    if c == "y":
+        return i == 0 or not _consonne(mot, i - 1)
+    return True
+
+
+def _mesure(radical):
+    """
+    Nombre m de séquences voyelles-consonnes du radical ([C](VC)^m[V]).
+    """
+
+    m = 0
+    precedente_voyelle = False
+    for i in range(len(radical)):
+        if _consonne(radical, i):
+            if precedente_voyelle:
+                m += 1
+            precedente_voyelle = False
+        else:
+            precedente_voyelle = True
+    return m
+
+
+def _contient_voyelle(radical):
+    return any(not _consonne(radical, i) for i in range(len(radical)))
+
+
+def _double_consonne(radical):
+    return (
+        len(radical) >= 2 and radical[-1] == radical[-2]
+        and _consonne(radical, len(radical) - 1)
+    )
+
+
+def _cvc(radical):
+    """
+    Vrai si le radical se termine par consonne-voyelle-consonne,
+    la dernière n'étant ni "w", ni "x", ni "y".
+    """
+
+    n = len(radical)
+    return (
+        n >= 3
+        and _consonne(radical, n - 3)
+        and not _consonne(radical, n - 2)
+        and _consonne(radical, n - 1)
+        and radical[-1] not in "wxy"
+    )
+
+
+def _remplacer(mot, regles, condition):
+    """
+    Applique la règle du plus long suffixe reconnu si son radical
+    vérifie la condition. Retourne (mot, suffixe reconnu).
+    """
+
+    for suffixe, remplacement in regles:
+        if mot.endswith(suffixe):
+            radical = mot[:len(mot) - len(suffixe)]
+            if condition(radical, suffixe):
+                return radical + remplacement, suffixe
+            return mot, suffixe
+    return mot, None
+
+
+def _trier(regles):
+    # Plus longs suffixes en premier
+    return sorted(regles, key=lambda r: -len(r[0]))
+
+
+_ETAPE_2 = _trier([
+    ("ational", "ate"), ("tional", "tion"), ("enci", "ence"), ("anci", "ance"),
+    ("izer", "ize"), ("bli", "ble"), ("alli", "al"), ("entli", "ent"),
+    ("eli", "e"), ("ousli", "ous"), ("ization", "ize"), ("ation", "ate"),
+    ("ator", "ate"), ("alism", "al"), ("iveness", "ive"), ("fulness", "ful"),
+    ("ousness", "ous"), ("aliti", "al"), ("iviti", "ive"), ("biliti", "ble"),
+    ("logi", "log"),
+])
+
+_ETAPE_3 = _trier([
+    ("icate", "ic"), ("ative", ""), ("alize", "al"), ("iciti", "ic"),
+    ("ical", "ic"), ("ful", ""), ("ness", ""),
+])
+
+_ETAPE_4 = _trier([
+    (s, "") for s in (
+        "al", "ance", "ence", "er", "ic", "able", "ible", "ant", "ement",
+        "ment", "ent", "ion", "ou", "ism", "ate", "iti", "ous", "ive", "ize",
+    )
+])
+
+
+def _porter_stem(mot):
+    """
+    Racine d'un mot anglais selon l'algorithme de Porter (1980).
+    """
+
+    if len(mot) <= 2:
+        return mot
+
+    # Étape 1a : pluriels
+    if mot.endswith("sses") or mot.endswith("ies"):
+        mot = mot[:-2]
+    elif mot.endswith("s") and not mot.endswith("ss"):
+        mot = mot[:-1]
+
+    # Étape 1b : participes passés et présents
+    if mot.endswith("eed"):
+        if _mesure(mot[:-3]) > 0:
+            mot = mot[:-1]
+    else:
+        for suffixe in ("ed", "ing"):
+            if mot.endswith(suffixe) and _contient_voyelle(mot[:-len(suffixe)]):
+                mot = mot[:-len(suffixe)]
+                if mot.endswith(("at", "bl", "iz")):
+                    mot += "e"
+                elif _double_consonne(mot) and mot[-1] not in "lsz":
+                    mot = mot[:-1]
+                elif _mesure(mot) == 1 and _cvc(mot):
+                    mot += "e"
+                break
+
+    # Étape 1c : y final
+    if mot.endswith("y") and _contient_voyelle(mot[:-1]):
+        mot = mot[:-1] + "i"
+
+    # Étapes 2 et 3 : suffixes dérivationnels
+    m_positive = lambda radical, _: _mesure(radical) > 0
+    mot, _ = _remplacer(mot, _ETAPE_2, m_positive)
+    mot, _ = _remplacer(mot, _ETAPE_3, m_positive)
+
+    # Étape 4 : suppression des suffixes
+    mot, _ = _remplacer(mot, _ETAPE_4, lambda radical, suffixe: (
+        _mesure(radical) > 1 and (suffixe != "ion" or radical.endswith(("s", "t")))
+    ))
+
+    # Étape 5 : e final et double l
+    if mot.endswith("e"):
+        m = _mesure(mot[:-1])
+        if m > 1 or (m == 1 and not _cvc(mot[:-1])):
+            mot = mot[:-1]
+    if mot.endswith("ll") and _mesure(mot) > 1:
+        mot = mot[:-1]
+
+    return mot
+
+
+# ================================
+# FRANÇAIS : RACINISATION LÉGÈRE
+# ================================
+
+def _french_stem(mot):
+    """
+    Racinisation légère d'un mot français (J. Savoy) : pluriels en -s / -x
+    (-aux -> -al), puis terminaisons -r, -e, -é et consonne doublée.
+    Les mots de 5 lettres ou moins sont conservés tels quels.
+    """
+
+    if len(mot) <= 5:
+        return mot
+
+    if mot.endswith("x"):
+        if mot.endswith("aux"):
+            return mot[:-2] + "l"
+        return mot[:-1]
+
+    for terminaison in ("s", "r", "e", "é"):
+        if mot.endswith(terminaison):
+            mot = mot[:-1]
+
+    if len(mot) >= 2 and mot[-1] == mot[-2]:
+        mot = mot[:-1]
+
+    return mot
@@ -0,0 +1,65 @@
+# StopWords.py
+
+# ================================
+# LISTES DE MOTS VIDES
+# ================================
+# Mots très fréquents ("the", "de", "le"...) dont l'IDF est quasi nul mais
+# qui occupent une grande partie des matrices TF et TF-IDF : SearchEngine
+# les retire de l'index et des requêtes.
+
+ENGLISH = frozenset("""
+a about above after again against all am an and any are aren't as at be
+because been before being below between both but by can can't cannot could
+couldn't did didn't do does doesn't doing don't down during each few for
+from further had hadn't has hasn't have haven't having he he'd he'll he's
+her here here's hers herself him himself his how how's i i'd i'll i'm i've
+if in into is isn't it it's its itself just let's me more most mustn't my
+myself no nor not now of off on once only or other ought our ours ourselves
+out over own same shan't she she'd she'll she's should shouldn't so some
+such than that that's the their theirs them themselves then there there's
+these they they'd they'll they're they've this those through to too under
+until up very was wasn't we we'd we'll we're we've were weren't what what's
+when when's where where's which while who who's whom why why's will with
+won't would wouldn't you you'd you'll you're you've your yours yourself
+yourselves
+""".split())
+
+FRENCH = frozenset("""
+a ai aie aient aies ait alors as au aucun aura aurai auraient aurais aurait
+auras aurez auriez aurions aurons auront aussi autre aux avaient avais avait
+avec avez aviez avions avoir avons ayant ayez ayons c ce ceci cela celle
+celles celui ces cet cette ceux chaque comme d dans de des donc du elle
+elles en encore es est et étaient étais était étant été êtes étiez étions
+être eu eue eues eûmes eurent eus eusse eussent eusses eussiez eussions
+eut eût eûtes eux fûmes furent fus fusse fussent fusses fussiez fussions
+fut fût fûtes il ils j je l la le les leur leurs lui m ma mais me même mes
+moi mon n ne nos notre nous on ont ou où par pas pour qu que quel quelle
+quelles quels qui s sa sans se sera serai seraient serais serait seras
+serez seriez serions serons seront ses si son sont sous sur t ta te tes
+toi ton tous tout toute toutes très tu un une vos votre vous y
+""".split())
+
+STOPWORDS = {"en": ENGLISH, "fr": FRENCH}
+
+
+def stopword_list(languages):
+    """
+    Réunit les listes de mots vides de plusieurs langues.
+
+    :param languages: Code de langue ("en", "fr"), liste de codes ou None
+    :return: (codes de langue retenus, ensemble des mots vides)
+    """
+
+    if not languages:
+        return (), frozenset()
+
+    if isinstance(languages, str):
+        languages = (languages,)
+
+    mots = set()
+    for lang in languages:
+        if lang not in STOPWORDS:
+            raise ValueError(f"Langue inconnue : {lang} (attendu : {', '.join(STOPWORDS)})")
+        mots |= STOPWORDS[lang]
+
+    return tuple(languages), frozenset(mots)
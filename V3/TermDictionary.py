@@ -0,0 +1,134 @@
+import re
+from bisect import bisect_left
+
+import numpy as np
+
+
+class TermDictionary:
+    """
+    La classe TermDictionary range les mots du vocabulaire par ordre
+    alphabétique, afin de développer les motifs de requête :
+    - préfixe : optim*
+    - jokers : learn?ng, *isation, opt*ion
+
+    Les mots commençant par le préfixe littéral du motif forment un
+    intervalle du tableau trié, trouvé par dichotomie (bisect) ; un second
+    tableau, trié sur les mots inversés, sert de même aux motifs
+    commençant par un joker. Seuls les mots de cet intervalle sont examinés.
+    """
+
+    # Borne supérieure de tous les mots ayant un préfixe donné
+    _FIN = "\U0010ffff"
+
+    def __init__(self, terms, df):
+        """
+        :param terms: Mots du vocabulaire, dans l'ordre de leurs identifiants
+        :param df: DF de chaque mot (les mots de DF nul ne sont jamais
+                   proposés) ; l'attribut df peut être remplacé lorsque les
+                   DF changent, sans reconstruire le dictionnaire
+        """
+
+        self.df = np.asarray(df)
+
+        ordre = sorted(range(len(terms)), key=terms.__getitem__)
+        self._terms = [terms[j] for j in ordre]
+        self._ids = np.array(ordre, dtype=np.int64)
+
+        ordre = sorted(range(len(terms)), key=lambda j: terms[j][::-1])
+        self._reversed = [terms[j][::-1] for j in ordre]
+        self._reversed_ids = np.array(ordre, dtype=np.int64)
+
+    def add(self, terms, ids):
+        """
+        Insère des mots ajoutés au vocabulaire à leur place dans les deux
+        tableaux triés, sans reconstruire le dictionnaire : les nouveaux
+        mots, triés, sont fusionnés en un seul passage dans chaque tableau.
+
+        :param terms: Nouveaux mots
+        :param ids: Leurs identifiants
+        """
+
+        nouveaux = sorted(zip(terms, ids))
+        self._terms, self._ids = self._merge(self._terms, self._ids, nouveaux)
+
+        nouveaux = sorted((mot[::-1], j) for mot, j in nouveaux)
+        self._reversed, self._reversed_ids = self._merge(self._reversed, self._reversed_ids, nouveaux)
+
+    @staticmethod
+    def _merge(termes, ids, nouveaux):
+        """
+        Fusionne des (mot, identifiant) triés dans un tableau trié de mots
+        et le tableau de leurs identifiants.
+
+        :return: (mots, identifiants) après fusion
+        """
+
+        if not nouveaux:
+            return termes, ids
+
+        # Position d'insertion de chaque nouveau mot dans l'ancien tableau
+        # (croissante, les nouveaux mots étant triés)
+        positions = [bisect_left(termes, mot) for mot, _ in nouveaux]
+
+        fusion = []
+        debut = 0
+        for p, (mot, _) in zip(positions, nouveaux):
+            fusion.extend(termes[debut:p])
+            fusion.append(mot)
+            debut = p
+        fusion.extend(termes[debut:])
+
+        return fusion, np.insert(ids, positions, [j for _, j in nouveaux])
+
+    def _range(self, termes, prefixe):
+        """
+        Intervalle [début, fin) des mots triés commençant par prefixe.
+        """
+        return bisect_left(termes, prefixe), bisect_left(termes, prefixe + self._FIN)
+
+    def expand(self, motif, limit=None):
+        """
+        Mots du vocabulaire correspondant à un motif.
+
+        :param motif: Motif en minuscules ("*" : suite quelconque,
+                      "?" : un caractère)
+        :param limit: Nombre maximal de mots retournés (les plus fréquents,
+                      selon leur DF) ; None pour tous
+        :return: Identifiants des mots, par DF décroissant
+        """
+
+        prefixe = re.split(r"[*?]", motif, maxsplit=1)[0]
+        suffixe = re.split(r"[*?]", motif)[-1]
+
+        # Intervalle le plus court : par le préfixe, ou par le suffixe
+        # dans le tableau des mots inversés
+        debut, fin = self._range(self._terms, prefixe)
+        termes, ids = self._terms, self._ids
+        if suffixe:
+            r_debut, r_fin = self._range(self._reversed, suffixe[::-1])
+            if r_fin - r_debut < fin - debut:
+                debut, fin = r_debut, r_fin
+                termes, ids = self._reversed, self._reversed_ids
+
+        candidats = ids[debut:fin]
+
+        # Simple préfixe : tout l'intervalle correspond ; sinon le motif
+        # complet est vérifié sur les seuls mots de l'intervalle
+        if motif != prefixe + "*":
+            regex = re.compile(
+                "".join(".*" if c == "*" else "." if c == "?" else re.escape(c) for c in motif)
+            )
+            inverse = termes is self._reversed
+            correspond = [
+                regex.fullmatch(t[::-1] if inverse else t) is not None
+                for t in termes[debut:fin]
+            ]
+            candidats = candidats[np.array(correspond, dtype=bool)]
+
+        candidats = candidats[self.df[candidats] > 0]
+
+        # Les plus fréquents d'abord, puis par identifiant croissant
+        ordre = np.lexsort((candidats, -self.df[candidats]))
+        candidats = candidats[ordre]
+
+        return candidats if limit is None else candidats[:limit]
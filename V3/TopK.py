@@ -0,0 +1,40 @@
+import numpy as np
+
+
+def top_k(scores, k, candidates=None):
+    """
+    Sélectionne les k meilleurs documents d'un tableau de scores sans trier
+    tout le tableau : sélection partielle (np.argpartition) en O(N), puis
+    tri des seuls k éléments retenus.
+
+    À score égal, le document d'indice le plus petit passe en premier.
+
+    :param scores: Tableau NumPy des scores de tous les documents
+    :param k: Nombre de documents à retourner
+    :param candidates: Indices croissants des documents autorisés (optionnel)
+    :return: Indices des k meilleurs documents, par score décroissant
+    """
+
+    if candidates is not None:
+        return candidates[top_k(scores[candidates], k)]
+
+    n = len(scores)
+    k = min(k, n)
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+
+    if k < n:
+        # Valeur du k-ième meilleur score
+        part = np.argpartition(-scores, k - 1)[:k]
+        seuil = scores[part].min()
+
+        # Tous les scores strictement supérieurs, complétés par les ex aequo
+        # du seuil dans l'ordre croissant des indices
+        above = np.flatnonzero(scores > seuil)
+        equal = np.flatnonzero(scores == seuil)[:k - len(above)]
+        sel = np.concatenate([above, equal])
+    else:
+        sel = np.arange(n)
+
+    # Tri stable : score décroissant, puis indice croissant
+    return sel[np.lexsort((sel, -scores[sel]))]
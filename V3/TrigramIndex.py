@@ -0,0 +1,354 @@
+import re
+
+import numpy as np
+
+try:
+    from re import _parser as sre_parse     # Python >= 3.11
+except ImportError:
+    import sre_parse
+
+from Postings import EMPTY, intersect_all, union
+
+
+class _Unsupported(Exception):
+    """
+    Expression régulière dont les occurrences ne peuvent pas être
+    cherchées document par document (ancres de début / fin, assertions).
+    """
+
+
+# Répétitions d'un motif (POSSESSIVE_REPEAT : Python >= 3.11)
+_REPEATS = {
+    getattr(sre_parse, nom)
+    for nom in ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT")
+    if hasattr(sre_parse, nom)
+}
+
+# Opérations empêchant la recherche par document : une occurrence
+# pourrait dépendre du texte des documents voisins
+_UNSUPPORTED = {
+    getattr(sre_parse, nom)
+    for nom in ("ASSERT", "ASSERT_NOT", "GROUPREF", "GROUPREF_EXISTS")
+    if hasattr(sre_parse, nom)
+}
+
+# Classes prédéfinies contenant le saut de ligne (\s, \D, \W)
+_NEWLINE_CATEGORIES = {
+    getattr(sre_parse, nom)
+    for nom in ("CATEGORY_SPACE", "CATEGORY_NOT_DIGIT", "CATEGORY_NOT_WORD",
+                "CATEGORY_LINEBREAK", "CATEGORY_UNI_SPACE", "CATEGORY_UNI_NOT_DIGIT",
+                "CATEGORY_UNI_NOT_WORD", "CATEGORY_UNI_LINEBREAK")
+    if hasattr(sre_parse, nom)
+}
+
+# Caractères non ASCII que re.IGNORECASE confond avec une lettre ASCII
+_ASCII_FOLDS = {0x130: ord("i"), 0x131: ord("i"), 0x212A: ord("k"), 0x17F: ord("s")}
+
+
+class TrigramIndex:
+    """
+    La classe TrigramIndex accélère les recherches par expression
+    régulière (Corpus.search, Corpus.concorde), à la manière des moteurs
+    de recherche de code :
+    - chaque trigramme de caractères (en minuscules) a sa liste de
+      postings : documents dont le texte contient le trigramme
+    - les littéraux qu'une occurrence de l'expression contient
+      nécessairement sont extraits de son arbre syntaxique (séquences de
+      caractères, alternatives, répétitions au moins une fois), puis
+      traduits en intersections / unions de listes de trigrammes
+    - l'expression n'est ensuite exécutée que sur les documents candidats
+
+    Une expression sans littéral d'au moins 3 caractères, dépendant du
+    texte voisin (ancres ^ $, assertions), ou pouvant reconnaître un saut
+    de ligne (\\s, \\W, classes niées, \\n, point avec re.DOTALL) n'est pas
+    restreinte : elle est exécutée sur tout le texte, où une occurrence
+    peut chevaucher le séparateur "\n" entre deux documents.
+
+    Les documents ajoutés après la construction sont indexés à part
+    (extend), dans un segment de plus ; les segments sont fusionnés
+    lorsqu'ils deviennent trop nombreux.
+    """
+
+    # Nombre de segments au-delà duquel ils sont fusionnés
+    MAX_SEGMENTS = 8
+
+    def __init__(self, texte, debuts):
+        """
+        :param texte: Textes de tous les documents concaténés
+        :param debuts: Début du texte de chaque document dans texte
+                       (tableau de taille n + 1, voir DocumentTable.full_text)
+        """
+
+        self.n_docs = 0
+        self._segments = []
+        self.extend(texte, debuts)
+
+    def extend(self, texte, debuts):
+        """
+        Indexe les documents ajoutés depuis la construction de l'index.
+
+        :param texte: Textes de tous les documents concaténés
+        :param debuts: Début du texte de chaque document dans texte
+        """
+
+        n = len(debuts) - 1
+        if n <= self.n_docs:
+            return
+
+        debuts = np.asarray(debuts)
+        debut = int(debuts[self.n_docs])
+        self._segments.append(
+            self._build(texte[debut:int(debuts[-1])], debuts[self.n_docs:] - debut, self.n_docs)
+        )
+        self.n_docs = n
+
+        if len(self._segments) > self.MAX_SEGMENTS:
+            self._merge()
+
+    @classmethod
+    def _build(cls, texte, debuts, decalage):
+        """
+        Postings des trigrammes d'un segment de documents.
+
+        :param texte: Textes des documents du segment concaténés
+        :param debuts: Début de chaque texte dans texte (taille n + 1)
+        :param decalage: Numéro du premier document du segment
+        :return: (trigrammes triés, pointeurs, documents) au format CSR
+        """
+
+        # Caractères en minuscules (A-Z, et lettres confondues avec une
+        # lettre ASCII par re.IGNORECASE) ; les autres sont conservés
+        codes = np.frombuffer(texte.encode("utf-32-le"), dtype=np.uint32).astype(np.int64)
+        majuscules = (codes >= 65) & (codes <= 90)
+        codes[majuscules] += 32
+        for c, ascii_ in _ASCII_FOLDS.items():
+            codes[codes == c] = ascii_
+
+        # Trigramme commençant à chaque position (3 caractères de 21 bits),
+        # limité aux trigrammes contenus dans un seul document
+        grams = (codes[:-2] << 42) | (codes[1:-1] << 21) | codes[2:]
+        positions = np.arange(len(grams), dtype=np.int64)
+        docs = np.searchsorted(debuts, positions, side="right") - 1
+        internes = positions + 3 <= debuts[docs + 1]
+        grams, docs = grams[internes], docs[internes]
+
+        # Postings : paires (trigramme, document) distinctes, triées par
+        # trigramme puis par document (tri stable sur un texte en ordre)
+        ordre = np.argsort(grams, kind="stable")
+        grams, docs = grams[ordre], docs[ordre]
+        nouveaux = np.ones(len(grams), dtype=bool)
+        nouveaux[1:] = (grams[1:] != grams[:-1]) | (docs[1:] != docs[:-1])
+        grams, docs = grams[nouveaux], docs[nouveaux]
+
+        return cls._csr(grams, (docs + decalage).astype(np.int32))
+
+    @staticmethod
+    def _csr(grams, docs):
+        """
+        Format CSR de paires (trigramme, document) triées par trigramme.
+        """
+
+        debut_gram = np.flatnonzero(np.r_[True, grams[1:] != grams[:-1]]) if len(grams) else EMPTY
+        return grams[debut_gram], np.append(debut_gram, len(grams)), docs
+
+    def _merge(self):
+        """
+        Fusionne les segments en un seul. Les segments couvrant des
+        documents consécutifs, un tri stable par trigramme garde les
+        documents de chaque liste en ordre croissant.
+        """
+
+        grams = np.concatenate([np.repeat(g, np.diff(p)) for g, p, _ in self._segments])
+        docs = np.concatenate([d for _, _, d in self._segments])
+        ordre = np.argsort(grams, kind="stable")
+        self._segments = [self._csr(grams[ordre], docs[ordre])]
+
+    @property
+    def nbytes(self):
+        """
+        Mémoire occupée par l'index (en octets).
+        """
+        return sum(g.nbytes + p.nbytes + d.nbytes for g, p, d in self._segments)
+
+    @staticmethod
+    def _fold(c):
+        """
+        Caractère d'un littéral tel qu'indexé, ou None si re.IGNORECASE
+        peut le faire correspondre à un caractère indexé différemment.
+        """
+
+        if c < 128:
+            return c + 32 if 65 <= c <= 90 else c
+        if c in _ASCII_FOLDS:
+            return _ASCII_FOLDS[c]
+        ch = chr(c)
+        return c if ch.lower() == ch.upper() else None
+
+    def _sequence(self, items):
+        """
+        Contrainte sur les trigrammes d'une suite d'éléments d'expression
+        régulière.
+
+        :return: Arbre ("gram", code), ("and", [nœuds]), ("or", [nœuds]),
+                 ou None si la suite n'impose aucun trigramme
+        :raises _Unsupported: Ancre ou assertion dans l'expression
+        """
+
+        contraintes = []
+        litteral = []
+
+        def ajoute_litteral():
+            for k in range(len(litteral) - 2):
+                code = (litteral[k] << 42) | (litteral[k + 1] << 21) | litteral[k + 2]
+                contraintes.append(("gram", code))
+            litteral.clear()
+
+        for op, av in items:
+            if op is sre_parse.LITERAL:
+                c = self._fold(av)
+                if c is not None:
+                    litteral.append(c)
+                    continue
+                ajoute_litteral()
+                continue
+
+            # \b et \B n'occupent aucun caractère : le littéral continue
+            if op is sre_parse.AT:
+                if av in (sre_parse.AT_BOUNDARY, sre_parse.AT_NON_BOUNDARY):
+                    continue
+                raise _Unsupported()
+            if op in _UNSUPPORTED:
+                raise _Unsupported()
+
+            ajoute_litteral()
+
+            if op is sre_parse.SUBPATTERN:
+                contrainte = self._sequence(av[-1])
+            elif op is sre_parse.BRANCH:
+                alternatives = [self._sequence(a) for a in av[1]]
+                contrainte = None if None in alternatives else ("or", alternatives)
+            elif op in _REPEATS:
+                # Motif répété au moins une fois : ses trigrammes sont requis
+                contrainte = self._sequence(av[2]) if av[0] >= 1 else None
+            elif op is getattr(sre_parse, "ATOMIC_GROUP", None):
+                contrainte = self._sequence(av)
+            else:
+                # Classe de caractères, point, etc. : aucun trigramme imposé
+                contrainte = None
+
+            if contrainte is not None:
+                contraintes.append(contrainte)
+
+        ajoute_litteral()
+
+        if not contraintes:
+            return None
+        return contraintes[0] if len(contraintes) == 1 else ("and", contraintes)
+
+    @classmethod
+    def _matches_newline(cls, items, dotall):
+        """
+        Indique si une suite d'éléments d'expression régulière peut
+        reconnaître un saut de ligne (au sens large : tout élément inconnu
+        est supposé le pouvoir).
+        """
+
+        for op, av in items:
+            if op is sre_parse.LITERAL:
+                trouve = av == 10
+            elif op is sre_parse.NOT_LITERAL:
+                trouve = av != 10
+            elif op is sre_parse.ANY:
+                trouve = dotall
+            elif op is sre_parse.IN:
+                trouve = cls._class_matches_newline(av)
+            elif op is sre_parse.CATEGORY:
+                trouve = av in _NEWLINE_CATEGORIES
+            elif op is sre_parse.AT:
+                trouve = False
+            elif op is sre_parse.SUBPATTERN:
+                ajout, retrait = av[1], av[2]
+                local = (dotall or bool(ajout & re.DOTALL)) and not retrait & re.DOTALL
+                trouve = cls._matches_newline(av[-1], local)
+            elif op is sre_parse.BRANCH:
+                trouve = any(cls._matches_newline(a, dotall) for a in av[1])
+            elif op in _REPEATS:
+                trouve = cls._matches_newline(av[2], dotall)
+            elif op is getattr(sre_parse, "ATOMIC_GROUP", None):
+                trouve = cls._matches_newline(av, dotall)
+            else:
+                trouve = True
+            if trouve:
+                return True
+        return False
+
+    @staticmethod
+    def _class_matches_newline(elements):
+        """
+        Indique si une classe de caractères [...] contient le saut de ligne.
+        """
+
+        nie = bool(elements) and elements[0][0] is sre_parse.NEGATE
+        contient = False
+        for op, av in elements[1 if nie else 0:]:
+            if op is sre_parse.LITERAL:
+                contient = av == 10
+            elif op is sre_parse.CATEGORY:
+                contient = av in _NEWLINE_CATEGORIES
+            elif op is sre_parse.RANGE:
+                contient = av[0] <= 10 <= av[1]
+            else:
+                return True
+            if contient:
+                break
+        return contient != nie
+
+    def _postings(self, noeud):
+        """
+        Documents vérifiant une contrainte sur les trigrammes.
+        """
+
+        if noeud[0] == "gram":
+            listes = []
+            for grams, ptr, docs in self._segments:
+                k = np.searchsorted(grams, noeud[1])
+                if k < len(grams) and grams[k] == noeud[1]:
+                    listes.append(docs[ptr[k]:ptr[k + 1]])
+            # Segments de documents consécutifs : listes déjà ordonnées
+            if not listes:
+                return EMPTY
+            return listes[0] if len(listes) == 1 else np.concatenate(listes)
+
+        listes = [self._postings(n) for n in noeud[1]]
+        return intersect_all(listes) if noeud[0] == "and" else union(listes)
+
+    def candidates(self, pattern):
+        """
+        Documents pouvant contenir une occurrence de l'expression régulière.
+
+        :param pattern: Expression régulière compilée (re.compile)
+        :return: Numéros des documents candidats (croissants), ou None si
+                 l'expression doit être exécutée sur tout le texte
+        """
+
+        if not isinstance(pattern.pattern, str):
+            return None
+
+        # L'analyse repose sur l'arbre interne du module re, dont la forme
+        # peut changer d'une version de Python à l'autre : toute erreur
+        # (y compris _Unsupported) ramène au parcours complet du texte
+        try:
+            arbre = sre_parse.parse(pattern.pattern, pattern.flags)
+
+            # Une occurrence contenant un saut de ligne peut chevaucher deux
+            # documents : elle n'est trouvée qu'en parcourant tout le texte
+            if self._matches_newline(arbre, bool(arbre.state.flags & re.DOTALL)):
+                return None
+
+            contrainte = self._sequence(arbre)
+        except Exception:
+            return None
+
+        if contrainte is None:
+            return None
+        return self._postings(contrainte)
@@ -0,0 +1,262 @@
+# server.py
+
+# ================================
+# SERVICE HTTP DE RECHERCHE
+# ================================
+# Charge une fois un index sauvegardé par SearchEngine.save() et répond
+# aux requêtes de recherche en JSON.
+#
+# Exemples :
+#   python server.py --index index_corpus --port 8000
+#   python server.py --index index_corpus --build-from corpus.csv
+#   python server.py --index index_corpus --build-from corpus.csv --stemming en --stopwords en
+#
+#   GET  /search?q=neural+network&k=5&source=Arxiv&start=2020-01-01
+#   POST /search  {"q": "neural network", "k": 5, "author": "smith"}
+#   GET  /health
+#   GET  /stats
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from SearchEngine import SearchEngine
+
+
+class PooledHTTPServer(HTTPServer):
+    """
+    Serveur HTTP dont les requêtes sont traitées par un pool de threads
+    de taille fixe. L'index étant en lecture seule, les clients concurrents
+    ne se bloquent pas entre eux (seul le cache du moteur est verrouillé).
+    """
+
+    # Redémarrage rapide du serveur sur le même port
+    allow_reuse_address = True
+
+    def __init__(self, address, handler, engine, workers=4):
+        """
+        :param address: (hôte, port)
+        :param handler: Classe de traitement des requêtes
+        :param engine: SearchEngine partagé par tous les threads
+        :param workers: Nombre de threads du pool
+        """
+        super().__init__(address, handler)
+        self.engine = engine
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+
+    def process_request(self, request, client_address):
+        """
+        Confie la requête à un thread du pool.
+        """
+        self.pool.submit(self._process_request_thread, request, client_address)
+
+    def _process_request_thread(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=True)
+
+
+class SearchRequestHandler(BaseHTTPRequestHandler):
+    """
+    Traitement des requêtes HTTP :
+    - /search : recherche (paramètres d'URL en GET, corps JSON en POST)
+    - /health : état du service
+    - /stats  : statistiques du cache de résultats
+    """
+
+    # Paramètres de recherche acceptés
+    PARAMS = ("q", "k", "model", "k1", "b", "source", "author", "start", "end", "idf_scope")
+
+    def do_GET(self):
+        url = urlparse(self.path)
+
+        if url.path == "/search":
+            params = {key: values[0] for key, values in parse_qs(url.query).items()}
+            self._search(params)
+        elif url.path == "/health":
+            self._send_json(200, {"status": "ok", "documents": len(self.server.engine.documents)})
+        elif url.path == "/stats":
+            self._send_json(200, self.server.engine.cache_info())
+        else:
+            self._send_json(404, {"error": f"Chemin inconnu : {url.path}"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+
+        if url.path != "/search":
+            self._send_json(404, {"error": f"Chemin inconnu : {url.path}"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            params = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(params, dict):
+                raise ValueError("le corps doit être un objet JSON")
+        except ValueError as e:
+            self._send_json(400, {"error": f"Corps JSON invalide : {e}"})
+            return
+
+        self._search(params)
+
+    def _search(self, params):
+        """
+        Exécute une recherche et renvoie les résultats avec la durée
+        de traitement (dans la réponse et dans l'en-tête X-Response-Time-Ms).
+        Toute erreur est renvoyée en JSON : 400 pour une requête invalide,
+        500 pour une erreur interne (la connexion n'est jamais coupée).
+        """
+
+        debut = time.perf_counter()
+
+        try:
+            kwargs = self._parse_params(params)
+            query = kwargs.pop("query")
+            results = self.server.engine.search(query, **kwargs)
+
+            # Requête corrigée, si des mots inconnus ont été remplacés
+            suggestion = self.server.engine.suggest(query)
+        except ValueError as e:
+            status, payload = 400, {"error": str(e)}
+        except Exception as e:
+            self.log_error("Erreur interne : %r", e)
+            status, payload = 500, {"error": "Erreur interne du serveur"}
+        else:
+            status, payload = 200, {"query": query, "k": kwargs["k"], "results": results}
+            if suggestion is not None:
+                payload["did_you_mean"] = suggestion
+
+        took_ms = (time.perf_counter() - debut) * 1000
+        payload["took_ms"] = round(took_ms, 3)
+
+        self._send_json(status, payload, took_ms=took_ms)
+
+    def _parse_params(self, params):
+        """
+        Valide et convertit les paramètres de recherche.
+        """
+
+        inconnus = set(params) - set(self.PARAMS)
+        if inconnus:
+            raise ValueError(f"Paramètres inconnus : {', '.join(sorted(inconnus))}")
+
+        query = str(params.get("q", "")).strip()
+        if not query:
+            raise ValueError("Paramètre 'q' manquant")
+
+        kwargs = {"query": query}
+
+        try:
+            kwargs["k"] = int(params.get("k", 5))
+            for name in ("k1", "b"):
+                if params.get(name) not in (None, ""):
+                    kwargs[name] = float(params[name])
+            for name in ("start", "end"):
+                if params.get(name):
+                    kwargs[name] = date.fromisoformat(str(params[name]))
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Paramètre invalide : {e}")
+
+        if kwargs["k"] <= 0:
+            raise ValueError("Le paramètre 'k' doit être positif")
+
+        for name in ("model", "source", "author", "idf_scope"):
+            if params.get(name):
+                kwargs[name] = str(params[name])
+
+        return kwargs
+
+    def _send_json(self, status, payload, took_ms=None):
+        body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if took_ms is not None:
+            self.send_header("X-Response-Time-Ms", f"{took_ms:.3f}")
+        self.end_headers()
+        self.wfile.write(body)
+
+        if took_ms is not None:
+            self.log_message('"%s" %d %.3f ms', self.requestline, status, took_ms)
+
+    def log_request(self, code="-", size="-"):
+        # Les recherches sont journalisées avec leur durée dans _send_json
+        if not self.path.startswith("/search"):
+            super().log_request(code, size)
+
+
+def build_index(corpus_csv, index_dir, stemming=None, stopwords=None, max_df=None):
+    """
+    Construit et sauvegarde l'index d'un corpus sauvegardé par Corpus.save().
+
+    :param stemming: Langue de racinisation ("en", "fr") ou None
+    :param stopwords: Langue(s) des mots vides retirés de l'index
+    :param max_df: Seuil de DF de la liste automatique de mots vides
+    """
+
+    from Analyzer import Analyzer
+    from Corpus import Corpus
+
+    corpus = Corpus("Corpus_Serveur", analyzer=Analyzer(stemming=stemming))
+    corpus.load(corpus_csv)
+
+    engine = SearchEngine(corpus, stopwords=stopwords, max_df=max_df)
+    engine.save(index_dir)
+    print(f"✅ Index de {len(corpus.documents)} documents sauvegardé dans '{index_dir}'")
+
+    info = engine.index_info()
+    print(f"   {info['postings']} postings compressés : {info['postings_bytes'] / 1e6:.1f} Mo "
+          f"({info['csc_bytes'] / 1e6:.1f} Mo par matrice CSC)")
+    print(f"   Matrice TF par document : {info['tf_bytes'] / 1e6:.1f} Mo, "
+          f"index complet : {info['bytes'] / 1e6:.1f} Mo")
+    if info["pruned_postings"]:
+        print(f"   {info['stopwords']} mots vides : {info['pruned_postings']} postings "
+              f"({info['pruned_bytes'] / 1e6:.1f} Mo) retirés de l'index")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Service HTTP du moteur de recherche")
+    parser.add_argument("--index", required=True, help="Répertoire de l'index (SearchEngine.save)")
+    parser.add_argument("--build-from", help="Corpus CSV (Corpus.save) à indexer si l'index est absent")
+    parser.add_argument("--stemming", choices=("en", "fr"), help="Racinisation lors de la construction de l'index")
+    parser.add_argument("--stopwords", choices=("en", "fr"), nargs="+", help="Langue(s) des mots vides retirés de l'index")
+    parser.add_argument("--max-df", type=float, help="Mots présents dans plus de cette fraction des documents retirés de l'index")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--cache-size", type=int, default=128)
+    args = parser.parse_args()
+
+    if args.build_from and not os.path.exists(os.path.join(args.index, "meta.json")):
+        build_index(args.build_from, args.index, args.stemming, args.stopwords, args.max_df)
+
+    debut = time.perf_counter()
+    engine = SearchEngine.load(args.index, cache_size=args.cache_size)
+    print(f"✅ Index chargé en {(time.perf_counter() - debut) * 1000:.1f} ms "
+          f"({len(engine.documents)} documents)")
+
+    server = PooledHTTPServer((args.host, args.port), SearchRequestHandler, engine, args.workers)
+    print(f"🔎 Service de recherche sur http://{args.host}:{args.port} ({args.workers} threads)")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import random
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from ArxivDocument import ArxivDocument
+from AuthorIndex import AuthorIndex
+from Document import Document
+from DocumentTable import DocumentTable
+from RedditDocument import RedditDocument
+
+NOMS = ["Alice Martin", "alice martin", "Bob Durand", "Chloé Petit", "Dan", "Éric Roux", "Fatou Ba"]
+
+
+def _document(rnd, i):
+    date = datetime(2020, 1, 1) + timedelta(days=rnd.randint(0, 30))
+    date = None if rnd.random() < 0.1 else date.isoformat()
+    args = (f"titre {i}", rnd.choice(NOMS) + ("" if rnd.random() < 0.7 else f" {i}"),
+            date, f"url{i}", f"texte {i} " + rnd.choice(["tax", "jobs", "economy"]))
+
+    genre = rnd.randrange(3)
+    if genre == 1:
+        return RedditDocument(*args, nb_comments=rnd.randint(0, 9))
+    if genre == 2:
+        return ArxivDocument(*args, coauthors=rnd.sample(NOMS, rnd.randint(0, 2)) + [f"Co {i % 7}"])
+    return Document(*args)
+
+
+def _etat(table):
+    filtres = [{"source": "reddit"}, {"source": "Arxiv"}, {"author": "martin"},
+               {"coauthor": "co"}, {"coauthor": "alice"}, {"start": "2020-01-10", "end": "2020-01-20"}]
+    return (
+        np.nan_to_num(table.epochs(), nan=-1).tolist(),
+        table.author_codes().tolist(),
+        table.date_range("2020-01-05", "2020-01-25").tolist(),
+        table.latest(15).tolist(),
+        table.full_text()[0],
+        table.full_text()[1].tolist(),
+        sorted(table.find_authors("mar")),
+        table.find_authors("a", prefix=True),
+        table.author_rows("o", coauthors=True).tolist(),
+        table.author_rows("alice", prefix=True).tolist(),
+        [table.mask(**f).tolist() for f in filtres],
+    )
+
+
+def test_append_equals_rebuild():
+    rnd = random.Random(0)
+    documents = [_document(rnd, i) for i in range(120)]
+
+    table = DocumentTable()
+    for i, doc in enumerate(documents):
+        table.append(doc)
+        # Structures dérivées lues entre les ajouts, puis prolongées
+        if i % 17 == 0:
+            _etat(table)
+
+    complete = DocumentTable()
+    complete.extend(documents)
+    assert _etat(table) == _etat(complete)
+
+
+def test_append_after_from_columns():
+    rnd = random.Random(1)
+    documents = [_document(rnd, i) for i in range(40)]
+
+    table = DocumentTable()
+    table.extend(documents[:25])
+    rechargee = DocumentTable.from_columns(table.to_columns(), table.author_names, table.sources)
+    rechargee.date_range("2020-01-05")
+    rechargee.extend(documents[25:])
+
+    complete = DocumentTable()
+    complete.extend(documents)
+    assert rechargee.date_range("2020-01-05").tolist() == complete.date_range("2020-01-05").tolist()
+    assert rechargee.latest(10).tolist() == complete.latest(10).tolist()
+    assert rechargee.mask(author="martin").tolist() == complete.mask(author="martin").tolist()
+
+
+def test_author_index_add_equals_rebuild():
+    rnd = random.Random(2)
+    noms = ["".join(rnd.choice("abcdeé ") for _ in range(rnd.randint(0, 8))) for _ in range(300)]
+
+    index = AuthorIndex(noms[:100])
+    index.add(noms[100:110])
+    index.add(noms[110:])
+    complet = AuthorIndex(noms)
+
+    for partiel in ("a", "ab", "abc", "é a", "dd", ""):
+        assert index.search(partiel).tolist() == complet.search(partiel).tolist()
+        assert index.prefix(partiel).tolist() == complet.prefix(partiel).tolist()
@@ -0,0 +1,64 @@
+import random
+
+import pytest
+
+from Corpus import Corpus
+from Document import Document
+from RedditDocument import RedditDocument
+from SearchEngine import SearchEngine
+
+MOTS = [
+    "tax", "taxes", "jobs", "economy", "economic", "growth", "health", "care",
+    "american", "people", "middle", "class", "workers", "budget", "cuts",
+    "energy", "climate", "trade", "school", "the", "and", "of",
+]
+
+REQUETES = ["economic growth jobs", "tax cuts the", "health care health", "climate energy", "tax* jobs"]
+
+
+def _documents():
+    rnd = random.Random(0)
+    docs = []
+    for i in range(300):
+        texte = " ".join(rnd.choice(MOTS) for _ in range(rnd.randint(3, 25)))
+        if i % 2 == 0:
+            docs.append(RedditDocument(f"r{i}", "auteur", "2018-01-01", "url", texte, 0))
+        else:
+            docs.append(Document(f"d{i}", "auteur", "2018-01-01", "url", texte))
+    return docs
+
+
+@pytest.fixture(scope="module")
+def moteurs():
+    docs = _documents()
+    corpus = Corpus("test")
+    for doc in docs:
+        corpus.add_document(doc)
+
+    # Moteur construit sur les seuls documents Reddit : référence de la
+    # portée "filtered"
+    reddit = Corpus("reddit")
+    for doc in docs:
+        if doc.getType() == "Reddit":
+            reddit.add_document(doc)
+
+    return SearchEngine(corpus, idf_scope="filtered"), SearchEngine(reddit)
+
+
+@pytest.mark.parametrize("model", ["tfidf", "bm25"])
+@pytest.mark.parametrize("query", REQUETES)
+def test_filtered_idf_equals_subcorpus_engine(moteurs, query, model):
+    engine, reddit = moteurs
+    attendu = reddit.search(query, 10, model=model)
+    obtenu = engine.search(query, 10, model=model, source="Reddit")
+
+    assert [r["titre"] for r in obtenu] == [r["titre"] for r in attendu]
+    assert [r["score"] for r in obtenu] == pytest.approx([r["score"] for r in attendu])
+
+
+@pytest.mark.parametrize("model", ["tfidf", "bm25"])
+@pytest.mark.parametrize("query", REQUETES)
+def test_filtered_idf_without_filter_is_global(moteurs, query, model):
+    engine, _ = moteurs
+    attendu = engine.search(query, 10, model=model, idf_scope="global")
+    assert engine.search(query, 10, model=model) == attendu
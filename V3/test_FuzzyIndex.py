@@ -0,0 +1,213 @@
+import random
+import string
+
+import pytest
+
+from Analyzer import Analyzer
+from Corpus import Corpus
+from Document import Document
+from FuzzyIndex import FuzzyIndex
+from SearchEngine import SearchEngine
+from TermDictionary import TermDictionary
+
+
+def _distance(a, b):
+    """
+    Distance de Damerau-Levenshtein restreinte, calculée sans arrêt
+    anticipé (référence de FuzzyIndex.distance).
+    """
+
+    d = [[0] * (len(b) + 1) for _ in range(len(a) + 1)]
+    for i in range(len(a) + 1):
+        d[i][0] = i
+    for j in range(len(b) + 1):
+        d[0][j] = j
+    for i in range(1, len(a) + 1):
+        for j in range(1, len(b) + 1):
+            d[i][j] = min(d[i - 1][j] + 1, d[i][j - 1] + 1,
+                          d[i - 1][j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                d[i][j] = min(d[i][j], d[i - 2][j - 2] + 1)
+    return d[-1][-1]
+
+
+def _faute(rnd, mot):
+    i = rnd.randrange(len(mot))
+    operation = rnd.choice("isdt")
+    if operation == "i":
+        return mot[:i] + rnd.choice(string.ascii_lowercase) + mot[i:]
+    if operation == "s":
+        return mot[:i] + rnd.choice(string.ascii_lowercase) + mot[i + 1:]
+    if operation == "d" and len(mot) > 1:
+        return mot[:i] + mot[i + 1:]
+    if i + 1 < len(mot):
+        return mot[:i] + mot[i + 1] + mot[i] + mot[i + 2:]
+    return mot
+
+
+@pytest.fixture(scope="module")
+def vocabulaire():
+    rnd = random.Random(0)
+    terms = sorted({
+        "".join(rnd.choice("aeioustrnlcm") for _ in range(rnd.randint(2, 10)))
+        for _ in range(500)
+    })
+    df = [rnd.choice([0, 1, 2, 5, 40]) for _ in terms]
+    return terms, df
+
+
+def _reference(terms, df, mot, limite):
+    meilleur = None
+    for j, t in enumerate(terms):
+        if df[j] == 0:
+            continue
+        dist = _distance(mot, t)
+        if dist <= limite and (meilleur is None or (dist, -df[j], j) < meilleur):
+            meilleur = (dist, -df[j], j)
+    return None if meilleur is None else (meilleur[2], meilleur[0])
+
+
+def test_lookup_equals_brute_force(vocabulaire):
+    terms, df = vocabulaire
+    index = FuzzyIndex(terms, df)
+    rnd = random.Random(1)
+
+    for _ in range(300):
+        mot = rnd.choice(terms)
+        for _ in range(rnd.randint(1, 2)):
+            mot = _faute(rnd, mot)
+        limite = 2 if len(mot) >= FuzzyIndex.MIN_LENGTH_DISTANCE_2 else 1
+        assert index.lookup(mot) == _reference(terms, df, mot, limite), mot
+
+
+def test_distance_equals_reference():
+    rnd = random.Random(2)
+    for _ in range(300):
+        a = "".join(rnd.choice("abc") for _ in range(rnd.randint(0, 7)))
+        b = "".join(rnd.choice("abc") for _ in range(rnd.randint(0, 7)))
+        attendu = _distance(a, b)
+        assert FuzzyIndex.distance(a, b, 2) == min(attendu, 3)
+
+
+def test_short_words_only_at_distance_one():
+    index = FuzzyIndex(["could", "covid"], [100, 0])
+    assert index.lookup("covid") is None
+    assert index.lookup("coulld") == (0, 1)
+
+
+def test_fuzzy_index_built_with_vocabulary():
+    corpus = Corpus("test")
+    for i, texte in enumerate(["economy and jobs", "government spending", "middle class jobs"]):
+        corpus.add_document(Document(f"d{i}", "auteur", "2020-01-01", "url", texte))
+    engine = SearchEngine(corpus)
+    assert engine._fuzzy_index is not None
+
+    assert engine.suggest("economy jobs") is None
+    assert engine.suggest("goverment jobs") == "government jobs"
+
+    assert SearchEngine(corpus, fuzzy=False)._fuzzy_index is None
+
+
+def test_hashes_equal_word_forms(vocabulaire):
+    terms, _ = vocabulaire
+    mots = terms[:50] + ["é", "aé", "àéî"]
+
+    # Deux formes (d'un mot ou d'un niveau à l'autre) ont le même hachage
+    # si et seulement si elles sont égales
+    formes = {}
+    for rang, mot in enumerate(mots):
+        niveaux = [{mot}]
+        for _ in range(2):
+            niveaux.append({f[:i] + f[i + 1:] for f in niveaux[-1] if len(f) > 1 for i in range(len(f))})
+        for niveau, ensemble in enumerate(niveaux):
+            for forme in ensemble:
+                formes.setdefault((forme, rang), niveau)
+
+    hashes, rangs, levels = FuzzyIndex._hash_forms(mots, 2)
+    assert len(set(zip(hashes.tolist(), rangs.tolist()))) == len(hashes) == len(formes)
+    assert len(set(hashes.tolist())) == len({f for f, _ in formes})
+    assert hashes.tolist() == sorted(hashes.tolist())
+
+    par_forme = {}
+    for (forme, rang), niveau in formes.items():
+        h = FuzzyIndex._hash_forms([forme], 0)[0][0]
+        par_forme.setdefault(forme, h)
+        assert par_forme[forme] == h
+    attendus = sorted((par_forme[f], rang, niveau) for (f, rang), niveau in formes.items())
+    assert list(zip(hashes.tolist(), rangs.tolist(), levels.tolist())) == [
+        (int(h), r, n) for h, r, n in attendus
+    ]
+
+
+def test_save_load_keeps_fuzzy_index(tmp_path):
+    corpus = Corpus("test")
+    for i, texte in enumerate(["economy and jobs", "government spending", "middle class jobs"]):
+        corpus.add_document(Document(f"d{i}", "auteur", "2020-01-01", "url", texte))
+    engine = SearchEngine(corpus)
+    engine.save(tmp_path)
+
+    loaded = SearchEngine.load(tmp_path)
+    assert loaded._fuzzy_index is not None
+    for name in FuzzyIndex.ARRAYS:
+        assert getattr(loaded._fuzzy_index, name).tolist() == getattr(engine._fuzzy_index, name).tolist()
+    assert loaded.suggest("goverment jobs") == "government jobs"
+
+
+def test_suggest_surface_form_with_stemming(tmp_path):
+    corpus = Corpus("test", Analyzer(stemming="en"))
+    for i, texte in enumerate(["the economy grows", "government spending", "economy and jobs"]):
+        corpus.add_document(Document(f"d{i}", "auteur", "2020-01-01", "url", texte))
+    engine = SearchEngine(corpus)
+    assert "economy" not in engine._terms
+
+    assert engine.suggest("econmy jobs") == "economy jobs"
+
+    engine.save(tmp_path)
+    assert SearchEngine.load(tmp_path).suggest("econmy jobs") == "economy jobs"
+
+
+def test_add_equals_rebuild(vocabulaire):
+    terms, df = vocabulaire
+    moitie = len(terms) // 2
+    index = FuzzyIndex(terms[:moitie], df[:moitie])
+    index.terms = terms
+    index.df = df
+    index.add(range(moitie, len(terms)))
+    complet = FuzzyIndex(terms, df)
+
+    rnd = random.Random(3)
+    for mot in rnd.sample(terms, 200):
+        faute = _faute(rnd, mot)
+        assert index.lookup(faute) == complet.lookup(faute)
+
+
+def test_refresh_keeps_fuzzy_index():
+    corpus = Corpus("test")
+    for i, texte in enumerate(["economy and jobs", "government spending", "middle class jobs"]):
+        corpus.add_document(Document(f"d{i}", "auteur", "2020-01-01", "url", texte))
+    engine = SearchEngine(corpus)
+    assert engine.suggest("goverment jobs") == "government jobs"
+    index = engine._fuzzy_index
+
+    corpus.add_document(Document("d3", "auteur", "2020-01-01", "url", "healthcare reform"))
+    engine.refresh()
+
+    assert engine._fuzzy_index is index
+    assert engine.suggest("helthcare jobs") == "healthcare jobs"
+
+
+def test_term_dictionary_add_equals_rebuild(vocabulaire):
+    terms, df = vocabulaire
+    moitie = len(terms) // 2
+    rnd = random.Random(4)
+    ordre = list(range(len(terms)))
+    rnd.shuffle(ordre)
+    melanges = [terms[j] for j in ordre]
+
+    index = TermDictionary(melanges[:moitie], df)
+    index.add(melanges[moitie:moitie + 5], range(moitie, moitie + 5))
+    index.add(melanges[moitie + 5:], range(moitie + 5, len(terms)))
+    complet = TermDictionary(melanges, df)
+
+    for motif in ("a*", "*e", "c?m*", "*", "s*t*"):
+        assert index.expand(motif).tolist() == complet.expand(motif).tolist()
@@ -0,0 +1,124 @@
+import random
+
+import pytest
+
+from Corpus import Corpus
+from Document import Document
+from CompressedPostings import SegmentedPostings
+from SearchEngine import SearchEngine
+from TopK import top_k
+
+MOTS = [
+    "tax", "taxes", "jobs", "economy", "economic", "growth", "health", "care",
+    "american", "people", "middle", "class", "workers", "budget", "cuts",
+    "energy", "climate", "trade", "school", "the", "and", "of",
+]
+
+REQUETES = [
+    "economic growth jobs", "tax cuts the the", "health care health", "climate",
+    "the and of people", "tax* jobs", "\"middle class\" tax", "budget NEAR/3 cuts",
+    "school trade energy climate growth", "school tax taxes", "climate tax taxes jobs",
+]
+
+
+def _texte(rnd):
+    # Mots rares en début de liste, fréquents en fin : bornes très inégales
+    return " ".join(MOTS[min(int(rnd.expovariate(0.15)), len(MOTS) - 1)]
+                    for _ in range(rnd.randint(3, 30)))
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    rnd = random.Random(0)
+    corpus = Corpus("test")
+    for i in range(600):
+        corpus.add_document(Document(f"d{i}", "auteur", f"{2010 + i % 10}-01-01", "url", _texte(rnd)))
+    return corpus
+
+
+def _exhaustif(engine, query, k, model, **options):
+    """
+    Classement sans élagage : scores de tous les documents, puis top k.
+    """
+
+    accumulate = engine._accumulate
+    engine._accumulate = lambda ids, weights, term_scores, *args: accumulate(ids, weights, term_scores)
+    try:
+        best, scores = engine._rank(query, k, model, **options)
+    finally:
+        del engine._accumulate
+    return best.tolist(), scores.tolist()
+
+
+@pytest.mark.parametrize("options", [{}, {"start": "2015-01-01"}])
+@pytest.mark.parametrize("model", ["tfidf", "bm25"])
+@pytest.mark.parametrize("k", [1, 3, 10])
+@pytest.mark.parametrize("query", REQUETES)
+def test_maxscore_equals_exhaustive(corpus, query, k, model, options):
+    engine = SearchEngine(corpus, cache_size=0)
+    best, scores = engine._rank(query, k, model, **options)
+    assert (best.tolist(), scores.tolist()) == _exhaustif(engine, query, k, model, **options)
+
+
+def test_maxscore_skips_documents(corpus):
+    engine = SearchEngine(corpus, cache_size=0)
+    ids, tf = engine._query_term_counts("school tax taxes")
+    elague = engine._cosine_scores(ids, tf * engine.idf[ids], k=3)
+    complet = engine._cosine_scores(ids, tf * engine.idf[ids])
+
+    # Documents écartés (score nul) sans changer les meilleurs
+    assert (elague > 0).sum() < (complet > 0).sum()
+    assert top_k(elague, 3).tolist() == top_k(complet, 3).tolist()
+
+
+def test_maxscore_after_add_document():
+    rnd = random.Random(1)
+    corpus = Corpus("test")
+    for i in range(200):
+        corpus.add_document(Document(f"d{i}", "auteur", "2020-01-01", "url", _texte(rnd)))
+    engine = SearchEngine(corpus, cache_size=0)
+    engine.search("tax jobs")
+
+    for i in range(50):
+        corpus.add_document(Document(f"n{i}", "auteur", "2021-01-01", "url", _texte(rnd) + " inflation"))
+    engine.refresh()
+
+    for query in ("inflation tax", "health care the"):
+        for model in ("tfidf", "bm25"):
+            best, scores = engine._rank(query, 5, model)
+            assert (best.tolist(), scores.tolist()) == _exhaustif(engine, query, 5, model)
+
+
+def test_incremental_refresh_keeps_bounds_and_scores():
+    rnd = random.Random(2)
+    corpus = Corpus("test")
+    for i in range(300):
+        corpus.add_document(Document(f"d{i}", "auteur", "2020-01-01", "url", _texte(rnd)))
+    engine = SearchEngine(corpus, cache_size=0)
+
+    segmente = False
+    for lot in range(2 * SearchEngine.MAX_SEGMENTS):
+        for i in range(rnd.randint(1, 8)):
+            texte = _texte(rnd) + (" inflation" if lot % 3 == 0 else "")
+            corpus.add_document(Document(f"n{lot}-{i}", "auteur", "2021-01-01", "url", texte))
+        engine.refresh()
+        segmente |= isinstance(engine._postings, SegmentedPostings)
+
+        # Bornes MaxScore : jamais inférieures aux maxima exacts
+        TF = engine.mat_TF.tocsc()
+        TF.sort_indices()
+        max_tf_norm, max_bm25 = engine._term_maxima(TF)
+        assert (engine.max_tfidf >= engine.idf * max_tf_norm * (1 - 1e-12)).all()
+        assert (engine.max_bm25 >= max_bm25 * (1 - 1e-12)).all()
+
+        # Mêmes classements qu'avec élagage exhaustif et qu'un moteur neuf
+        neuf = SearchEngine(corpus, cache_size=0)
+        for query in ("inflation tax", "school tax taxes", "health care the"):
+            for model in ("tfidf", "bm25"):
+                best, scores = engine._rank(query, 5, model)
+                assert (best.tolist(), scores.tolist()) == _exhaustif(engine, query, 5, model)
+                _, scores_neufs = neuf._rank(query, 5, model)
+                assert scores.tolist() == pytest.approx(scores_neufs.tolist())
+
+    assert segmente
+    assert engine._postings.df().tolist() == engine._df.tolist()
@@ -0,0 +1,83 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timezone
+
+import pytest
+
+from ArxivDocument import ArxivDocument
+from Corpus import Corpus
+from Document import Document
+from RedditDocument import RedditDocument
+from SearchEngine import SearchEngine
+from ShardedSearchEngine import ShardedSearchEngine
+
+MOTS = [
+    "tax", "taxes", "jobs", "economy", "economic", "growth", "health", "care",
+    "american", "people", "middle", "class", "workers", "budget", "cuts",
+    "energy", "climate", "trade", "school", "the", "and", "of",
+]
+
+REQUETES = [
+    "economic growth jobs", "tax cuts the", "health care health", "climate energy",
+    "tax* jobs", "\"middle class\"", "tax AND NOT jobs", "(health OR energy) AND care",
+    "economc growth",
+]
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    rnd = random.Random(0)
+    corpus = Corpus("test")
+    for i in range(400):
+        texte = " ".join(rnd.choice(MOTS) for _ in range(rnd.randint(3, 25)))
+        jour = datetime(2015, 1, 1) + (datetime(2020, 1, 1) - datetime(2015, 1, 1)) * rnd.random()
+        auteur = rnd.choice(["CLINTON", "TRUMP", "SANDERS"])
+        if i % 3 == 0:
+            doc = RedditDocument(f"r{i}", auteur, jour, "url", texte, rnd.randint(0, 9))
+        elif i % 3 == 1:
+            doc = ArxivDocument(f"a{i}", auteur, jour.replace(tzinfo=timezone.utc), "url", texte, ["Jane Doe"])
+        else:
+            doc = Document(f"d{i}", auteur, jour.strftime("%Y-%m-%d"), "url", texte)
+        corpus.add_document(doc)
+    return corpus
+
+
+@pytest.fixture(scope="module")
+def moteurs(corpus):
+    unique = SearchEngine(corpus)
+    sharded = ShardedSearchEngine(corpus, n_shards=3)
+    yield unique, sharded
+    sharded.close()
+
+
+@pytest.mark.parametrize("options", [
+    {},
+    {"model": "bm25"},
+    {"source": "arxiv", "start": date(2016, 1, 1)},
+    {"author": "trump", "end": "2018-06-30"},
+])
+@pytest.mark.parametrize("query", REQUETES)
+def test_sharded_equals_single(moteurs, query, options):
+    unique, sharded = moteurs
+    attendu = unique.search(query, 10, **options)
+    obtenu = sharded.search(query, 10, **options)
+
+    assert [r["titre"] for r in obtenu] == [r["titre"] for r in attendu]
+    assert [r["score"] for r in obtenu] == pytest.approx([r["score"] for r in attendu])
+
+
+def test_sharded_suggest(moteurs):
+    unique, sharded = moteurs
+    for query in REQUETES:
+        assert sharded.suggest(query) == unique.suggest(query)
+
+
+def test_sharded_concurrent_search(moteurs):
+    _, sharded = moteurs
+    attendu = {query: sharded.search(query, 10) for query in REQUETES}
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        obtenu = list(pool.map(lambda q: (q, sharded.search(q, 10)), REQUETES * 10))
+
+    for query, resultats in obtenu:
+        assert resultats == attendu[query]
@@ -0,0 +1,132 @@
+import random
+import re
+
+import numpy as np
+import pytest
+
+from Corpus import Corpus
+from Document import Document
+from TrigramIndex import TrigramIndex
+
+MOTS = [
+    "tax", "taxes", "jobs", "job", "economy", "economic", "health", "care",
+    "medical", "american", "people", "middle", "class", "worker", "workers",
+    "budget", "cuts", "thank", "you", "the", "and", "of", "a", "aaa", "xes",
+]
+
+TEXTES_UNICODE = [
+    "KELVIN K test", "Straße STRASSE", "İstanbul ıi", "Éléphant éLÉPHANT",
+    "ſtop Stop", "naïve NAÏVE café", "budget 2016 budget",
+]
+
+# Expressions comparées au parcours complet du texte : littéraux,
+# alternatives, répétitions, ancres, assertions, classes de caractères,
+# et expressions pouvant chevaucher deux documents (\s, \W, \n, DOTALL)
+MOTIFS = [
+    r"tax\w*", r"\bjobs?\b", r"econom(y|ic)", r"(health|medic)al care",
+    r"american\s+people", r"tax|jobs", r"(?:tax){2,}", r"[Tt]ax cuts?", r"k",
+    r"kelvin", r"KELVIN K", r"strasse", r"straße", r"istanbul", r"éléphant",
+    r"stop", r"NAÏVE", r"caf.", r"people$", r"^the", r"(?=tax)tax", r"(a)\1",
+    r"(?-i:Tax)", r"wo.?rk(er)+s", r"a{3}", r"\d{4} budget", r"[^a]xes",
+    r"\btax\b.{0,20}\bcut", r"jobs?(?!x)", r"(?>tax)es", r"middle class",
+    r"a++b", r"\.\s*Thank", r"thank you\.\s+\w+", r"you[\W]+thank",
+    r"you[^a]thank", r"(?s)you.thank", r"(?s:you.)thank", r"you\Dthank",
+    r"you\nthank", r"you.thank",
+]
+
+
+def _texte(rnd):
+    phrases = []
+    for _ in range(rnd.randint(1, 3)):
+        mots = [rnd.choice(MOTS) for _ in range(rnd.randint(2, 8))]
+        phrases.append(" ".join(mots).capitalize() + ".")
+    if rnd.random() < 0.3:
+        phrases.insert(0, "Thank you.")
+    return " ".join(phrases)
+
+
+def _corpus(n=300, seed=0):
+    rnd = random.Random(seed)
+    corpus = Corpus("test")
+    textes = [_texte(rnd) for _ in range(n)] + TEXTES_UNICODE
+    for i, texte in enumerate(textes):
+        corpus.add_document(Document(f"d{i}", "auteur", "2020-01-01", "url", texte))
+    return corpus
+
+
+def _parcours_complet(table, pattern):
+    texte, debuts = table.full_text()
+    matches = list(pattern.finditer(texte))
+    lignes = np.searchsorted(debuts, [m.start() for m in matches], side="right") - 1
+    return [(m.span(), r if r < len(table) else -1) for m, r in zip(matches, lignes.tolist())]
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    return _corpus()
+
+
+@pytest.mark.parametrize("motif", MOTIFS)
+def test_text_matches_equal_full_scan(corpus, motif):
+    pattern = re.compile(motif, re.IGNORECASE)
+    _, matches = corpus._text_matches(pattern)
+    assert [(m.span(), row) for m, row in matches] == _parcours_complet(corpus.table, pattern)
+
+
+def test_newline_patterns_are_not_narrowed(corpus):
+    index = corpus.table.trigram_index()
+    for motif in (r"\.\s*Thank", r"thank you\.\s+\w+", r"you[^a]thank", r"(?s)you.thank"):
+        assert index.candidates(re.compile(motif, re.IGNORECASE)) is None
+
+    # Des occurrences chevauchent bien deux documents
+    texte, debuts = corpus.table.full_text()
+    pattern = re.compile(r"\.\s*Thank", re.IGNORECASE)
+    lignes = np.searchsorted(debuts, [m.start() for m in pattern.finditer(texte)], side="right") - 1
+    fins = [m.end() for m in pattern.finditer(texte)]
+    assert any(fin > debuts[r + 1] for fin, r in zip(fins, lignes.tolist()))
+
+
+def test_extend_equals_rebuild():
+    corpus = _corpus(n=50, seed=1)
+    table = corpus.table
+    table.trigram_index()
+
+    rnd = random.Random(2)
+    for i in range(3 * TrigramIndex.MAX_SEGMENTS):
+        corpus.add_document(Document(f"n{i}", "auteur", "2021-01-01", "url", _texte(rnd)))
+        index = table.trigram_index()
+        assert index.n_docs == len(table)
+
+    neuf = TrigramIndex(*table.full_text())
+    for motif in ("tax", "middle class", "econom(y|ic)", r"\bjobs?\b"):
+        pattern = re.compile(motif, re.IGNORECASE)
+        assert index.candidates(pattern).tolist() == neuf.candidates(pattern).tolist()
+        _, matches = corpus._text_matches(pattern)
+        assert [(m.span(), row) for m, row in matches] == _parcours_complet(table, pattern)
+
+
+@pytest.mark.parametrize("methode", ["_matches_newline", "_sequence"])
+def test_unexpected_parse_tree_falls_back_to_full_scan(corpus, methode, monkeypatch):
+    def _erreur(*args):
+        raise TypeError("forme d'arbre inattendue")
+
+    index = corpus.table.trigram_index()
+    monkeypatch.setattr(TrigramIndex, methode, _erreur)
+    pattern = re.compile("middle class", re.IGNORECASE)
+    assert index.candidates(pattern) is None
+
+    _, matches = corpus._text_matches(pattern)
+    assert [(m.span(), row) for m, row in matches] == _parcours_complet(corpus.table, pattern)
+
+
+def test_search_keeps_untitled_documents():
+    corpus = Corpus("test")
+    corpus.add_document(Document(None, "auteur", "2020-01-01", "url", "tax cuts"))
+    corpus.add_document(Document("titre", "auteur", "2020-01-01", "url", "more tax"))
+
+    resultats = corpus.search("tax")
+    assert [titre for titre, _ in resultats] == [None, "titre"]
+
+    # Occurrence vide en fin de texte : rattachée à aucun document
+    _, matches = corpus._text_matches(re.compile("$"))
+    assert [row for _, row in matches] == [1, -1]